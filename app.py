@@ -3,68 +3,214 @@ import pandas as pd
 import json
 import os
 import re
+import time
 import yaml
 import hydra
 from omegaconf import DictConfig, OmegaConf
 from hydra.core.global_hydra import GlobalHydra
-from hydra.utils import instantiate
 
-# Initialize Hydra and load the base configuration
-GlobalHydra.instance().clear()
-hydra.initialize(config_path="./configs", job_name="omni_collector_app")
-base_cfg = hydra.compose(config_name="config")
-
-# Import functions from main.py
-from main import run_collection, run_summarization, create_metadata_index, save_to_markdown
-
-# Import specific sources for their methods (e.g., Raindrop collections)
-from src.sources.raindrop import RaindropSource
-from src.sources.youtube import YouTubeSource
-from src.sources.obsidian import ObsidianSource
-from src.sources.web import WebSource # Import WebSource
+from src.storage.metadata_index import load_metadata_frame
+from src.storage.rollups import Rollups, ROLLUPS_FILENAME, UNDATED
+from src.storage.markdown_storage import FRONTMATTER_PATTERN, body_index_fields, read_indexed_body
+
+# Streamlit은 위젯을 조작할 때마다 스크립트 전체를 다시 실행하므로,
+# 설정 구성과 무거운 임포트는 프로세스당 한 번만 수행하고 재사용합니다.
+@st.cache_resource
+def load_base_config():
+    # Initialize Hydra and load the base configuration
+    GlobalHydra.instance().clear()
+    hydra.initialize(config_path="./configs", job_name="omni_collector_app")
+    return hydra.compose(config_name="config")
+
+@st.cache_data(ttl=600, show_spinner="Raindrop 컬렉션 불러오는 중...")
+def load_raindrop_collections():
+    """
+    Raindrop 컬렉션 {id: 이름}을 반환합니다. 10분 동안 캐시하며, '컬렉션 새로고침' 버튼으로 즉시 갱신할 수 있습니다.
+    """
+    from src.sources.raindrop import RaindropSource
+    return RaindropSource(name="raindrop", posts_to_scrape=1).get_collections()
 
+base_cfg = load_base_config()
 all_available_sources = list(base_cfg.sources.keys())
 
+@st.cache_resource
+def load_job_queue():
+    """대시보드 작업을 백그라운드 작업자(main.py cli.mode=worker)와 주고받는 작업 큐 (모든 세션이 공유)."""
+    from src.scheduling import job_queue_from_config
+    return job_queue_from_config(base_cfg.worker)
+
+@st.cache_resource
+def load_archive():
+    """storage.archive_dir의 아카이브 (설정되어 있지 않으면 None). 마크다운 파일이 없는 항목의 본문을 읽는 데 사용합니다."""
+    archive_dir = base_cfg.storage.get('archive_dir')
+    if not archive_dir:
+        return None
+    from src.storage.archive import SegmentArchive
+    return SegmentArchive(archive_dir, compression=base_cfg.storage.get('archive_compression', 'zstd'))
+
+def submit_job(payload):
+    """작업을 큐에 넣고 작업자가 실행 중이 아니면 시작한 뒤 작업 ID를 반환합니다."""
+    from src.scheduling import start_worker
+    queue = load_job_queue()
+    # 같은 설정으로 여러 번 제출해도 각각 실행되도록 합치지 않음
+    job_id = queue.enqueue('dashboard', f"dashboard-{time.time_ns()}", payload, coalesce=False)
+    start_worker(base_cfg.worker.pid_path, base_cfg.worker.log_path)
+    return job_id
+
+def load_jobs(limit=10):
+    return load_job_queue().list_jobs('dashboard', limit=limit)
+
+JOB_STATUS_LABELS = {'pending': "대기 중", 'running': "실행 중", 'done': "완료", 'failed': "실패"}
+
+def render_job(job):
+    """작업 하나의 상태와 진행 상황(작업자가 큐에 기록한 값)을 표시합니다."""
+    payload = job.get('payload') or {}
+    sources = ", ".join(payload.get('sources', [])) or "수집 없음"
+    st.markdown(f"**#{job['id']}** {JOB_STATUS_LABELS.get(job['status'], job['status'])} · {sources} · "
+                f"{time.strftime('%m-%d %H:%M', time.localtime(job['created_at']))}")
+    progress = job.get('progress') or {}
+    if job['status'] == 'running':
+        total_steps = progress.get('total_steps') or 1
+        st.progress(min(progress.get('step', 0) / total_steps, 1.0),
+                    text=f"({progress.get('step', 0)}/{total_steps}) {progress.get('text', '작업 중...')}")
+        if progress.get('total'):
+            st.progress(min(progress['current'] / progress['total'], 1.0))
+    for level, text in progress.get('messages', []):
+        getattr(st, level, st.info)(text)
+    if job['status'] == 'failed':
+        st.error(f"작업 중 오류가 발생했습니다: {job.get('error')}")
+
+SEMANTIC_SEARCH_LIMIT = 200 # 의미 검색 결과로 표시할 최대 항목 수
+RELATED_ITEMS_LIMIT = 5
+TREND_BUCKETS = 26 # 추이 차트에 표시할 최근 날짜 구간 수
+TOP_TAGS = 20
+BODY_PREVIEW_BYTES = 65536 # 상세 보기에서 처음에 읽어 표시할 본문 크기 (긴 자막 등)
+BUCKET_LABELS = {'day': "일", 'week': "주", 'month': "월"}
+
 # 데이터 로드 함수
 @st.cache_data
 def load_data(metadata_path):
-    if not os.path.exists(metadata_path):
-        return pd.DataFrame()
-    with open(metadata_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    df = pd.DataFrame(data)
-    # published_at 컬럼을 datetime으로 변환하여 정렬 가능하게 함
-    if 'published_at' in df.columns:
-        df['published_at'] = pd.to_datetime(df['published_at'], errors='coerce', format='ISO8601')
-
-        # Ensure all valid datetimes are tz-naive
-        def make_tz_naive(ts):
-            if pd.isna(ts):
-                return ts
-            if ts.tz is not None:
-                return ts.tz_localize(None)
-            return ts
-
-        df['published_at'] = df['published_at'].apply(make_tz_naive)
-
-        df = df.sort_values(by='published_at', ascending=False)
-    
-    # 'rating' 컬럼이 없으면 0으로 초기화
-    if 'rating' not in df.columns:
-        df['rating'] = 0
-
-    return df
-
-def load_markdown_content(filepath):
-    if not os.path.exists(filepath):
+    return load_metadata_frame(metadata_path)
+
+@st.cache_resource(max_entries=1)
+def load_vector_index(mtime):
+    """인덱서가 만든 벡터 인덱스. 인덱스 파일의 수정 시각(mtime)이 바뀌면 다시 불러옵니다."""
+    from src.storage.vector_index import VectorIndex
+    return VectorIndex(**base_cfg.storage.vector_index).warm()
+
+def get_vector_index():
+    """storage.vector_index가 설정되어 있고 인덱싱으로 만들어져 있으면 VectorIndex를, 아니면 None을 반환합니다."""
+    vector_cfg = base_cfg.storage.get('vector_index')
+    if not vector_cfg:
+        return None
+    index_path = os.path.join(vector_cfg.index_dir, 'vectors.npz')
+    if not os.path.exists(index_path):
+        return None
+    return load_vector_index(os.path.getmtime(index_path))
+
+def related_items(df, vector_index, filepath, k=RELATED_ITEMS_LIMIT):
+    """선택한 항목과 관련된 항목들을 [(행, 유사도)]로 반환합니다. 메타데이터 인덱스에 없는(삭제된) 항목은 제외합니다."""
+    rows = {os.path.basename(path): i for i, path in enumerate(df['filepath'])}
+    related = []
+    for item_id, score in vector_index.related(os.path.basename(filepath), k=k * 2):
+        if item_id in rows:
+            related.append((df.iloc[rows[item_id]], score))
+    return related[:k]
+
+@st.cache_data(max_entries=1)
+def load_rollups(path, mtime):
+    """인덱서가 유지하는 통계 집계(rollups.json). 파일의 수정 시각(mtime)이 바뀌면 다시 읽습니다."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def get_rollups():
+    """storage.rollups가 설정되어 있고 인덱싱으로 만들어져 있으면 통계 집계를, 아니면 None을 반환합니다."""
+    rollups_cfg = base_cfg.storage.get('rollups')
+    if not rollups_cfg:
+        return None
+    path = os.path.join(rollups_cfg.rollup_dir, ROLLUPS_FILENAME)
+    if not os.path.exists(path):
+        return None
+    return load_rollups(path, os.path.getmtime(path))
+
+def update_rollups(metadata_list):
+    """대시보드에서 수정/삭제한 항목을 통계 집계에 반영합니다 (바뀐 항목만 고침)."""
+    rollups_cfg = base_cfg.storage.get('rollups')
+    if rollups_cfg:
+        Rollups(**rollups_cfg).update(metadata_list)
+
+def load_metrics(json_path):
+    if not json_path or not os.path.exists(json_path):
+        return None
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def metrics_frame(series, kind='counter'):
+    """메트릭 시리즈(레이블 + 값 리스트)를 레이블별 컬럼을 가진 DataFrame으로 변환합니다."""
+    rows = []
+    for entry in series:
+        row = dict(entry['labels'])
+        if kind == 'counter':
+            row['value'] = entry['value']
+        else:
+            row['count'] = entry['count']
+            row['total_seconds'] = round(entry['sum'], 3)
+            row['avg_ms'] = round(entry['sum'] / entry['count'] * 1000, 1) if entry['count'] else 0
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def read_stored_markdown(filepath):
+    """마크다운 파일의 내용을 반환합니다. 파일이 없으면 아카이브(cli.mode=archive로 옮긴 항목)에서 읽고, 어디에도 없으면 None."""
+    if os.path.exists(filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return f.read()
+    archive = load_archive()
+    return archive.read_text(os.path.basename(filepath)) if archive is not None else None
+
+def load_markdown_content(filepath, metadata=None, limit=None):
+    """
+    항목의 본문을 반환합니다. limit(바이트)을 지정하면 본문의 앞부분만 반환합니다.
+    메타데이터 인덱스 항목(metadata)에 본문 위치(body_offset, body_length)가 있으면 그 바이트만 읽고,
+    위치가 없거나 인덱싱 이후 파일이 바뀌었으면 파일 전체를 읽어 Frontmatter를 제거합니다.
+    """
+    if metadata is not None and pd.notna(metadata.get('body_offset')) and pd.notna(metadata.get('body_length')):
+        body = read_indexed_body(filepath, int(metadata['body_offset']), int(metadata['body_length']),
+                                 metadata.get('body_hash'), archive=load_archive(), limit=limit)
+        if body is not None:
+            return body
+    content = read_stored_markdown(filepath)
+    if content is None:
         return ""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-        # YAML Frontmatter 제거
-        match = re.search(r'^---\n(.*?)\n---\n', content, re.DOTALL)
-        if match:
-            return content[match.end():].strip()
-        return content.strip()
+    # YAML Frontmatter 제거
+    match = re.search(r'^---\n(.*?)\n---\n', content, re.DOTALL)
+    body = content[match.end():].strip() if match else content.strip()
+    if limit is not None:
+        body = body.encode('utf-8')[:limit].decode('utf-8', errors='ignore')
+    return body
+
+def iter_stored_markdown(markdown_dir):
+    """
+    (파일명, 내용)을 반환합니다. 마크다운 파일을 먼저 읽고, 같은 이름의 파일이 없는 아카이브 항목은 세그먼트 순서대로 읽습니다.
+    """
+    filenames = set()
+    for filename in os.listdir(markdown_dir):
+        if filename.endswith('.md'):
+            filenames.add(filename)
+            with open(os.path.join(markdown_dir, filename), 'r', encoding='utf-8', newline='') as f: # 본문 위치(바이트)를 계산하므로 줄바꿈을 바꾸지 않음
+                yield filename, f.read()
+    archive = load_archive()
+    if archive is not None:
+        archived = [item_id for item_id in archive.ids() if item_id not in filenames]
+        for item_id, _, content in archive.iter_records(archived):
+            yield item_id, content.decode('utf-8')
+
+def delete_stored_markdown(filepath):
+    """마크다운 파일을 삭제하고, 아카이브에 있는 항목이면 아카이브에서도 삭제합니다."""
+    if os.path.exists(filepath):
+        os.remove(filepath)
+    archive = load_archive()
+    if archive is not None:
+        archive.delete(os.path.basename(filepath))
 
 def save_markdown_content(data, filepath):
     """
@@ -72,7 +218,7 @@ def save_markdown_content(data, filepath):
     """
     frontmatter = "---\n"
     for key, value in data.items():
-        if key != 'body' and key != 'filepath': # filepath는 메타데이터에 저장하지 않음
+        if key not in ('body', 'filepath', 'body_hash', 'body_offset', 'body_length', 'file_stat', 'archive_location', 'search_score'): # filepath와 인덱스/검색이 계산하는 값은 메타데이터에 저장하지 않음
             if isinstance(value, pd.Timestamp):
                 # Ensure timestamp is tz-naive before saving
                 if value.tz is not None:
@@ -89,38 +235,37 @@ def save_markdown_content(data, filepath):
 
 def update_metadata_index(markdown_dir, metadata_path):
     """
-    마크다운 파일들로부터 메타데이터 인덱스를 재생성합니다.
+    마크다운 파일과 아카이브 항목들로부터 메타데이터 인덱스를 재생성합니다.
     """
     metadata_list = []
-    for filename in os.listdir(markdown_dir):
-        if filename.endswith('.md'):
-            filepath = os.path.join(markdown_dir, filename)
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-                match = re.search(r'^---\n(.*?)\n---\n', content, re.DOTALL)
-                if match:
+    for filename, content in iter_stored_markdown(markdown_dir):
+        filepath = os.path.join(markdown_dir, filename)
+        match = FRONTMATTER_PATTERN.search(content)
+        if match:
+            try:
+                metadata = yaml.safe_load(match.group(1))
+                if 'published_at' in metadata and metadata['published_at']:
                     try:
-                        metadata = yaml.safe_load(match.group(1))
-                        if 'published_at' in metadata and metadata['published_at']:
-                            try:
-                                dt_obj = pd.to_datetime(metadata['published_at'], errors='coerce', format='ISO8601')
-                                if pd.api.types.is_datetime64_any_dtype(dt_obj):
-                                    if dt_obj.tz is not None:
-                                        dt_obj = dt_obj.tz_localize(None)
-                                metadata['published_at'] = dt_obj
-                            except Exception as e:
-                                st.warning(f"Could not parse published_at for {filename}: {e}")
-                                metadata['published_at'] = None # Set to None if parsing fails
-                        metadata['filepath'] = filepath
-                        metadata_list.append(metadata)
-                    except yaml.YAMLError as e:
-                        st.error(f"Error parsing YAML in {filename}: {e}")
+                        dt_obj = pd.to_datetime(metadata['published_at'], errors='coerce', format='ISO8601')
+                        if pd.api.types.is_datetime64_any_dtype(dt_obj):
+                            if dt_obj.tz is not None:
+                                dt_obj = dt_obj.tz_localize(None)
+                        metadata['published_at'] = dt_obj
+                    except Exception as e:
+                        st.warning(f"Could not parse published_at for {filename}: {e}")
+                        metadata['published_at'] = None # Set to None if parsing fails
+                metadata['filepath'] = filepath
+                metadata.update(body_index_fields(content, match.end()))
+                metadata_list.append(metadata)
+            except yaml.YAMLError as e:
+                st.error(f"Error parsing YAML in {filename}: {e}")
 
     metadata_list.sort(key=lambda x: x.get('published_at', '1970-01-01T00:00:00'), reverse=True)
 
     with open(metadata_path, 'w', encoding='utf-8') as f:
         json.dump(metadata_list, f, ensure_ascii=False, indent=4)
-    st.cache_data.clear() # 캐시 지우기
+    update_rollups(metadata_list)
+    load_data.clear() # 캐시 지우기
     st.rerun() # UI 새로고침
 
 @st.cache_data
@@ -192,8 +337,7 @@ for source_name in base_cfg.sources.keys():
             st.session_state[f"youtube_playlist_ids_{source_name}"] = "\n".join(source_cfg.playlist_ids)
     if source_name == "raindrop" and f"raindrop_collection_ids_{source_name}" not in st.session_state:
         # Need to map IDs back to names for multiselect default
-        raindrop_source_instance = RaindropSource(name="raindrop", posts_to_scrape=1)
-        collections_map = {id: name for id, name in raindrop_source_instance.get_collections().items()}
+        collections_map = load_raindrop_collections()
         st.session_state[f"raindrop_collection_ids_{source_name}"] = [collections_map[cid] for cid in source_cfg.collection_ids if cid in collections_map]
 
 if 'do_summarize_checkbox' not in st.session_state:
@@ -224,8 +368,7 @@ if st.session_state.get('load_preset_trigger', False):
                     st.session_state[f"youtube_playlist_ids_{source_name}"] = "\n".join(source_cfg_loaded.playlist_ids)
                 elif source_name == "raindrop":
                     # Need to map IDs back to names for multiselect default
-                    raindrop_source_instance = RaindropSource(name="raindrop", posts_to_scrape=1)
-                    collections_map = {id: name for id, name in raindrop_source_instance.get_collections().items()}
+                    collections_map = load_raindrop_collections()
                     st.session_state[f"raindrop_collection_ids_{source_name}"] = [collections_map[cid] for cid in source_cfg_loaded.collection_ids if cid in collections_map]
 
         st.session_state.do_summarize_checkbox = loaded_cfg.processing.summarize.enabled
@@ -310,9 +453,10 @@ with st.sidebar.expander("새로운 작업 실행", expanded=True): # Expander f
                 custom_source_configs[source_name]["playlist_ids"] = [pid.strip() for pid in playlist_ids_input.split('\n')] if playlist_ids_input else []
 
             elif source_name == "raindrop":
-                # Fetch Raindrop collections dynamically
-                raindrop_source_instance = RaindropSource(name="raindrop", posts_to_scrape=1) # Dummy instance to get collections
-                collections = raindrop_source_instance.get_collections()
+                # Raindrop 컬렉션 (캐시됨)
+                if st.button("컬렉션 새로고침", key=f"refresh_raindrop_collections_{source_name}"):
+                    load_raindrop_collections.clear()
+                collections = load_raindrop_collections()
                 collection_options = {name: id for id, name in collections.items()} # {name: id}
                 
                 selected_collection_names = st.multiselect(
@@ -348,138 +492,71 @@ with st.sidebar.expander("새로운 작업 실행", expanded=True): # Expander f
         st.warning("새로운 웹 주소 수집은 실험적 기능입니다. 웹사이트 구조에 따라 실패할 수 있습니다.")
 
     if st.button("작업 실행", key="run_process_button"):
-        with st.spinner("작업을 실행 중입니다..."):
-            try:
-                # Create a mutable copy of the config for overrides
-                current_cfg = OmegaConf.to_container(base_cfg, resolve=True, throw_on_missing=True)
-                current_cfg = OmegaConf.create(current_cfg) # Convert back to DictConfig
-
-                # Apply custom source configurations
-                for source_name, custom_cfg in custom_source_configs.items():
-                    if source_name in current_cfg.sources:
-                        current_cfg.sources[source_name].posts_to_scrape = custom_cfg["posts_to_scrape"]
-                        current_cfg.sources[source_name].filter_keywords = custom_cfg["filter_keywords"]
-                        if source_name == "obsidian":
-                            current_cfg.sources[source_name].folder_paths = custom_cfg["folder_paths"]
-                        elif source_name == "youtube":
-                            current_cfg.sources[source_name].channel_ids = custom_cfg["channel_ids"]
-                            current_cfg.sources[source_name].playlist_ids = custom_cfg["playlist_ids"]
-                        elif source_name == "raindrop":
-                            current_cfg.sources[source_name].collection_ids = custom_cfg["collection_ids"]
-
-                # Handle new web URL collection
-                if new_web_url:
-                    st.info(f"새로운 웹 주소 '{new_web_url}' 수집 중...")
-                    # Dynamically create a WebSource config
-                    web_source_cfg = OmegaConf.create({
-                        "_target_": "src.sources.web.WebSource",
-                        "name": "web_custom",
-                        "url": new_web_url,
-                        "filter_keywords": [] # No filtering for custom web source
-                    })
-                    # Temporarily add to sources for collection
-                    current_cfg.sources.web_custom = web_source_cfg
-                    selected_sources_to_collect.append("web_custom")
-
-                # Ensure output directories exist
-                output_dir = os.path.join(os.getcwd(), 'results')
-                markdown_dir = os.path.join(output_dir, 'markdown')
-                os.makedirs(markdown_dir, exist_ok=True)
-                metadata_path = os.path.join(output_dir, 'metadata.json')
-
-                # Initialize progress bar
-                progress_bar = st.progress(0, text="작업 시작...")
-                progress_text = st.empty()
-                total_steps = 3 # Collect, Summarize, Index
-                current_step = 0
-                scraped_data = [] # Initialize scraped_data here
-
-                # 1. Collect data
-                if selected_sources_to_collect:
-                    current_step += 1
-                    progress_bar.progress(current_step / total_steps, text=f"({current_step}/{total_steps}) 데이터 수집 중...")
-                    # Filter current_cfg.sources to only include selected_sources_to_collect
-                    temp_sources_cfg = OmegaConf.create({s_name: current_cfg.sources[s_name] for s_name in selected_sources_to_collect})
-                    current_cfg.sources = temp_sources_cfg
-
-                    scraped_data = run_collection(current_cfg)
-                    
-                    # Save collected data with item-specific progress
-                    item_progress_bar = st.progress(0, text="수집된 항목 저장 중...")
-                    for i, data in enumerate(scraped_data):
-                        save_to_markdown(data, markdown_dir)
-                        item_progress_bar.progress((i + 1) / len(scraped_data), text=f"수집된 항목 저장 중... ({i+1}/{len(scraped_data)})")
-                    item_progress_bar.empty() # Clear item progress bar
-
-                    st.success(f"{len(scraped_data)}개 항목 수집 완료.")
-                else:
-                    st.warning("수집할 소스가 선택되지 않았습니다. 수집 작업을 건너뜁니다.")
+        try:
+            # Create a mutable copy of the config for overrides
+            current_cfg = OmegaConf.to_container(base_cfg, resolve=True, throw_on_missing=True)
+            current_cfg = OmegaConf.create(current_cfg) # Convert back to DictConfig
+            sources_to_collect = list(selected_sources_to_collect)
 
-                # 2. Summarize data
-                processed_data = scraped_data # Start with newly collected data
-                if do_summarize:
-                    current_step += 1
-                    progress_bar.progress(current_step / total_steps, text=f"({current_step}/{total_steps}) 데이터 요약 중...")
-                    
-                    # If no new data was collected, load from markdown files for summarization
-                    if not processed_data: 
-                        st.warning("수집된 새 데이터가 없습니다. 기존 마크다운 파일에서 요약 작업을 수행합니다.")
-                        data_to_summarize_from_files = []
-                        for filename in os.listdir(markdown_dir):
-                            if filename.endswith('.md'):
-                                filepath = os.path.join(markdown_dir, filename)
-                                with open(filepath, 'r', encoding='utf-8') as f:
-                                    content = f.read()
-                                    match = re.search(r'^---\n(.*?)\n---\n', content, re.DOTALL)
-                                    if match:
-                                        metadata = yaml.safe_load(match.group(1))
-                                        body = content[match.end():].strip()
-                                        metadata['body'] = body
-                                        data_to_summarize_from_files.append(metadata)
-                        processed_data = data_to_summarize_from_files
-
-                    # Instantiate summarizer with current config
-                    summarizer = instantiate(current_cfg.processing.summarize)
-
-                    # Define progress callback for UI update
-                    def update_summarization_progress(current, total):
-                        item_progress_bar.progress(current / total, text=f"항목 요약 중... ({current}/{total})")
-
-                    item_progress_bar = st.progress(0, text="항목 요약 중...")
-                    summarized_items = summarizer.summarize_data(
-                        processed_data,
-                        selected_prompt_name,
-                        progress_callback=update_summarization_progress
-                    )
-                    item_progress_bar.empty() # Clear item progress bar
-
-                    # Save summarized data back to markdown files
-                    item_progress_bar = st.progress(0, text="요약된 항목 저장 중...")
-                    for i, data in enumerate(summarized_items):
-                        save_to_markdown(data, markdown_dir)
-                        item_progress_bar.progress((i + 1) / len(summarized_items), text=f"요약된 항목 저장 중... ({i+1}/{len(summarized_items)})")
-                    item_progress_bar.empty() # Clear item progress bar
-
-                    st.success("데이터 요약 완료.")
-                else:
-                    st.info("요약 작업이 비활성화되었습니다.")
-
-                # 3. Create/Update metadata index
-                if do_index:
-                    current_step += 1
-                    progress_bar.progress(current_step / total_steps, text=f"({current_step}/{total_steps}) 메타데이터 인덱스 재생성 중...")
-                    create_metadata_index(markdown_dir, metadata_path)
-                    st.success("메타데이터 인덱스 재생성 완료.")
-                else:
-                    st.info("인덱스 재생성 작업이 비활성화되었습니다.")
+            # Apply custom source configurations
+            for source_name, custom_cfg in custom_source_configs.items():
+                if source_name in current_cfg.sources:
+                    current_cfg.sources[source_name].posts_to_scrape = custom_cfg["posts_to_scrape"]
+                    current_cfg.sources[source_name].filter_keywords = custom_cfg["filter_keywords"]
+                    if source_name == "obsidian":
+                        current_cfg.sources[source_name].folder_paths = custom_cfg["folder_paths"]
+                    elif source_name == "youtube":
+                        current_cfg.sources[source_name].channel_ids = custom_cfg["channel_ids"]
+                        current_cfg.sources[source_name].playlist_ids = custom_cfg["playlist_ids"]
+                    elif source_name == "raindrop":
+                        current_cfg.sources[source_name].collection_ids = custom_cfg["collection_ids"]
+
+            # Handle new web URL collection
+            if new_web_url:
+                # Dynamically create a WebSource config
+                web_source_cfg = OmegaConf.create({
+                    "_target_": "src.sources.web.WebSource",
+                    "name": "web_custom",
+                    "url": new_web_url,
+                    "filter_keywords": [], # No filtering for custom web source
+                    "html_parser": current_cfg.http.html_parser
+                })
+                # Temporarily add to sources for collection
+                current_cfg.sources.web_custom = web_source_cfg
+                sources_to_collect.append("web_custom")
+
+            # 작업은 백그라운드 작업자가 실행하고, 대시보드는 작업 큐에서 진행 상황만 읽음
+            job_id = submit_job({
+                "config": OmegaConf.to_container(current_cfg, resolve=True),
+                "sources": sources_to_collect,
+                "summarize": do_summarize,
+                "prompt": selected_prompt_name,
+                "index": do_index,
+            })
+            st.success(f"작업 #{job_id}이(가) 제출되었습니다. 진행 상황은 '작업 현황'에서 확인할 수 있습니다.")
+        except Exception as e:
+            st.error(f"작업 제출 중 오류가 발생했습니다: {e}")
+
+# 백그라운드 작업 현황 (진행 중인 작업이 있으면 이 부분만 주기적으로 다시 그림)
+jobs_at_start = load_jobs()
+has_active_jobs = any(job['status'] in ('pending', 'running') for job in jobs_at_start)
+
+@st.fragment(run_every=base_cfg.worker.poll_interval_seconds if has_active_jobs else None)
+def job_status_panel(watching):
+    jobs = load_jobs()
+    active = [job for job in jobs if job['status'] in ('pending', 'running')]
+    if watching and not active:
+        # 지켜보던 작업이 모두 끝나면 새 데이터로 전체 화면을 다시 그림
+        load_data.clear() # Clear cache to reload data (Raindrop 컬렉션 캐시는 유지)
+        st.rerun()
+    if not jobs:
+        return
+    with st.expander(f"작업 현황 (진행 중 {len(active)})", expanded=bool(active)):
+        for job in jobs[:5]:
+            render_job(job)
 
-                progress_bar.progress(1.0, text="모든 작업 완료!")
-                st.success("모든 작업이 완료되었습니다!")
-            except Exception as e:
-                st.error(f"작업 중 오류가 발생했습니다: {e}")
-            finally:
-                st.cache_data.clear() # Clear cache to reload data
-                st.rerun() # Rerun app to refresh UI
+with st.sidebar:
+    job_status_panel(has_active_jobs)
 
 # Configuration Preset Management
 st.sidebar.header("설정 프리셋 관리")
@@ -531,12 +608,69 @@ with st.sidebar.expander("프리셋 저장/로드", expanded=False):
     if st.session_state.get('load_preset_trigger', False):
         st.rerun()
 
+# 최근 실행 메트릭 패널
+run_metrics = load_metrics(base_cfg.metrics.json_path) if base_cfg.get('metrics') is not None else None
+if run_metrics:
+    with st.expander(f"실행 메트릭 ({run_metrics['started_at']} ~ {run_metrics['finished_at']})", expanded=False):
+        histograms = run_metrics.get('histograms', {})
+        counters = run_metrics.get('counters', {})
+        metric_col1, metric_col2 = st.columns(2)
+        with metric_col1:
+            if 'stage_seconds' in histograms:
+                st.markdown("**단계별 소요 시간**")
+                st.dataframe(metrics_frame(histograms['stage_seconds'], 'histogram'), use_container_width=True)
+            if 'items_total' in counters:
+                st.markdown("**단계별 항목 수**")
+                st.dataframe(metrics_frame(counters['items_total']), use_container_width=True)
+        with metric_col2:
+            for name, label in [('http_request_seconds', "HTTP 요청 지연"), ('api_request_seconds', "YouTube API 지연"),
+                                ('parse_seconds', "HTML 파싱"), ('transcript_seconds', "자막 가져오기"),
+                                ('llm_request_seconds', "Gemini 호출 지연")]:
+                if name in histograms:
+                    st.markdown(f"**{label}**")
+                    st.dataframe(metrics_frame(histograms[name], 'histogram'), use_container_width=True)
+        other_counters = [name for name in counters if name != 'items_total']
+        if other_counters:
+            st.markdown("**카운터** (요청 수, 바이트, 재시도, 대기 시간, 캐시 적중, 토큰 등)")
+            st.dataframe(pd.concat([metrics_frame(counters[name]).assign(metric=name) for name in other_counters],
+                                   ignore_index=True), use_container_width=True)
+
+# 통계 패널 (인덱서가 유지하는 집계만 읽으므로 항목 수와 무관하게 바로 그림)
+rollups = get_rollups()
+if rollups and rollups['total']:
+    with st.expander(f"통계 (항목 {rollups['total']:,}개, {rollups['updated_at']} 기준)", expanded=False):
+        stats_col1, stats_col2 = st.columns(2)
+        with stats_col1:
+            trend = pd.DataFrame(rollups['by_bucket']).drop(index=UNDATED, errors='ignore')
+            if not trend.empty:
+                trend.index = pd.to_datetime(trend.index)
+                st.markdown(f"**소스별 수집 추이** ({BUCKET_LABELS[rollups['bucket']]}별)")
+                st.line_chart(trend.sort_index().fillna(0).tail(TREND_BUCKETS))
+            st.markdown("**별점 분포**")
+            st.bar_chart(pd.DataFrame(rollups['ratings']).fillna(0).sort_index())
+        with stats_col2:
+            if rollups['tags']:
+                st.markdown(f"**자주 쓰인 태그** (상위 {TOP_TAGS}개)")
+                st.bar_chart(pd.Series(rollups['tags'], name="항목 수").nlargest(TOP_TAGS))
+            st.markdown("**요약 비율**")
+            coverage = pd.DataFrame({'total': rollups['sources']}).assign(
+                summarized=lambda frame: pd.Series(rollups['summarized'], dtype=int).reindex(frame.index, fill_value=0))
+            coverage['ratio'] = coverage['summarized'] / coverage['total'] * 100
+            st.dataframe(coverage, use_container_width=True, column_config={
+                "total": st.column_config.NumberColumn("항목 수"),
+                "summarized": st.column_config.NumberColumn("요약됨"),
+                "ratio": st.column_config.ProgressColumn("요약 비율", format="%.0f%%", min_value=0, max_value=100),
+            })
+
 if df.empty:
     st.info("수집된 데이터가 없습니다. `main.py`를 실행하거나, 좌측 사이드바에서 작업을 실행해주세요.")
 else:
     # 사이드바 필터 및 검색
     st.sidebar.header("필터 및 검색")
     search_query = st.sidebar.text_input("제목 또는 요약 검색", "")
+    vector_index = get_vector_index()
+    semantic_search = vector_index is not None and st.sidebar.toggle(
+        "의미 검색", value=False, help="제목, 요약, 태그, 본문의 TF-IDF 유사도로 관련도 순으로 찾습니다.")
     selected_source = st.sidebar.selectbox("소스 선택", ["모두"] + df['source'].unique().tolist())
     min_rating = st.sidebar.slider("최소 중요도 (별점)", 0, 5, 0)
 
@@ -546,7 +680,12 @@ else:
 
     # 데이터 필터링
     filtered_df = df
-    if search_query:
+    search_scores = None
+    if search_query and semantic_search:
+        search_scores = dict(vector_index.search(search_query, k=SEMANTIC_SEARCH_LIMIT))
+        filtered_df = filtered_df.assign(search_score=filtered_df['filepath'].map(lambda path: search_scores.get(os.path.basename(path))))
+        filtered_df = filtered_df[filtered_df['search_score'].notna()]
+    elif search_query:
         filtered_df = filtered_df[filtered_df.apply(lambda row: search_query.lower() in str(row.get('title', '')).lower() or search_query.lower() in str(row.get('summary', '')).lower(), axis=1)]
     if selected_source != "모두":
         filtered_df = filtered_df[filtered_df['source'] == selected_source]
@@ -554,8 +693,10 @@ else:
     # 중요도 필터링
     filtered_df = filtered_df[filtered_df['rating'].fillna(0) >= min_rating]
 
-    # 데이터 정렬
-    if sort_by == "발행일":
+    # 데이터 정렬 (의미 검색 중에는 관련도 순)
+    if search_scores is not None:
+        filtered_df = filtered_df.sort_values(by='search_score', ascending=False)
+    elif sort_by == "발행일":
         filtered_df = filtered_df.sort_values(by='published_at', ascending=(sort_order == "오름차순"))
     elif sort_by == "중요도":
         filtered_df = filtered_df.sort_values(by='rating', ascending=(sort_order == "오름차순"), na_position='first')
@@ -675,9 +816,26 @@ else:
                 st.subheader("요약 내용")
                 st.write(selected_data['summary'])
 
+                if vector_index is not None:
+                    related_rows = related_items(df, vector_index, selected_data['filepath'])
+                    if related_rows:
+                        st.subheader("관련 항목")
+                        for related, score in related_rows:
+                            st.markdown(f"- [{related['title']}]({related['url']}) ({related['source']}, 유사도 {score:.2f})")
+
                 st.subheader("원본 내용")
-                markdown_content = load_markdown_content(selected_data['filepath'])
+                # 긴 본문은 앞부분만 읽어 표시하고, 요청하면 전체를 읽음
+                full_body_key = f"full_body_{selected_data['filepath']}"
+                show_full_body = st.session_state.get(full_body_key, False)
+                markdown_content = load_markdown_content(selected_data['filepath'], selected_data,
+                                                         limit=None if show_full_body else BODY_PREVIEW_BYTES)
                 st.markdown(markdown_content)
+                stored_body_length = selected_data.get('body_length')
+                if not show_full_body and pd.notna(stored_body_length) and stored_body_length > BODY_PREVIEW_BYTES:
+                    st.caption(f"본문 {int(stored_body_length):,}바이트 중 앞 {BODY_PREVIEW_BYTES:,}바이트만 표시했습니다.")
+                    if st.button("전체 내용 보기", key=f"full_body_button_{selected_data['filepath']}"):
+                        st.session_state[full_body_key] = True
+                        st.rerun()
 
                 st.markdown("--- ")
                 col1, col2 = st.columns(2)
@@ -689,7 +847,7 @@ else:
                 with col2:
                     if st.button("삭제", key=f"delete_button_{selected_data['filepath']}"): # 삭제 버튼
                         if st.session_state.get('confirm_delete', False):
-                            os.remove(selected_data['filepath'])
+                            delete_stored_markdown(selected_data['filepath'])
                             update_metadata_index(os.path.join(os.getcwd(), 'results', 'markdown'), metadata_file)
                             st.success("항목이 삭제되었습니다.")
                             st.session_state['confirm_delete'] = False
@@ -705,7 +863,7 @@ else:
             edited_title = st.text_input("제목", editing_data.get('title', ''))
             edited_url = st.text_input("URL", editing_data.get('url', ''))
             edited_summary = st.text_area("요약", editing_data.get('summary', ''), height=200)
-            edited_body = st.text_area("원본 내용", load_markdown_content(editing_data['filepath']), height=400)
+            edited_body = st.text_area("원본 내용", load_markdown_content(editing_data['filepath'], editing_data), height=400)
             edited_tags = st.text_input("태그 (쉼표로 구분)", ', '.join(editing_data.get('tags', [])))
             edited_rating = st.slider("중요도 (별점)", 0, 5, editing_data.get('rating', 0))
 
@@ -0,0 +1 @@
+# 성능 벤치마크 모음입니다. 사용법은 benchmarks/run.py와 README의 "성능 벤치마크" 절을 참고하세요.
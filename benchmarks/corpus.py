@@ -0,0 +1,114 @@
+import os
+import random
+from datetime import datetime, timedelta
+from src.storage.markdown_storage import render_markdown, markdown_filename
+
+# 소스별 비중과 본문 길이(문자 수) 분포. 실제 수집 결과의 대략적인 크기를 따름:
+# Obsidian 노트는 수 KB, 웹 게시글은 수~수십 KB, Raindrop 메모는 짧고, YouTube 자막은 1시간 영상 기준 수십 KB.
+SOURCE_PROFILES = {
+    'obsidian': {'weight': 0.35, 'median_chars': 2500, 'sigma': 1.0},
+    'pytorch_kr': {'weight': 0.15, 'median_chars': 5000, 'sigma': 0.8},
+    'gpters': {'weight': 0.10, 'median_chars': 4000, 'sigma': 0.8},
+    'raindrop': {'weight': 0.25, 'median_chars': 1500, 'sigma': 1.2},
+    'youtube': {'weight': 0.15, 'median_chars': 40000, 'sigma': 0.6},
+}
+
+VOCABULARY = (
+    "the model training data attention layer agent prompt token graph neural network memory "
+    "learning inference gradient loss vector embedding diffusion kernel python pytorch "
+    "인공지능 모델 학습 데이터 에이전트 요약 추론 그래프 메모리 신경망 벡터 프롬프트 논문 실험 결과"
+).split()
+KEYWORDS = ["AI", "LLM", "Deep Learning", "Agent", "PyTorch"]
+
+
+def _make_body(rng, n_chars):
+    words = []
+    length = 0
+    while length < n_chars:
+        word = rng.choice(KEYWORDS) if rng.random() < 0.002 else rng.choice(VOCABULARY)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)
+
+
+def make_item(rng, index, base_date=datetime(2025, 1, 1)):
+    """소스별 분포에 맞는 합성 항목 하나를 생성합니다."""
+    sources = list(SOURCE_PROFILES)
+    source = rng.choices(sources, weights=[SOURCE_PROFILES[s]['weight'] for s in sources])[0]
+    profile = SOURCE_PROFILES[source]
+    n_chars = int(rng.lognormvariate(0, profile['sigma']) * profile['median_chars'])
+    item = {
+        'title': f"{source} synthetic item {index:06d}",
+        'url': f"https://example.com/{source}/{index}",
+        'source': source,
+        'published_at': (base_date - timedelta(minutes=37 * index)).isoformat(),
+        'tags': rng.sample(KEYWORDS, k=rng.randint(0, 3)),
+        'summary': _make_body(rng, 300),
+        'body': _make_body(rng, n_chars),
+    }
+    if source in ('pytorch_kr', 'youtube'):
+        item['view_count'] = rng.randint(0, 100000)
+        item['like_count'] = rng.randint(0, 5000)
+    return item
+
+
+def generate_items(n, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield make_item(rng, i)
+
+
+def generate_corpus(output_dir, n, seed=0):
+    """
+    output_dir에 n개의 합성 마크다운 파일을 생성합니다. 이미 같은 크기의 코퍼스가 있으면 재사용합니다.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    existing = sum(1 for f in os.listdir(output_dir) if f.endswith('.md'))
+    if existing == n:
+        return output_dir
+    for filename in os.listdir(output_dir):
+        if filename.endswith('.md'):
+            os.remove(os.path.join(output_dir, filename))
+    for item in generate_items(n, seed):
+        with open(os.path.join(output_dir, markdown_filename(item['title'])), 'w', encoding='utf-8') as f:
+            f.write(render_markdown(item))
+    return output_dir
+
+
+def make_discourse_topic_page(rng, index, n_replies=None):
+    """
+    Discourse 포럼(discuss.pytorch.kr)의 크롤러용 토픽 페이지와 같은 구조의 합성 HTML을 생성합니다.
+    실제로 기록된 페이지(HTTP 카세트)가 없을 때 HTML 파싱 벤치마크에 사용합니다.
+    """
+    n_replies = rng.randint(2, 30) if n_replies is None else n_replies
+    head = ['<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8">',
+            f'<title>synthetic topic {index} - 파이토치 한국 사용자 모임</title>',
+            '<meta name="description" content="%s">' % _make_body(rng, 150)]
+    head += ['<link rel="preload" href="/assets/chunk.%d.js" as="script">' % i for i in range(20)]
+    head.append('<script type="application/json" id="data-preloaded">%s</script>' % ('{"k":"%s"}' % _make_body(rng, 4000)))
+    head.append('</head><body class="crawler">')
+    nav = ['<header><nav class="navigation"><ul>']
+    nav += [f'<li><a href="/c/{i}">{rng.choice(VOCABULARY)}</a></li>' for i in range(40)]
+    nav.append('</ul></nav></header><div id="main-outlet" class="wrap">')
+    posts = []
+    for reply in range(n_replies):
+        paragraphs = ''.join(f'<p>{_make_body(rng, rng.randint(100, 800))}</p>' for _ in range(rng.randint(1, 6)))
+        code = f'<pre><code class="lang-python">{_make_body(rng, 200)}</code></pre>' if rng.random() < 0.3 else ''
+        posts.append(
+            f'<div id="post_{reply + 1}" itemprop="comment" class="topic-body crawler-post">'
+            f'<div class="crawler-post-meta"><span class="creator" itemprop="author"><a href="/u/user{reply}">user{reply}</a></span>'
+            f'<div class="crawler-post-infos"><time class="post-time" datetime="2025-01-01T00:00:00Z" '
+            f'title="2025-01-{1 + reply % 28:02d}T09:{reply % 60:02d}:00Z">1월 {1 + reply % 28}일</time></div></div>'
+            f'<div class="post" itemprop="text">{paragraphs}{code}</div>'
+            f'<div class="crawler-post-infos"><span class="likes"><span class="count">{rng.randint(0, 50)}</span></span></div>'
+            '</div>'
+        )
+    footer = [f'<div class="topic-views"><span class="number">{rng.randint(0, 20000):,}</span></div>', '</div><footer>']
+    footer += [f'<a href="/t/{rng.randint(1, 9999)}">{_make_body(rng, 40)}</a>' for _ in range(30)]
+    footer.append('</footer></body></html>')
+    return ''.join(head + nav + posts + footer)
+
+
+def generate_discourse_pages(n, seed=0):
+    rng = random.Random(seed)
+    return [make_discourse_topic_page(rng, i) for i in range(n)]
@@ -0,0 +1,442 @@
+"""
+인덱싱/저장 핫패스 벤치마크.
+
+사용법:
+    python -m benchmarks.run                              # 1k 코퍼스
+    python -m benchmarks.run --sizes 1000 10000 100000
+    python -m benchmarks.run --save-baseline              # 결과를 benchmarks/baselines.json에 기록
+    python -m benchmarks.run --check --threshold 0.2      # 기준 대비 처리량이 20% 넘게 떨어지거나 최대 메모리가 20% 넘게 늘면 실패(exit 1)
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import nullcontext
+from datetime import datetime
+
+from benchmarks.corpus import generate_corpus, generate_items, generate_discourse_pages
+from src.sources.base_source import BaseSource
+from src.storage.markdown_storage import (MarkdownStorage, FRONTMATTER_PATTERN, save_to_markdown, create_metadata_index,
+                                          scan_metadata, read_indexed_body)
+from src.storage.item import Item, use_body_spill
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCH_DIR, '.corpus')
+RESULTS_PATH = os.path.join(BENCH_DIR, 'results', 'latest.json')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baselines.json')
+CHUNK_SIZE = 1000 # 항목 생성은 측정에서 제외하기 위해 청크 단위로 생성 후 측정
+HTML_PAGES = 100 # HTML 파싱 벤치마크에 사용할 페이지 수
+SPILL_THRESHOLD_CHARS = 65536 # configs/config.yaml의 items.spill_threshold_chars 기본값
+VECTOR_QUERIES = 100 # 벡터 인덱스 검색/관련 항목 벤치마크의 질의 수
+VECTOR_UPDATE_RATIO = 0.01 # 증분 갱신 벤치마크에서 바뀌는 항목 비율
+BODY_PREVIEW_BYTES = 65536 # app.py의 상세 보기 미리보기 크기
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    벤치마크 함수를 등록합니다. 함수는 (ctx) -> [(결과 이름, 처리 개수, 소요 초), ...]를 반환합니다.
+    메모리를 측정하는 벤치마크는 네 번째 값으로 {'peak_bytes': 최대 메모리}를 함께 반환합니다.
+    """
+    def decorator(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return decorator
+
+
+class _FilterOnlySource(BaseSource):
+    def scrape(self):
+        return []
+
+
+@benchmark('save_to_markdown')
+def bench_save_to_markdown(ctx):
+    output_dir = os.path.join(ctx['workdir'], 'save')
+    os.makedirs(output_dir, exist_ok=True)
+    write_seconds = 0.0
+    rewrite_seconds = 0.0
+    items = generate_items(ctx['n'], seed=1)
+    while True:
+        chunk = [item for _, item in zip(range(CHUNK_SIZE), items)]
+        if not chunk:
+            break
+        start = time.perf_counter()
+        for item in chunk:
+            save_to_markdown(item, output_dir)
+        write_seconds += time.perf_counter() - start
+        # 같은 내용을 다시 저장 (변경 없음 -> 쓰기 생략 경로)
+        start = time.perf_counter()
+        for item in chunk:
+            save_to_markdown(item, output_dir)
+        rewrite_seconds += time.perf_counter() - start
+    shutil.rmtree(output_dir)
+    return [('save_to_markdown', ctx['n'], write_seconds),
+            ('save_to_markdown_unchanged', ctx['n'], rewrite_seconds)]
+
+
+@benchmark('create_metadata_index')
+def bench_create_metadata_index(ctx):
+    start = time.perf_counter()
+    create_metadata_index(ctx['corpus_dir'], ctx['metadata_path'])
+    return [('create_metadata_index', ctx['n'], time.perf_counter() - start)]
+
+
+@benchmark('archive_index')
+def bench_archive_index(ctx):
+    """같은 코퍼스를 세그먼트 아카이브로 옮긴 뒤 인덱스를 다시 만드는 시간 (create_metadata_index와 비교)."""
+    from src.storage.archive import SegmentArchive
+    archive_dir = os.path.join(ctx['workdir'], 'archive')
+    empty_dir = os.path.join(ctx['workdir'], 'archive_markdown')
+    os.makedirs(empty_dir, exist_ok=True)
+    if 'archive' not in ctx:
+        archive = SegmentArchive(archive_dir)
+        contents = {}
+        for entry in os.scandir(ctx['corpus_dir']):
+            if entry.name.endswith('.md'):
+                with open(entry.path, 'rb') as f:
+                    contents[entry.name] = f.read()
+            if len(contents) >= CHUNK_SIZE:
+                archive.put_many(contents)
+                contents = {}
+        archive.put_many(contents)
+        ctx['archive'] = archive
+    start = time.perf_counter()
+    create_metadata_index(empty_dir, os.path.join(ctx['workdir'], 'archive_metadata.json'),
+                          archive=SegmentArchive(archive_dir))
+    return [('create_metadata_index.archive', ctx['n'], time.perf_counter() - start)]
+
+
+@benchmark('vector_index')
+def bench_vector_index(ctx):
+    """
+    벡터 인덱스 전체 생성, 일부 항목만 바뀐 뒤의 증분 갱신, 질의 검색과 관련 항목 찾기의 처리량.
+    검색/관련 항목의 처리량은 초당 질의 수입니다 (50ms 이내 = 20 이상).
+    """
+    from src.storage.vector_index import VectorIndex, item_id
+    index_dir = os.path.join(ctx['workdir'], 'vector_index')
+    shutil.rmtree(index_dir, ignore_errors=True)
+    metadata_list = scan_metadata(ctx['corpus_dir'])
+    load_bodies = MarkdownStorage(ctx['corpus_dir']).load_bodies
+    results = []
+
+    index = VectorIndex(index_dir)
+    start = time.perf_counter()
+    index.update(metadata_list, load_bodies)
+    results.append(('vector_index.build', len(metadata_list), time.perf_counter() - start))
+
+    changed = max(1, int(len(metadata_list) * VECTOR_UPDATE_RATIO))
+    updated = [dict(metadata, body_hash=f"changed-{i}") if i < changed else metadata for i, metadata in enumerate(metadata_list)]
+    start = time.perf_counter()
+    VectorIndex(index_dir).update(updated, load_bodies)
+    results.append(('vector_index.update', changed, time.perf_counter() - start))
+
+    index = VectorIndex(index_dir).warm()
+    titles = [str(metadata.get('title') or '') for metadata in metadata_list[:VECTOR_QUERIES]]
+    start = time.perf_counter()
+    for title in titles:
+        index.search(title, k=10)
+    results.append(('vector_index.search', len(titles), time.perf_counter() - start))
+
+    start = time.perf_counter()
+    for metadata in metadata_list[:VECTOR_QUERIES]:
+        index.related(item_id(metadata), k=10)
+    results.append(('vector_index.related', min(VECTOR_QUERIES, len(metadata_list)), time.perf_counter() - start))
+    return results
+
+
+@benchmark('rollups')
+def bench_rollups(ctx):
+    """통계 집계 전체 생성과 일부 항목만 바뀐 뒤의 증분 갱신 처리량 (증분 갱신의 처리량은 바뀐 항목 기준)."""
+    from src.storage.rollups import Rollups
+    rollup_dir = os.path.join(ctx['workdir'], 'rollups')
+    shutil.rmtree(rollup_dir, ignore_errors=True)
+    metadata_list = scan_metadata(ctx['corpus_dir'])
+    results = []
+
+    start = time.perf_counter()
+    Rollups(rollup_dir).update(metadata_list)
+    results.append(('rollups.build', len(metadata_list), time.perf_counter() - start))
+
+    changed = max(1, int(len(metadata_list) * VECTOR_UPDATE_RATIO))
+    updated = [dict(metadata, rating=5, tags=['changed']) if i < changed else metadata for i, metadata in enumerate(metadata_list)]
+    start = time.perf_counter()
+    Rollups(rollup_dir).update(updated)
+    results.append(('rollups.update', changed, time.perf_counter() - start))
+    return results
+
+
+@benchmark('body_load')
+def bench_body_load(ctx):
+    """
+    대시보드 상세 보기의 본문 읽기. legacy는 파일 전체를 읽어 Frontmatter를 정규식으로 찾던 기존 방식이고,
+    indexed는 메타데이터 인덱스의 본문 위치(body_offset, body_length)에서 본문만 읽고 해시로 확인하는 방식이고,
+    preview는 같은 위치에서 상세 보기의 미리보기 크기만큼만 읽는 방식입니다.
+    """
+    metadata_list = scan_metadata(ctx['corpus_dir'])
+    start = time.perf_counter()
+    for metadata in metadata_list:
+        with open(metadata['filepath'], 'r', encoding='utf-8') as f:
+            content = f.read()
+        match = FRONTMATTER_PATTERN.search(content)
+        content[match.end():].strip()
+    results = [('body_load.legacy', len(metadata_list), time.perf_counter() - start)]
+
+    start = time.perf_counter()
+    for metadata in metadata_list:
+        if read_indexed_body(metadata['filepath'], metadata['body_offset'], metadata['body_length'], metadata['body_hash']) is None:
+            raise RuntimeError(f"Indexed body does not match {metadata['filepath']}")
+    results.append(('body_load.indexed', len(metadata_list), time.perf_counter() - start))
+
+    start = time.perf_counter()
+    for metadata in metadata_list:
+        if read_indexed_body(metadata['filepath'], metadata['body_offset'], metadata['body_length'], metadata['body_hash'],
+                             limit=BODY_PREVIEW_BYTES) is None:
+            raise RuntimeError(f"Indexed body does not match {metadata['filepath']}")
+    results.append(('body_load.preview', len(metadata_list), time.perf_counter() - start))
+    return results
+
+
+@benchmark('load_data')
+def bench_load_data(ctx):
+    try:
+        from src.storage.metadata_index import load_metadata_frame
+    except ImportError as e:
+        print(f"Skipping load_data: {e}")
+        return []
+    if not os.path.exists(ctx['metadata_path']):
+        create_metadata_index(ctx['corpus_dir'], ctx['metadata_path'])
+    start = time.perf_counter()
+    load_metadata_frame(ctx['metadata_path'])
+    return [('load_data', ctx['n'], time.perf_counter() - start)]
+
+
+@benchmark('apply_filters')
+def bench_apply_filters(ctx):
+    source = _FilterOnlySource('bench', None, -1, None, None, filter_keywords=["AI", "LLM", "Deep Learning", "Agent"])
+    seconds = 0.0
+    items = generate_items(ctx['n'], seed=2)
+    while True:
+        chunk = [item for _, item in zip(range(CHUNK_SIZE), items)]
+        if not chunk:
+            break
+        start = time.perf_counter()
+        source._apply_filters(chunk)
+        seconds += time.perf_counter() - start
+    return [('apply_filters', ctx['n'], seconds)]
+
+
+@benchmark('peak_memory')
+def bench_peak_memory(ctx):
+    """
+    수집한 항목을 모두 메모리에 둔 채 저장하는 동안의 최대 메모리 (tracemalloc).
+    dict 항목, Item(슬롯), 긴 본문을 임시 파일로 내보낸 Item을 비교합니다.
+    """
+    output_dir = os.path.join(ctx['workdir'], 'peak_memory')
+    variants = [('dict', dict, None), ('item', Item, None), ('item_spill', Item, SPILL_THRESHOLD_CHARS)]
+    results = []
+    for name, factory, threshold in variants:
+        os.makedirs(output_dir, exist_ok=True)
+        spill = use_body_spill(threshold, os.path.join(ctx['workdir'], 'spill')) if threshold else nullcontext()
+        tracemalloc.start()
+        start = time.perf_counter()
+        with spill:
+            items = [factory(item) for item in generate_items(ctx['n'], seed=4)]
+            for item in items:
+                save_to_markdown(item, output_dir)
+            del items
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        shutil.rmtree(output_dir)
+        results.append((f"peak_memory.{name}", ctx['n'], seconds, {'peak_bytes': peak}))
+    return results
+
+
+# 각 실행 모드가 임포트하는 모듈 (main.py + 해당 단계에서 instantiate되는 _target_ 모듈)
+def _mode_modules():
+    from omegaconf import OmegaConf
+    config_dir = os.path.join(os.path.dirname(BENCH_DIR), 'configs')
+    cfg = OmegaConf.load(os.path.join(config_dir, 'config.yaml'))
+    storage_cfg = OmegaConf.load(os.path.join(config_dir, 'storage', 'default.yaml'))
+    module_of = lambda target: target.rsplit('.', 1)[0]
+    return {
+        'cli': [],
+        'index': [module_of(storage_cfg._target_)],
+        'collect': [module_of(source._target_) for source in cfg.sources.values()] + [module_of(cfg.processing.dedup._target_)],
+        'summarize': [module_of(cfg.processing.summarize._target_)],
+    }
+
+
+@benchmark('import_time')
+def bench_import_time(ctx):
+    """모드별 콜드 스타트 임포트 시간 (새 인터프리터에서 main.py와 해당 모드의 모듈을 임포트하는 시간)."""
+    results = []
+    for mode, modules in _mode_modules().items():
+        code = ("import importlib, time, warnings\n"
+                "warnings.simplefilter('ignore')\n"
+                "start = time.perf_counter()\n"
+                "import main\n"
+                f"for name in {modules!r}: importlib.import_module(name)\n"
+                "print(time.perf_counter() - start)")
+        output = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(BENCH_DIR),
+                                capture_output=True, text=True, check=True).stdout
+        results.append((f"import_time.{mode}", 1, float(output.strip().splitlines()[-1])))
+    return results
+
+
+def _load_html_pages(cassette_dir, limit=HTML_PAGES):
+    """기록된 HTTP 카세트에서 Discourse 게시글 페이지를 읽고, 없으면 같은 구조의 합성 페이지를 사용합니다."""
+    pages = []
+    if cassette_dir and os.path.isdir(cassette_dir):
+        from src.net.cassette import Cassette
+        for url, body in Cassette(cassette_dir, mode='replay').iter_exchanges():
+            if '/t/' in url and b'class="post"' in body:
+                pages.append(body.decode('utf-8', errors='replace'))
+            if len(pages) >= limit:
+                break
+    if pages:
+        print(f"html_parse: {len(pages)} recorded pages from {cassette_dir}")
+        return pages
+    print("html_parse: no recorded Discourse pages found (record with http.cassette.mode=record); using synthetic pages")
+    return generate_discourse_pages(limit, seed=3)
+
+
+@benchmark('html_parse')
+def bench_html_parse(ctx):
+    """게시글 상세 추출(extract_post_details)의 파서 백엔드별 처리량. legacy는 기존 전체 트리 html.parser 방식."""
+    from bs4 import BeautifulSoup
+    from src.sources.html_parser import BACKENDS, get_extractor
+    from src.sources.pytorch_kr import extract_post_details
+    if 'html_pages' not in ctx:
+        ctx['html_pages'] = _load_html_pages(ctx.get('cassette_dir'))
+    pages = ctx['html_pages']
+    results = []
+
+    start = time.perf_counter()
+    for html in pages:
+        BeautifulSoup(html, 'html.parser').select_one('div.post').get_text(strip=True)
+    results.append(('html_parse.legacy', len(pages), time.perf_counter() - start))
+
+    for backend in BACKENDS:
+        if get_extractor(backend).backend != backend:
+            continue # 설치되지 않은 백엔드
+        start = time.perf_counter()
+        for html in pages:
+            extract_post_details(html, 'div.post', backend)
+        results.append((f"html_parse.{backend}", len(pages), time.perf_counter() - start))
+    return results
+
+
+def run(sizes, names, repeat, cassette_dir=None):
+    results = {}
+    for n in sizes:
+        corpus_dir = generate_corpus(os.path.join(CORPUS_DIR, str(n)), n)
+        workdir = tempfile.mkdtemp(prefix='omni-bench-')
+        ctx = {'n': n, 'corpus_dir': corpus_dir, 'workdir': workdir, 'cassette_dir': cassette_dir,
+               'metadata_path': os.path.join(workdir, 'metadata.json')}
+        try:
+            for name in names:
+                best = {}
+                for _ in range(repeat):
+                    for result_name, count, seconds, *extra in BENCHMARKS[name](ctx):
+                        if result_name not in best or seconds < best[result_name][1]:
+                            best[result_name] = (count, seconds, extra[0] if extra else {})
+                for result_name, (count, seconds, extra) in best.items():
+                    key = f"{result_name}@{n}"
+                    results[key] = {
+                        'count': count,
+                        'seconds': round(seconds, 6),
+                        'throughput': round(count / seconds, 2) if seconds > 0 else None,
+                        **extra,
+                    }
+                    line = f"{key:<40} {results[key]['throughput']:>14,.1f} items/s  ({seconds:.3f}s)"
+                    if 'peak_bytes' in extra:
+                        line += f"  peak {extra['peak_bytes'] / 2 ** 20:,.1f} MiB"
+                    print(line)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def check(results, baseline, threshold):
+    """기준 대비 처리량이 threshold 비율을 넘게 떨어지거나 최대 메모리가 threshold 비율을 넘게 늘어난 항목 목록을 반환합니다."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if base.get('throughput') and result.get('throughput'):
+            ratio = result['throughput'] / base['throughput']
+            if ratio < 1 - threshold:
+                regressions.append((key, 'throughput', base['throughput'], result['throughput'], ratio))
+        if base.get('peak_bytes') and result.get('peak_bytes'):
+            ratio = result['peak_bytes'] / base['peak_bytes']
+            if ratio > 1 + threshold:
+                regressions.append((key, 'peak_bytes', base['peak_bytes'], result['peak_bytes'], ratio))
+    return regressions
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="omni-collector 성능 벤치마크")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000], help="합성 코퍼스 크기 (예: 1000 10000 100000)")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="실행할 벤치마크")
+    parser.add_argument('--repeat', type=int, default=3, help="반복 횟수 (가장 빠른 결과 사용)")
+    parser.add_argument('--save-baseline', action='store_true', help="결과를 기준값으로 저장")
+    parser.add_argument('--check', action='store_true', help="기준값 대비 회귀 시 exit 1")
+    parser.add_argument('--cassette-dir', default=os.path.join(os.path.dirname(BENCH_DIR), 'results', 'cassettes'),
+                        help="html_parse 벤치마크에 사용할 HTTP 카세트 디렉토리 (http.cassette.mode=record로 기록)")
+    parser.add_argument('--threshold', type=float, default=0.2, help="허용 처리량 감소 비율 (기본 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.only or list(BENCHMARKS), args.repeat, args.cassette_dir)
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    _write_json(RESULTS_PATH, report)
+    print(f"Results written to {RESULTS_PATH}")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update(report, results={**baseline.get('results', {}), **results})
+        _write_json(BASELINE_PATH, baseline)
+        print(f"Baseline updated: {BASELINE_PATH}")
+
+    if args.check:
+        if not os.path.exists(BASELINE_PATH):
+            print(f"Error: No baseline found at {BASELINE_PATH}. Run with --save-baseline first.")
+            return 1
+        with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+        regressions = check(results, baseline, args.threshold)
+        for key, metric, base, current, ratio in regressions:
+            if metric == 'peak_bytes':
+                print(f"REGRESSION {key}: peak {current / 2 ** 20:,.1f} MiB vs baseline {base / 2 ** 20:,.1f} MiB ({ratio:.0%})")
+            else:
+                print(f"REGRESSION {key}: {current:,.1f} items/s vs baseline {base:,.1f} ({ratio:.0%})")
+        if regressions:
+            return 1
+        print("No throughput or peak memory regressions.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,92 +1,412 @@
 import hydra
 from omegaconf import DictConfig, OmegaConf
 import os
+import hashlib
+from contextlib import nullcontext
 from hydra.utils import instantiate
-import json
-import re
-from datetime import datetime
-import yaml
-
-def save_to_markdown(data, output_dir):
-    """
-    수집된 단일 데이터를 마크다운 파일로 저장합니다.
-    """
-    # 파일명으로 사용하기 부적절한 문자 제거
-    filename = re.sub(r'[\\/:"*?<>|]+', '', data['title']) + '.md'
-    filepath = os.path.join(output_dir, filename)
-
-    # YAML Frontmatter 생성
-    frontmatter = "---\n"
-    for key, value in data.items():
-        if key != 'body':
-            # 날짜 객체는 ISO 형식 문자열로 변환하여 저장
-            if isinstance(value, datetime):
-                # Ensure datetime is tz-naive before saving
-                if value.tzinfo is not None and value.tzinfo.utcoffset(value) is not None:
-                    value = value.replace(tzinfo=None)
-                frontmatter += f"{key}: {value.isoformat()}\n"
-            else:
-                frontmatter += f"{key}: {json.dumps(value, ensure_ascii=False)}\n"
-    frontmatter += "---\n\n"
-
-    # 본문 내용
-    body = data.get('body', '')
-
-    # 파일 저장
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(frontmatter + body)
-    print(f"Saved: {filepath}")
-
-def create_metadata_index(markdown_dir, output_file):
-    """
-    마크다운 파일들로부터 메타데이터 인덱스를 생성합니다.
-    """
-    metadata_list = []
-    for filename in os.listdir(markdown_dir):
-        if filename.endswith('.md'):
-            filepath = os.path.join(markdown_dir, filename)
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # YAML Frontmatter 추출
-                match = re.search(r'^---\n(.*?)\n---\n', content, re.DOTALL)
-                if match:
-                    try:
-                        metadata = yaml.safe_load(match.group(1))
-                        metadata['filepath'] = filepath
-                        metadata_list.append(metadata)
-                    except yaml.YAMLError as e:
-                        print(f"Error parsing YAML in {filename}: {e}")
-
-    # published_at 기준으로 최신 날짜순으로 정렬
-    # published_at이 없는 경우를 대비하여 기본값 설정
-    metadata_list.sort(key=lambda x: x.get('published_at', '1970-01-01T00:00:00'), reverse=True)
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(metadata_list, f, ensure_ascii=False, indent=4)
-    print(f"Metadata index created: {output_file}")
-
-def run_collection(cfg: DictConfig):
+from src.storage.markdown_storage import save_to_markdown, save_all_to_markdown, create_metadata_index, read_markdown_file, read_markdown_metadata, markdown_filename
+from src.net.cassette import cassette_from_config
+from src.net.pipeline import fetch_pool_from_config
+from src.storage.journal import journal_from_config
+from src.storage.item import body_spill_from_config
+from hydra.core.hydra_config import HydraConfig
+from src.monitoring import metrics, export_metrics, stage, use_profiler
+
+def collect_source(source):
+    print(f"'{source.name}'에서 데이터 수집 중...")
+    with stage('collect', source=source.name):
+        scraped_data = source.scrape()
+    metrics.inc('items_total', len(scraped_data), stage='collect', source=source.name)
+    return scraped_data
+
+def run_collection(cfg: DictConfig, journal=None, progress_callback=None):
+    if cfg.get('shard') is not None and cfg.shard.enabled:
+        return run_sharded_collection(cfg, journal, progress_callback)
     all_scraped_data = []
-    for source_name, source_cfg in cfg.sources.items():
+    for index, (source_name, source_cfg) in enumerate(cfg.sources.items()):
+        if progress_callback is not None:
+            progress_callback(source_name, index, len(cfg.sources))
+        if journal is not None:
+            finished = journal.source_items(source_name)
+            if finished is not None:
+                # 중단된 이전 실행에서 수집이 끝난 소스는 다시 수집하지 않음
+                print(f"'{source_name}' 수집 결과를 저널에서 복원했습니다 ({len(finished)}개).")
+                all_scraped_data.extend(finished)
+                continue
         source = instantiate(source_cfg)
-        print(f"'{source.name}'에서 데이터 수집 중...")
-        scraped_data = source.scrape()
+        if journal is not None:
+            source.resume_items = journal.collected_items(source_name)
+            source.on_item = lambda item, name=source_name: journal.record_collected(name, item)
+        scraped_data = collect_source(source)
+        if journal is not None:
+            journal.record_source_done(source_name, scraped_data)
         all_scraped_data.extend(scraped_data)
     return all_scraped_data
 
-def run_summarization(cfg: DictConfig, data_to_process: list):
+def _hydra_overrides(exclude=()):
+    # 코디네이터가 시작하는 로컬 작업자에 명령행 설정(http 등)을 그대로 전달
+    try:
+        overrides = HydraConfig.get().overrides.task
+    except ValueError: # 대시보드 등 Hydra 실행 밖에서 호출된 경우
+        return []
+    return [o for o in overrides if not o.lstrip('+~').split('=')[0].startswith(tuple(exclude))]
+
+def run_sharded_collection(cfg: DictConfig, journal=None, progress_callback=None):
+    """
+    shard.enabled이면 run_collection 대신 실행됩니다. 소스마다 shards()로 수집을 나눠 작업 큐(worker.queue_path)에 넣고,
+    shard.local_workers개의 로컬 작업자와 같은 큐를 사용하는 다른 호스트의 작업자(cli.mode=worker)가 샤드를 실행한 결과를
+    소스 순서대로 합쳐 반환합니다. 이후 중복 제거, 저장, 인덱싱은 이 프로세스에서 한 번만 실행됩니다.
+    """
+    from src.scheduling import Worker, ShardCoordinator, SHARD_KIND, job_queue_from_config, spawn_worker
+
+    shard_cfg = cfg.shard
+    restored = {}
+    plan = []
+    for index, (source_name, source_cfg) in enumerate(cfg.sources.items()):
+        if progress_callback is not None:
+            progress_callback(source_name, index, len(cfg.sources))
+        if journal is not None and journal.source_items(source_name) is not None:
+            restored[source_name] = journal.source_items(source_name)
+            print(f"'{source_name}' 수집 결과를 저널에서 복원했습니다 ({len(restored[source_name])}개).")
+            continue
+        source_config = OmegaConf.to_container(source_cfg, resolve=True)
+        source_shards = instantiate(source_cfg).shards(shard_cfg.batch_size)
+        print(f"'{source_name}' 수집을 {len(source_shards)}개 샤드로 나눕니다.")
+        plan.extend((source_name, {**source_config, **override}) for override in source_shards)
+
+    queue = job_queue_from_config(cfg.worker)
+    coordinator = ShardCoordinator(queue, shard_cfg.output_dir, poll_seconds=cfg.worker.poll_seconds)
+    run_id, job_ids = coordinator.submit(plan)
+    worker_args = ['worker.kinds=[shard]', 'worker.pid_path=null', 'metrics.enabled=false',
+                   f'worker.idle_exit_seconds={shard_cfg.local_worker_idle_seconds}',
+                   *_hydra_overrides(exclude=('cli.', 'worker.', 'metrics.'))]
+    local_workers = [spawn_worker(cfg.worker.log_path, worker_args) for _ in range(min(shard_cfg.local_workers, len(job_ids)))]
+    worker = Worker(queue, kinds=[SHARD_KIND], retry_kinds=[SHARD_KIND]) if shard_cfg.coordinator_works else None
+    print(f"Submitted {len(job_ids)} shards (run {run_id}) to {queue.db_path} with {len(local_workers)} local workers.")
+
+    def report(done, total):
+        print(f"Shards finished: {done}/{total}")
+        if progress_callback is not None:
+            progress_callback(f"샤드 {done}/{total}", done, total)
+
+    def stop_local_workers():
+        # 로컬 작업자는 SIGTERM을 받으면 실행 중인 샤드를 큐에 되돌리고 종료
+        for process in local_workers:
+            process.terminate()
+        for process in local_workers:
+            process.wait()
+
+    try:
+        results = coordinator.wait(job_ids, worker, lambda job, _: run_shard_job(cfg, job['payload'], None, collect_metrics=False),
+                                   progress_callback=report)
+    except BaseException:
+        # 로컬 작업자가 되돌린 샤드까지 취소되도록 작업자를 먼저 종료
+        stop_local_workers()
+        coordinator.cancel(job_ids)
+        raise
+    stop_local_workers()
+
+    collected = {}
+    for job, items in results:
+        collected.setdefault(job['payload']['source'], []).extend(items)
+        if job['result'] and job['result'].get('metrics'):
+            metrics.merge(job['result']['metrics']) # 다른 프로세스에서 실행된 샤드의 메트릭
+    coordinator.cleanup(run_id)
+
+    all_scraped_data = []
+    for source_name in cfg.sources:
+        if source_name in restored:
+            all_scraped_data.extend(restored[source_name])
+            continue
+        items = collected.get(source_name, [])
+        if journal is not None:
+            journal.record_source_done(source_name, items)
+        all_scraped_data.extend(items)
+    return all_scraped_data
+
+def run_shard_job(cfg: DictConfig, payload, report, collect_metrics=True):
+    """
+    분산 수집 샤드 하나를 실행합니다. 샤드의 소스 설정으로 소스를 만들어 수집하고 결과를 payload['output']에 기록합니다.
+    다른 프로세스에서 실행되면(collect_metrics) 이 샤드의 메트릭을 결과에 담아 코디네이터가 합칠 수 있게 합니다.
+    """
+    from src.scheduling import write_shard_output
+
+    if collect_metrics:
+        metrics.reset()
+    source = instantiate(OmegaConf.create(payload['config']))
+    items = collect_source(source)
+    write_shard_output(payload['output'], items)
+    result = {'source': payload['source'], 'count': len(items)}
+    if collect_metrics:
+        result['metrics'] = metrics.snapshot()
+    return result
+
+def run_deduplication(cfg: DictConfig, data_to_process: list, deduplicator=None, storage=None):
+    """
+    중복을 합친 항목 리스트를 반환합니다. storage를 넘기면 이전 실행에서 저장된 항목과 중복인 항목의
+    소스/URL을 저장된 항목에 합쳐 다시 저장합니다.
+    """
+    dedup_cfg = cfg.processing.get('dedup')
+    if dedup_cfg is None or not dedup_cfg.enabled:
+        return data_to_process
+    if deduplicator is None:
+        deduplicator = instantiate(dedup_cfg)
+    with stage('dedup'):
+        return deduplicator.deduplicate(data_to_process, storage)
+
+def run_summarization(cfg: DictConfig, data_to_process: list, summarizer=None, journal=None):
     if cfg.processing.summarize.enabled:
         print("요약 기능 활성화됨. 데이터 처리 중...")
-        summarizer = instantiate(cfg.processing.summarize)
+        if summarizer is None:
+            summarizer = instantiate(cfg.processing.summarize)
+        resumed = []
+        item_callback = None
+        if journal is not None:
+            # 중단된 이전 실행에서 요약이 끝난 항목은 다시 요청하지 않음
+            pending = []
+            for item in data_to_process:
+                summarized_item = journal.summarized_item(item)
+                if summarized_item is not None:
+                    resumed.append(summarized_item)
+                else:
+                    pending.append(item)
+            if resumed:
+                print(f"요약 {len(resumed)}개를 저널에서 복원했습니다.")
+            data_to_process = pending
+            item_callback = journal.record_summarized
         # Pass the selected_prompt_name from config to summarize_data
-        processed_data = summarizer.summarize_data(data_to_process, cfg.processing.summarize.selected_prompt_name)
-        return processed_data
+        with stage('summarize'):
+            processed_data = summarizer.summarize_data(data_to_process, cfg.processing.summarize.selected_prompt_name,
+                                                       item_callback=item_callback)
+        return resumed + processed_data
     else:
         print("요약 기능이 비활성화되어 있습니다.")
         return data_to_process
 
-@hydra.main(config_path="configs", config_name="config", version_base=None)
-def cli_main(cfg: DictConfig) -> None:
+def load_pending_items(storage, selector, input_files=None, metadata_path=None):
+    """
+    요약이 필요한 항목만 골라 읽습니다 (src/processing/pending.py).
+    input_files가 없으면 저장소의 메타데이터 인덱스에서 고르고, 있으면 각 마크다운 파일의 본문 해시를
+    저장소에 요약되어 있는 같은 항목(같은 파일명)의 요약 기록과 비교합니다.
+    metadata_path(이전에 만든 metadata.json)를 넘기면 그 이후 바뀐 항목만 다시 읽어 메타데이터 인덱스를 만듭니다.
+    """
+    from src.processing.pending import item_id
+
+    with stage('select'):
+        stored = storage.load_metadata(metadata_path)
+        if input_files is None:
+            selected, reasons = selector.select(stored)
+            total = len(stored)
+        else:
+            candidates = [metadata for metadata in map(read_markdown_metadata, input_files) if metadata is not None]
+            selected, reasons = selector.select(candidates, summarized={item_id(metadata): metadata for metadata in stored},
+                                                key=lambda metadata: markdown_filename(str(metadata.get('title'))))
+            total = len(candidates)
+    detail = ', '.join(f"{reason} {count}" for reason, count in sorted(reasons.items()))
+    print(f"요약 대상 {len(selected)}/{total}개" + (f" ({detail})" if detail else ""))
+    metrics.inc('items_total', total - len(selected), stage='select', result='up_to_date')
+    metrics.inc('items_total', len(selected), stage='select', result='pending')
+
+    if input_files is None:
+        return storage.load_items([item_id(metadata) for metadata in selected])
+    items = (read_markdown_file(metadata['filepath']) for metadata in selected)
+    return [item for item in items if item is not None]
+
+def run_save(storage, items):
+    """
+    저장소에 항목을 저장하고 new/updated/unchanged 개수를 메트릭으로 기록합니다.
+    """
+    with stage('save'):
+        counts = storage.save_items(items)
+    for result, count in counts.items():
+        metrics.inc('items_total', count, stage='save', result=result)
+    return counts
+
+def run_indexing(storage, metadata_path):
+    with stage('index'):
+        storage.create_index(metadata_path)
+
+def run_watch(cfg: DictConfig, storage, metadata_path):
+    """
+    Obsidian 볼트를 감시하며 변경된 노트만 요약, 저장, 인덱싱합니다.
+    """
+    if 'obsidian' not in cfg.sources:
+        print("Error: 'watch' mode requires an 'obsidian' source in config.yaml.")
+        return
+
+    source = instantiate(cfg.sources.obsidian)
+
+    def on_change(notes):
+        processed_data = run_summarization(cfg, notes)
+        run_save(storage, processed_data)
+        if cfg.indexing.enabled:
+            run_indexing(storage, metadata_path)
+
+    source.watch(on_change)
+
+def _item_fingerprint(item):
+    return hashlib.sha1('\0'.join(str(item.get(key) or '') for key in ('title', 'url', 'body')).encode('utf-8')).hexdigest()
+
+def run_daemon(cfg: DictConfig, storage, metadata_path):
+    """
+    소스별 주기(daemon.schedules)에 따라 수집 작업을 영구 작업 큐(daemon.queue_path)에 넣고 실행하는 장기 실행 모드입니다.
+    소스 객체, 중복 제거 지문 인덱스, 요약기, 저장소(와 메타데이터 인덱스 캐시), HTTP 세션은 실행 간에 재사용합니다.
+    """
+    from src.scheduling import JobQueue, Scheduler
+
+    daemon_cfg = cfg.daemon
+    queue = JobQueue(daemon_cfg.queue_path, lease_seconds=daemon_cfg.lease_seconds,
+                     max_attempts=daemon_cfg.max_attempts, retry_delay_seconds=daemon_cfg.retry_delay_seconds)
+    schedules = {}
+    for name in cfg.sources:
+        schedule = daemon_cfg.schedules.get(name) or {}
+        schedules[name] = {
+            'interval_seconds': schedule.get('interval_seconds', daemon_cfg.default_interval_seconds),
+            'jitter_seconds': schedule.get('jitter_seconds', daemon_cfg.default_jitter_seconds),
+        }
+
+    sources = {}
+    dedup_cfg = cfg.processing.get('dedup')
+    deduplicator = instantiate(dedup_cfg) if dedup_cfg is not None and dedup_cfg.enabled else None
+    summarizer = instantiate(cfg.processing.summarize) if daemon_cfg.summarize and cfg.processing.summarize.enabled else None
+    fingerprints = {} # URL -> 마지막으로 처리한 항목 지문. 바뀌지 않은 항목은 다시 처리하지 않음
+
+    def handle(job):
+        name = job['key']
+        if name not in cfg.sources:
+            print(f"Skipping job for unknown source '{name}'.")
+            return {'skipped': True}
+        if name not in sources:
+            sources[name] = instantiate(cfg.sources[name])
+        scraped_data = collect_source(sources[name])
+
+        # 중복 제거/요약이 항목을 변경하기 전에 지문을 계산
+        current = {item.get('url'): _item_fingerprint(item) for item in scraped_data}
+        changed = [item for item in scraped_data if fingerprints.get(item.get('url')) != current[item.get('url')]]
+        processed = run_deduplication(cfg, changed, deduplicator, storage)
+        if summarizer is not None:
+            processed = run_summarization(cfg, processed, summarizer)
+        counts = run_save(storage, processed) if processed else {'new': 0, 'updated': 0, 'unchanged': 0}
+        merged_into_stored = deduplicator.stored_updates if deduplicator is not None else 0
+        if cfg.indexing.enabled and (counts['new'] or counts['updated'] or merged_into_stored):
+            run_indexing(storage, metadata_path)
+        fingerprints.update(current)
+
+        # 데몬이 실행 중에도 대시보드/Prometheus가 최신 메트릭을 볼 수 있도록 작업마다 내보냄
+        export_metrics_from_config(cfg, quiet=True)
+        return {'collected': len(scraped_data), 'changed': len(changed), **counts}
+
+    scheduler = Scheduler(queue, schedules, poll_seconds=daemon_cfg.poll_seconds)
+    for name, schedule in schedules.items():
+        print(f"Scheduling '{name}' every {schedule['interval_seconds']}s (jitter {schedule['jitter_seconds']}s)")
+    try:
+        scheduler.run_forever(handle)
+    finally:
+        queue.close()
+
+def run_dashboard_job(cfg: DictConfig, payload, report):
+    """
+    대시보드에서 제출한 작업(수집 -> 중복 제거 -> 저장 -> 요약 -> 인덱싱)을 실행합니다.
+    payload: {'config': 작업 설정, 'sources': 수집할 소스, 'summarize': bool, 'prompt': 프롬프트 이름, 'index': bool}
+    진행 상황은 report(dict)로 작업 큐에 기록되고, 대시보드가 이를 주기적으로 읽어 표시합니다.
+    """
+    job_cfg = OmegaConf.create(payload['config'])
+    selected_sources = [name for name in payload.get('sources', []) if name in job_cfg.sources]
+    do_summarize = payload.get('summarize', False)
+    do_index = payload.get('index', False)
+    prompt_name = payload.get('prompt') or job_cfg.processing.summarize.selected_prompt_name
+    metadata_path = os.path.join(os.getcwd(), 'results', 'metadata.json')
+    storage = instantiate(job_cfg.storage)
+    metrics.reset() # 이번 작업의 메트릭만 집계
+
+    progress = {'step': 0, 'total_steps': 3, 'text': "작업 시작...", 'current': 0, 'total': 0, 'messages': []}
+
+    def update(**changes):
+        progress.update(changes)
+        report(progress)
+
+    def message(level, text):
+        progress['messages'].append([level, text])
+        report(progress)
+
+    update()
+    scraped_data = []
+    try:
+        # 1. 수집
+        if selected_sources:
+            job_cfg.sources = OmegaConf.create({name: job_cfg.sources[name] for name in selected_sources})
+            update(step=1, text="데이터 수집 중...")
+            scraped_data = run_collection(job_cfg, progress_callback=lambda name, index, total: update(
+                text=f"데이터 수집 중... ({name})", current=index, total=total))
+            scraped_data = run_deduplication(job_cfg, scraped_data, storage=storage)
+            save_counts = run_save(storage, scraped_data)
+            message('success', f"{len(scraped_data)}개 항목 수집 완료. (신규 {save_counts['new']}, 변경 {save_counts['updated']}, "
+                               f"변경 없음 {save_counts['unchanged']})")
+        else:
+            message('warning', "수집할 소스가 선택되지 않았습니다. 수집 작업을 건너뜁니다.")
+
+        # 2. 요약
+        if do_summarize:
+            update(step=2, text="데이터 요약 중...", current=0, total=0)
+            processed_data = scraped_data
+            summarizer = instantiate(job_cfg.processing.summarize)
+            if not processed_data:
+                message('warning', "수집된 새 데이터가 없습니다. 저장소에서 요약이 필요한 항목만 요약합니다.")
+                processed_data = load_pending_items(storage, summarizer.pending_selector(prompt_name), metadata_path=metadata_path)
+            with stage('summarize'):
+                summarized_items = summarizer.summarize_data(
+                    processed_data, prompt_name,
+                    progress_callback=lambda current, total: update(text=f"항목 요약 중... ({current}/{total})",
+                                                                    current=current, total=total)
+                )
+            save_counts = run_save(storage, summarized_items)
+            message('success', f"데이터 요약 완료. (신규 {save_counts['new']}, 변경 {save_counts['updated']}, "
+                               f"변경 없음 {save_counts['unchanged']})")
+        else:
+            message('info', "요약 작업이 비활성화되었습니다.")
+
+        # 3. 인덱싱
+        if do_index:
+            update(step=3, text="메타데이터 인덱스 재생성 중...", current=0, total=0)
+            run_indexing(storage, metadata_path)
+            message('success', "메타데이터 인덱스 재생성 완료.")
+        else:
+            message('info', "인덱스 재생성 작업이 비활성화되었습니다.")
+
+        update(step=3, text="모든 작업 완료!", current=0, total=0)
+    finally:
+        export_metrics_from_config(job_cfg, quiet=True)
+    return {'collected': len(scraped_data), 'messages': progress['messages']}
+
+def run_worker(cfg: DictConfig):
+    """
+    작업 큐(worker.queue_path)의 대시보드 작업과 분산 수집 샤드(worker.kinds)를 실행하는 백그라운드 작업자 모드입니다.
+    대시보드의 '작업 실행' 버튼이나 분산 수집 코디네이터가 필요할 때 시작하며, 다른 호스트에서 직접 실행할 수도 있습니다.
+    worker.idle_exit_seconds 동안 작업이 없으면 종료합니다.
+    """
+    from src.scheduling import Worker, SHARD_KIND, job_queue_from_config, worker_pid, write_pid_file, remove_pid_file
+
+    worker_cfg = cfg.worker
+    pid_path = worker_cfg.pid_path
+    if pid_path:
+        pid = worker_pid(pid_path)
+        if pid is not None and pid != os.getpid():
+            print(f"Worker already running (pid {pid}).")
+            return
+        write_pid_file(pid_path)
+    handlers = {'dashboard': run_dashboard_job, SHARD_KIND: run_shard_job}
+    queue = job_queue_from_config(worker_cfg)
+    worker = Worker(queue, kinds=list(worker_cfg.kinds), poll_seconds=worker_cfg.poll_seconds,
+                    idle_exit_seconds=worker_cfg.idle_exit_seconds, retry_kinds=[SHARD_KIND])
+    print(f"Worker started (pid {os.getpid()}), waiting for {', '.join(worker_cfg.kinds)} jobs in {queue.db_path}")
+    try:
+        worker.run_forever(lambda job, report: handlers[job['kind']](cfg, job['payload'], report))
+    finally:
+        queue.close()
+        if pid_path:
+            remove_pid_file(pid_path)
+
+def run_cli(cfg: DictConfig) -> None:
     output_dir = os.path.join(os.getcwd(), 'results')
     markdown_dir = os.path.join(output_dir, 'markdown')
     os.makedirs(markdown_dir, exist_ok=True)
@@ -94,55 +414,101 @@ def cli_main(cfg: DictConfig) -> None:
 
     mode = cfg.cli.mode
     input_path = cfg.cli.input
+    storage = instantiate(cfg.storage)
 
-    if mode == "collect" or mode == "all":
-        print("Collecting data...")
-        scraped_data = run_collection(cfg)
-        for data in scraped_data:
-            save_to_markdown(data, markdown_dir)
+    if mode == "daemon":
+        run_daemon(cfg, storage, metadata_path)
+        print("Omni-Collector 작업 완료.")
+        return
 
-    if mode == "summarize":
-        if not input_path:
-            print("Error: 'input' parameter is required for 'summarize' mode in config.yaml or as a command-line override.")
-            return
-        
-        data_to_summarize = []
-        if os.path.isdir(input_path):
-            for filename in os.listdir(input_path):
-                if filename.endswith('.md'):
-                    filepath = os.path.join(input_path, filename)
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        match = re.search(r'^---\n(.*?)\n---\n', content, re.DOTALL)
-                        if match:
-                            metadata = yaml.safe_load(match.group(1))
-                            body = content[match.end():].strip()
-                            metadata['body'] = body
-                            data_to_summarize.append(metadata)
-        elif os.path.isfile(input_path) and input_path.endswith('.md'):
-            with open(input_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                match = re.search(r'^---\n(.*?)\n---\n', content, re.DOTALL)
-                if match:
-                    metadata = yaml.safe_load(match.group(1))
-                    body = content[match.end():].strip()
-                    metadata['body'] = body
-                    data_to_summarize.append(metadata)
-        else:
-            print(f"Error: Invalid input for summarize mode: {input_path}. Must be a .md file or a directory containing .md files.")
-            return
+    if mode == "worker":
+        run_worker(cfg)
+        print("Omni-Collector 작업 완료.")
+        return
+
+    if mode == "watch":
+        print("Watching Obsidian vault for changes...")
+        run_watch(cfg, storage, metadata_path)
+        print("Omni-Collector 작업 완료.")
+        return
+
+    # 수집/요약 결과를 항목마다 저널에 기록하여 중단되어도 cli.resume=true로 이어서 실행할 수 있게 함
+    with journal_from_config(cfg.cli) as journal:
+        if mode == "collect" or mode == "all":
+            print("Collecting data...")
+            scraped_data = run_collection(cfg, journal)
+            scraped_data = run_deduplication(cfg, scraped_data, storage=storage)
+            run_save(storage, scraped_data)
+
+        if mode == "summarize":
+            input_files = None # 입력이 지정되지 않으면 설정된 저장소의 항목을 요약
+            if input_path and os.path.isdir(input_path):
+                input_files = [os.path.join(input_path, filename) for filename in os.listdir(input_path) if filename.endswith('.md')]
+            elif input_path and os.path.isfile(input_path) and input_path.endswith('.md'):
+                input_files = [input_path]
+            elif input_path:
+                print(f"Error: Invalid input for summarize mode: {input_path}. Must be a .md file or a directory containing .md files.")
+                return
+
+            summarizer = None
+            if cfg.processing.summarize.enabled:
+                # 요약이 없거나, 다른 프롬프트/모델로 요약했거나, 요약 후 본문이 바뀐 항목만 읽어서 요약
+                summarizer = instantiate(cfg.processing.summarize)
+                selector = summarizer.pending_selector(cfg.processing.summarize.selected_prompt_name)
+                data_to_summarize = load_pending_items(storage, selector, input_files, metadata_path)
+            elif input_files is None:
+                data_to_summarize = storage.load_items()
+            else:
+                data_to_summarize = [item for item in map(read_markdown_file, input_files) if item is not None]
+
+            summarized_data = run_summarization(cfg, data_to_summarize, summarizer, journal=journal)
+            # 요약된 내용을 다시 저장소에 저장
+            run_save(storage, summarized_data)
+
+        if mode == "index" or mode == "all":
+            print("Creating metadata index...")
+            run_indexing(storage, metadata_path)
 
-        summarized_data = run_summarization(cfg, data_to_summarize)
-        # 요약된 내용을 다시 마크다운 파일에 저장
-        for data in summarized_data:
-            save_to_markdown(data, markdown_dir)
+        if mode == "export":
+            print("Exporting items to markdown...")
+            storage.export_markdown(input_path or None)
 
-    if mode == "index" or mode == "all":
-        print("Creating metadata index...")
-        create_metadata_index(markdown_dir, metadata_path)
+        if mode == "archive":
+            print("Archiving old items...")
+            storage.archive_items()
+            run_indexing(storage, metadata_path)
 
     print("Omni-Collector 작업 완료.")
 
+def profiler_from_config(cfg: DictConfig):
+    """
+    cli.profile이 켜져 있으면 단계별 프로파일 결과를 Hydra 실행 디렉토리의 profile/ 아래에 저장하는 컨텍스트를 반환합니다.
+    """
+    if not cfg.cli.get('profile', False):
+        return nullcontext()
+    output_dir = os.path.join(HydraConfig.get().runtime.output_dir, 'profile')
+    return use_profiler(output_dir, top_n=cfg.cli.get('profile_top_n', 20), memory=cfg.cli.get('profile_memory', True))
+
+def export_metrics_from_config(cfg: DictConfig, quiet=False):
+    metrics_cfg = cfg.get('metrics')
+    if metrics_cfg is not None and metrics_cfg.enabled:
+        export_metrics(metrics_cfg.json_path, metrics_cfg.prometheus_path, quiet=quiet)
+
+@hydra.main(config_path="configs", config_name="config", version_base=None)
+def cli_main(cfg: DictConfig) -> None:
+    from src.net.politeness import politeness_from_config # requests를 불러오므로 실행할 때 임포트
+
+    # http.cassette.mode가 record/replay이면 모든 HTTP 요청을 카세트로 기록하거나 재생
+    # 모든 소스의 요청은 호스트별 politeness 제한(http.politeness)을 공유
+    # 긴 본문은 임시 파일로 내보내 수집~저장 동안 메모리에 쌓이지 않도록 함(items.spill_threshold_chars)
+    try:
+        with cassette_from_config(cfg.get('http', {}).get('cassette')), politeness_from_config(cfg.get('http')), \
+                body_spill_from_config(cfg.get('items')), fetch_pool_from_config(cfg.get('http')), profiler_from_config(cfg):
+            run_cli(cfg)
+    finally:
+        # 실패한 실행도 어디서 시간이 쓰였는지 확인할 수 있도록 항상 메트릭을 내보냄
+        export_metrics_from_config(cfg)
+
 if __name__ == "__main__":
     cli_main()
 
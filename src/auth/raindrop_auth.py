@@ -1,10 +1,13 @@
 import os
 from dotenv import load_dotenv
+from src.net.cassette import is_replaying
 
 class RaindropAuthenticator:
     def __init__(self):
         load_dotenv()
         self.access_token = os.getenv("RAINDROP_ACCESS_TOKEN")
+        if not self.access_token and is_replaying():
+            self.access_token = "replay" # 카세트에는 인증 정보가 저장되지 않으므로 임의의 토큰 사용
         if not self.access_token:
             print("Warning: RAINDROP_ACCESS_TOKEN not found in .env. Raindrop API calls will fail.")
 
@@ -1,11 +1,13 @@
 import os
 from dotenv import load_dotenv
-from googleapiclient.discovery import build
+from src.net.cassette import get_active_cassette, is_replaying
 
 class YouTubeAuthenticator:
     def __init__(self):
         load_dotenv()
         self.api_key = os.getenv("YOUTUBE_API_KEY")
+        if not self.api_key and is_replaying():
+            self.api_key = "replay" # 카세트에는 인증 정보가 저장되지 않으므로 임의의 키 사용
         if not self.api_key:
             print("Warning: YOUTUBE_API_KEY not found in .env. YouTube API calls will fail.")
         self.youtube_service = None
@@ -14,5 +16,10 @@ class YouTubeAuthenticator:
         if not self.api_key:
             return None
         if self.youtube_service is None:
-            self.youtube_service = build("youtube", "v3", developerKey=self.api_key)
+            cassette = get_active_cassette()
+            http = cassette.httplib2_http() if cassette is not None else None
+            from googleapiclient.discovery import build # 무거운 모듈이므로 YouTube 수집 시에만 임포트
+            # google-api-python-client 2.x에 포함된 디스커버리 문서를 사용 (네트워크 요청 없음)
+            self.youtube_service = build("youtube", "v3", developerKey=self.api_key, http=http,
+                                         static_discovery=True, cache_discovery=False)
         return self.youtube_service
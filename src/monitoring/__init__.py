@@ -0,0 +1,2 @@
+from .metrics import MetricsRegistry, metrics, export_metrics
+from .profiler import StageProfiler, stage, use_profiler, get_active_profiler
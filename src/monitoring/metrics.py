@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import bisect
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# 지연 시간 히스토그램 버킷 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_PREFIX = 'omni_collector_'
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_key, extra=None):
+    pairs = list(label_key) + (list(extra) if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+class MetricsRegistry:
+    """
+    실행 중 카운터와 히스토그램을 모으는 레지스트리입니다.
+    레이블(source, stage 등)별로 값을 따로 집계하며, 실행이 끝나면 JSON과 Prometheus 텍스트 형식으로 내보냅니다.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counters = {}   # name -> {label_key: value}
+            self._histograms = {} # name -> {label_key: [bucket counts..., sum, count]}
+            self.started_at = datetime.now()
+
+    def inc(self, name, value=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0] * (len(self.buckets) + 2)
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """블록의 실행 시간을 name 히스토그램에 초 단위로 기록합니다."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def merge(self, snapshot):
+        """다른 프로세스(분산 수집 작업자 등)에서 만든 snapshot()의 값을 더합니다."""
+        with self._lock:
+            for name, entries in snapshot.get('counters', {}).items():
+                series = self._counters.setdefault(name, {})
+                for entry in entries:
+                    key = _label_key(entry['labels'])
+                    series[key] = series.get(key, 0) + entry['value']
+            for name, entries in snapshot.get('histograms', {}).items():
+                series = self._histograms.setdefault(name, {})
+                for entry in entries:
+                    key = _label_key(entry['labels'])
+                    state = series.get(key)
+                    if state is None:
+                        state = series[key] = [0] * (len(self.buckets) + 2)
+                    # 누적 버킷 값을 구간별 개수로 되돌려 더함 (같은 버킷 경계를 사용한다고 가정)
+                    previous = 0
+                    for index, bound in enumerate(self.buckets):
+                        cumulative = entry['buckets'].get(str(bound), previous)
+                        state[index] += cumulative - previous
+                        previous = cumulative
+                    state[-2] += entry['sum']
+                    state[-1] += entry['count']
+
+    def snapshot(self):
+        """현재까지 집계된 값을 JSON으로 직렬화할 수 있는 dict로 반환합니다."""
+        with self._lock:
+            counters = {
+                name: [{'labels': dict(key), 'value': value} for key, value in sorted(series.items())]
+                for name, series in sorted(self._counters.items())
+            }
+            histograms = {}
+            for name, series in sorted(self._histograms.items()):
+                histograms[name] = []
+                for key, state in sorted(series.items()):
+                    cumulative, buckets = 0, {}
+                    for bound, count in zip(self.buckets, state):
+                        cumulative += count
+                        buckets[str(bound)] = cumulative
+                    histograms[name].append({
+                        'labels': dict(key),
+                        'count': state[-1],
+                        'sum': round(state[-2], 6),
+                        'buckets': buckets,
+                    })
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'counters': counters,
+            'histograms': histograms,
+        }
+
+    def to_prometheus(self, snapshot=None):
+        """Prometheus 텍스트 노출 형식(0.0.4)으로 변환합니다."""
+        snapshot = snapshot or self.snapshot()
+        lines = []
+        for name, series in snapshot['counters'].items():
+            metric = METRIC_PREFIX + name
+            lines.append(f"# TYPE {metric} counter")
+            for entry in series:
+                lines.append(f"{metric}{_format_labels(_label_key(entry['labels']))} {entry['value']}")
+        for name, series in snapshot['histograms'].items():
+            metric = METRIC_PREFIX + name
+            lines.append(f"# TYPE {metric} histogram")
+            for entry in series:
+                key = _label_key(entry['labels'])
+                for bound, count in entry['buckets'].items():
+                    lines.append(f"{metric}_bucket{_format_labels(key, [('le', bound)])} {count}")
+                lines.append(f"{metric}_bucket{_format_labels(key, [('le', '+Inf')])} {entry['count']}")
+                lines.append(f"{metric}_sum{_format_labels(key)} {entry['sum']}")
+                lines.append(f"{metric}_count{_format_labels(key)} {entry['count']}")
+        return '\n'.join(lines) + '\n'
+
+
+# 프로세스 전역 레지스트리
+metrics = MetricsRegistry()
+
+
+def _write_atomic(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def export_metrics(json_path=None, prometheus_path=None, registry=None, quiet=False):
+    """
+    레지스트리 내용을 JSON 파일과 Prometheus 텍스트 파일(node_exporter textfile collector 등에서 사용)로 저장합니다.
+    quiet가 True이면 저장 메시지를 출력하지 않습니다 (데몬 모드에서 작업마다 내보낼 때).
+    """
+    registry = registry or metrics
+    snapshot = registry.snapshot()
+    if json_path:
+        _write_atomic(json_path, json.dumps(snapshot, ensure_ascii=False, indent=2))
+        if not quiet:
+            print(f"Metrics written to {json_path}")
+    if prometheus_path:
+        _write_atomic(prometheus_path, registry.to_prometheus(snapshot))
+        if not quiet:
+            print(f"Metrics written to {prometheus_path}")
+    return snapshot
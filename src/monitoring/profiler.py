@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from .metrics import metrics
+
+_active_profiler = None
+
+# 플레임그래프 생성 시 이보다 작은 비중(초)의 호출 경로는 생략
+MIN_FOLDED_SECONDS = 1e-6
+MAX_FOLDED_DEPTH = 128
+
+
+def _func_label(func):
+    filename, lineno, name = func
+    if filename == '~':
+        return name # 내장 함수 (예: <built-in method time.sleep>)
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def folded_stacks(stats):
+    """
+    pstats.Stats를 flamegraph.pl / speedscope에서 읽을 수 있는 folded stack 형식(`a;b;c 마이크로초`) 줄로 변환합니다.
+    cProfile은 호출자-피호출자 관계만 기록하므로, 각 경로의 시간은 호출자별 누적 시간 비율로 나누어 근사합니다.
+    """
+    children = defaultdict(dict)
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, edge in callers.items():
+            children[caller][func] = edge
+    roots = [func for func, (_, _, _, _, callers) in stats.stats.items() if not callers]
+
+    folded = defaultdict(float)
+
+    def walk(func, stack, fraction):
+        _, _, tottime, cumtime, _ = stats.stats[func]
+        stack = stack + (_func_label(func),)
+        if tottime * fraction > 0:
+            folded[';'.join(stack)] += tottime * fraction
+        if len(stack) >= MAX_FOLDED_DEPTH:
+            return
+        for child, (_, _, _, edge_cumtime) in children[func].items():
+            child_cumtime = stats.stats[child][3]
+            if child == func or child_cumtime <= 0:
+                continue
+            child_fraction = fraction * edge_cumtime / child_cumtime
+            if child_cumtime * child_fraction >= MIN_FOLDED_SECONDS and _func_label(child) not in stack:
+                walk(child, stack, child_fraction)
+
+    for root in roots:
+        walk(root, (), 1.0)
+    return [f"{stack} {int(seconds * 1e6)}" for stack, seconds in sorted(folded.items()) if seconds * 1e6 >= 1]
+
+
+class StageProfiler:
+    """
+    실행 단계(소스별 수집, 요약, 저장, 인덱싱 등)마다 cProfile과 tracemalloc으로 CPU 시간과 최대 메모리를 따로 측정합니다.
+    같은 이름의 단계가 여러 번 실행되면(watch 모드 등) 결과를 합산합니다.
+    """
+
+    def __init__(self, output_dir, top_n=20, memory=True):
+        self.output_dir = os.path.abspath(output_dir)
+        self.top_n = top_n
+        self.memory = memory
+        self.stages = {} # name -> {'profile', 'wall_seconds', 'calls', 'peak_memory_bytes', 'snapshot'}
+        self._current = None
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+
+    @contextmanager
+    def profile(self, name):
+        if self._current is not None:
+            # 단계가 중첩되면 바깥 단계에 포함하여 측정 (cProfile은 동시에 하나만 활성화 가능)
+            yield
+            return
+        entry = self.stages.setdefault(name, {
+            'profile': cProfile.Profile(), 'wall_seconds': 0.0, 'calls': 0, 'peak_memory_bytes': 0, 'snapshot': None,
+        })
+        self._current = name
+        if self.memory:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        entry['profile'].enable()
+        try:
+            yield
+        finally:
+            entry['profile'].disable()
+            entry['wall_seconds'] += time.perf_counter() - start
+            entry['calls'] += 1
+            if self.memory:
+                _, peak = tracemalloc.get_traced_memory()
+                if peak - baseline >= entry['peak_memory_bytes']:
+                    entry['peak_memory_bytes'] = peak - baseline
+                    # 단계 종료 시점에 살아 있는 할당 (최대 메모리를 기록한 실행의 스냅샷)
+                    entry['snapshot'] = tracemalloc.take_snapshot()
+            self._current = None
+
+    def finish(self):
+        """단계별 pstats, folded stack, 메모리 스냅샷과 summary.json을 저장하고 핫스팟 표를 출력합니다."""
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if not self.stages:
+            return {}
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        summary = {}
+        for name, entry in self.stages.items():
+            stats = pstats.Stats(entry['profile'])
+            stats.dump_stats(os.path.join(self.output_dir, f"{name}.pstats"))
+            with open(os.path.join(self.output_dir, f"{name}.folded"), 'w', encoding='utf-8') as f:
+                f.write('\n'.join(folded_stacks(stats)) + '\n')
+            if entry['snapshot'] is not None:
+                entry['snapshot'].dump(os.path.join(self.output_dir, f"{name}.tracemalloc"))
+            summary[name] = {
+                'wall_seconds': round(entry['wall_seconds'], 6),
+                'profiled_seconds': round(stats.total_tt, 6),
+                'calls': entry['calls'],
+                'peak_memory_bytes': entry['peak_memory_bytes'] if self.memory else None,
+            }
+            self._print_hotspots(name, stats, summary[name])
+
+        with open(os.path.join(self.output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"Profile written to {self.output_dir}")
+        return summary
+
+    def _print_hotspots(self, name, stats, summary):
+        peak = summary['peak_memory_bytes']
+        peak_text = f", peak memory {peak / 1024 / 1024:.1f} MiB" if peak is not None else ""
+        print(f"\n[profile] {name}: {summary['wall_seconds']:.3f}s wall{peak_text}")
+        print(f"  {'ncalls':>9} {'tottime':>9} {'cumtime':>9}  function")
+        rows = sorted(stats.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:self.top_n]
+        for func, (_, ncalls, tottime, cumtime, _) in rows:
+            print(f"  {ncalls:>9} {tottime:>9.4f} {cumtime:>9.4f}  {_func_label(func)}")
+
+
+def get_active_profiler():
+    return _active_profiler
+
+
+@contextmanager
+def use_profiler(output_dir, top_n=20, memory=True):
+    """블록 안에서 실행되는 stage()들을 단계별로 프로파일하고, 블록이 끝나면 결과를 저장합니다."""
+    global _active_profiler
+    profiler = StageProfiler(output_dir, top_n=top_n, memory=memory)
+    profiler.start()
+    _active_profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _active_profiler = None
+        profiler.finish()
+
+
+@contextmanager
+def stage(name, source=None):
+    """
+    단계 실행 시간을 stage_seconds 메트릭으로 기록하고, 프로파일링 중이면 해당 단계를 따로 프로파일합니다.
+    """
+    profiler = _active_profiler
+    with metrics.timer('stage_seconds', stage=name, source=source):
+        if profiler is None:
+            yield
+        else:
+            with profiler.profile(name if source is None else f"{name}.{source}"):
+                yield
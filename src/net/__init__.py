@@ -0,0 +1 @@
+# 네트워크 관련 모듈들이 여기에 임포트됩니다.
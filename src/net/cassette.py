@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import base64
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from src.monitoring import metrics
+
+# 카세트에 저장하지 않는 인증 정보 (URL 쿼리 파라미터 / 요청 헤더)
+SECRET_PARAMS = {'key', 'api_key', 'apikey', 'access_token', 'token'}
+
+_active_cassette = None
+_lock = threading.Lock()
+
+
+def get_active_cassette():
+    """현재 활성화된 카세트를 반환합니다. 실제 네트워크를 사용하는 경우 None입니다."""
+    return _active_cassette
+
+
+def is_replaying():
+    return _active_cassette is not None and _active_cassette.mode == 'replay'
+
+
+def _strip_secrets(url):
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+
+def _to_bytes(body):
+    if body is None:
+        return b''
+    if isinstance(body, str):
+        return body.encode('utf-8')
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    return str(body).encode('utf-8')
+
+
+class CassetteMiss(Exception):
+    """replay 모드에서 기록되지 않은 요청이 들어온 경우 발생합니다."""
+
+
+class Cassette:
+    """
+    HTTP 요청/응답(및 Gemini 호출)을 cassette_dir에 요청별 JSON 파일로 기록하고 재생합니다.
+    키는 메서드, 인증 정보를 제거한 URL, 요청 본문 해시로 만들어 API 키가 카세트에 남지 않도록 합니다.
+    """
+
+    def __init__(self, cassette_dir, mode='replay', latency_ms=0):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.cassette_dir = os.path.abspath(cassette_dir)
+        self.mode = mode
+        self.latency_ms = latency_ms
+        os.makedirs(self.cassette_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(method, url, body=None):
+        digest = hashlib.sha256()
+        digest.update(method.upper().encode('utf-8'))
+        digest.update(b'\0' + _strip_secrets(url).encode('utf-8'))
+        digest.update(b'\0' + _to_bytes(body))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cassette_dir, f"{key}.json")
+
+    def load(self, key):
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                exchange = json.load(f)
+        except FileNotFoundError:
+            metrics.inc('cassette_lookups_total', result='miss')
+            return None
+        metrics.inc('cassette_lookups_total', result='hit')
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return exchange
+
+    def save(self, key, exchange):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cassette_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(exchange, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(key))
+
+    def iter_exchanges(self, url_prefix=None):
+        """기록된 HTTP 응답들을 (url, body bytes)로 순회합니다. 벤치마크 등 오프라인 분석용입니다."""
+        for filename in sorted(os.listdir(self.cassette_dir)):
+            if not filename.endswith('.json'):
+                continue
+            with open(os.path.join(self.cassette_dir, filename), 'r', encoding='utf-8') as f:
+                exchange = json.load(f)
+            response = exchange.get('response', {})
+            url = exchange.get('request', {}).get('url', '')
+            if 'body_b64' not in response or (url_prefix and not url.startswith(url_prefix)):
+                continue
+            yield url, base64.b64decode(response['body_b64'])
+
+    # requests 라이브러리 연동
+    def _send_requests(self, original_send, adapter, request, **kwargs):
+        import requests
+        from requests.structures import CaseInsensitiveDict
+        from requests.utils import get_encoding_from_headers
+
+        key = self.make_key(request.method, request.url, request.body)
+        if self.mode == 'replay':
+            exchange = self.load(key)
+            if exchange is None:
+                raise requests.exceptions.ConnectionError(
+                    f"No recorded response for {request.method} {_strip_secrets(request.url)}", request=request)
+            recorded = exchange['response']
+            response = requests.Response()
+            response.status_code = recorded['status']
+            response.reason = recorded.get('reason', '')
+            response.headers = CaseInsensitiveDict(recorded.get('headers', {}))
+            response._content = base64.b64decode(recorded['body_b64'])
+            response.url = request.url
+            response.encoding = get_encoding_from_headers(response.headers)
+            response.request = request
+            response.connection = adapter
+            return response
+
+        response = original_send(adapter, request, **kwargs)
+        self.save(key, {
+            'request': {'method': request.method, 'url': _strip_secrets(request.url)},
+            'response': {
+                'status': response.status_code,
+                'reason': response.reason,
+                'headers': {k: v for k, v in response.headers.items() if k.lower() != 'set-cookie'},
+                'body_b64': base64.b64encode(response.content).decode('ascii'),
+            },
+        })
+        return response
+
+    # googleapiclient(httplib2) 연동
+    def httplib2_http(self):
+        return _CassetteHttplib2(self)
+
+    # Gemini 호출 연동
+    def generate_text(self, model_name, prompt_text, generate):
+        """
+        Gemini 호출을 기록/재생합니다. generate는 실제 호출을 수행하는 함수(prompt_text -> (text, usage))이며,
+        usage(토큰 사용량 dict 또는 None)도 함께 기록해 재생 시 그대로 돌려줍니다.
+        """
+        key = self.make_key('GEMINI', f"gemini://{model_name}", prompt_text)
+        if self.mode == 'replay':
+            exchange = self.load(key)
+            if exchange is None:
+                raise CassetteMiss(f"No recorded Gemini response for model {model_name}")
+            return exchange['response']['text'], exchange['response'].get('usage')
+        text, usage = generate(prompt_text)
+        self.save(key, {'request': {'method': 'GEMINI', 'url': f"gemini://{model_name}"},
+                        'response': {'text': text, 'usage': usage}})
+        return text, usage
+
+
+class _CassetteHttplib2:
+    """googleapiclient에 전달하는 httplib2.Http 대체 객체입니다."""
+
+    def __init__(self, cassette):
+        import httplib2
+        self.cassette = cassette
+        self._http = httplib2.Http() if cassette.mode == 'record' else None
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5, connection_type=None):
+        import httplib2
+        key = self.cassette.make_key(method, uri, body)
+        if self.cassette.mode == 'replay':
+            exchange = self.cassette.load(key)
+            if exchange is None:
+                raise httplib2.ServerNotFoundError(f"No recorded response for {method} {_strip_secrets(uri)}")
+            recorded = exchange['response']
+            return httplib2.Response(dict(recorded.get('headers', {}), status=str(recorded['status']))), \
+                base64.b64decode(recorded['body_b64'])
+
+        response, content = self._http.request(uri, method=method, body=body, headers=headers,
+                                               redirections=redirections, connection_type=connection_type)
+        self.cassette.save(key, {
+            'request': {'method': method, 'url': _strip_secrets(uri)},
+            'response': {
+                'status': response.status,
+                'headers': {k: v for k, v in response.items() if k.lower() not in ('status', 'set-cookie')},
+                'body_b64': base64.b64encode(content).decode('ascii'),
+            },
+        })
+        return response, content
+
+
+@contextmanager
+def use_cassette(cassette_dir, mode='replay', latency_ms=0):
+    """
+    블록 안의 모든 requests 기반 HTTP 요청을 카세트로 기록(record)하거나 카세트에서 재생(replay)합니다.
+    """
+    global _active_cassette
+    from requests.adapters import HTTPAdapter
+
+    cassette = Cassette(cassette_dir, mode=mode, latency_ms=latency_ms)
+    with _lock:
+        original_send = HTTPAdapter.send
+
+        def send(adapter, request, **kwargs):
+            return cassette._send_requests(original_send, adapter, request, **kwargs)
+
+        HTTPAdapter.send = send
+        _active_cassette = cassette
+    try:
+        yield cassette
+    finally:
+        with _lock:
+            HTTPAdapter.send = original_send
+            _active_cassette = None
+
+
+def cassette_from_config(cassette_cfg):
+    """
+    http.cassette 설정으로 카세트 컨텍스트를 만듭니다. mode가 'live'이면 아무것도 하지 않습니다.
+    """
+    if cassette_cfg is None or cassette_cfg.get('mode', 'live') == 'live':
+        return nullcontext()
+    return use_cassette(cassette_cfg.get('dir', 'results/cassettes'), mode=cassette_cfg.mode,
+                        latency_ms=cassette_cfg.get('latency_ms', 0))
@@ -0,0 +1,56 @@
+import threading
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+import requests
+from requests.structures import CaseInsensitiveDict
+from src.monitoring import metrics
+from .politeness import get_politeness, RobotsDisallowed
+
+_local = threading.local()
+
+
+def get_session():
+    """스레드별 requests.Session을 반환합니다. 같은 호스트에 대한 연결(keep-alive)을 재사용합니다."""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+def http_get(url, source=None, **kwargs):
+    """
+    requests.get과 같지만 요청 수, 응답 크기, 지연 시간, 오류를 source/host 레이블로 기록합니다.
+    PolitenessScheduler가 활성화되어 있으면 설정된 User-Agent로 요청하고(요청에 User-Agent 헤더를 지정하면 그 값),
+    그 User-Agent에 대한 robots.txt 규칙을 확인한 뒤 호스트별 동시 요청 수/간격 제한 안에서 요청하며,
+    429/503 응답은 Retry-After만큼 호스트 전체를 멈춘 뒤 재시도합니다.
+    """
+    host = urlsplit(url).netloc
+    session = get_session()
+    scheduler = get_politeness()
+    if scheduler is not None:
+        headers = CaseInsensitiveDict(kwargs.pop('headers', None) or {})
+        headers.setdefault('User-Agent', scheduler.user_agent)
+        kwargs['headers'] = headers
+        if not scheduler.allowed(url, session, headers['User-Agent']):
+            metrics.inc('robots_blocked_total', source=source, host=host)
+            raise RobotsDisallowed(f"Blocked by robots.txt: {url}")
+
+    attempt = 0
+    while True:
+        try:
+            with scheduler.slot(host) if scheduler is not None else nullcontext():
+                with metrics.timer('http_request_seconds', source=source, host=host):
+                    response = session.get(url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            metrics.inc('http_errors_total', source=source, host=host, error=type(e).__name__)
+            raise
+        metrics.inc('http_requests_total', source=source, host=host, status=response.status_code)
+        metrics.inc('http_response_bytes_total', len(response.content), source=source, host=host)
+        delay = scheduler.retry_delay(response, attempt) if scheduler is not None else None
+        if delay is None:
+            return response
+        print(f"Warning: {host} responded {response.status_code}. Retrying in {delay:.1f}s.")
+        metrics.inc('retries_total', source=source, operation='http', status=response.status_code)
+        metrics.inc('sleep_seconds_total', delay, source=source, reason='retry_after')
+        scheduler.backoff(host, delay)
+        attempt += 1
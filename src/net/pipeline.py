@@ -0,0 +1,143 @@
+import os
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+from src.monitoring import metrics
+
+# requests(src.net.http)와 스레드/프로세스 풀은 페이지를 처음 가져올 때 불러옴 (모든 CLI 모드의 시작 시간을 늘리지 않도록)
+_active_pool = None
+
+
+def _decode(content, encoding):
+    # requests.Response.text와 같은 방식. 헤더에 charset이 없으면 내용으로 인코딩을 추정
+    if not content:
+        return ''
+    if encoding is None:
+        from requests.compat import chardet
+        encoding = chardet.detect(content)['encoding'] if chardet is not None else 'utf-8'
+    try:
+        return str(content, encoding, errors='replace')
+    except (LookupError, TypeError):
+        return str(content, errors='replace')
+
+
+def _timed_extract(extract, content, encoding, args):
+    # 추출 프로세스에서 실행됨. 응답 바이트의 디코딩(인코딩 추정 포함)도 여기서 하여 가져오기 스레드가 GIL을 오래 잡지 않게 하고,
+    # 소요 시간을 함께 돌려주어 메인 프로세스의 메트릭에 기록
+    start = time.perf_counter()
+    result = extract(_decode(content, encoding), *args)
+    return result, time.perf_counter() - start
+
+
+class FetchPool:
+    """
+    페이지를 스레드로 동시에 가져오고(네트워크 I/O), 가져온 HTML을 프로세스 풀에서 디코딩하고 추출(CPU)하는 파이프라인입니다.
+    각 스레드는 응답을 받는 즉시 응답 바이트와 인코딩을 프로세스 풀에 넘기므로 가져오기와 파싱이 겹쳐서 진행되며,
+    메인 프로세스로는 추출된 필드만 돌아옵니다.
+    """
+
+    def __init__(self, fetch_workers=4, extract_workers=None):
+        from concurrent.futures import ThreadPoolExecutor
+        self.fetch_workers = max(1, fetch_workers)
+        self.extract_workers = (os.cpu_count() or 1) if extract_workers is None else extract_workers
+        self._threads = ThreadPoolExecutor(self.fetch_workers, thread_name_prefix='fetch')
+        self._processes = None
+        self._lock = threading.Lock()
+
+    def _process_pool(self):
+        if self.extract_workers <= 0:
+            return None
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        with self._lock:
+            if self._processes is None:
+                # 스레드가 실행 중인 프로세스에서 fork하지 않도록 spawn 사용 (macOS 기본값과 동일)
+                self._processes = ProcessPoolExecutor(self.extract_workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._processes
+
+    def fetch_and_extract(self, urls, extract, *args, source=None):
+        """
+        urls의 각 페이지를 가져와 extract(html, *args)를 적용한 결과를 urls와 같은 순서로 하나씩 내보냅니다(generator).
+        앞선 결과가 준비되는 대로 내보내므로 호출자는 항목이 완성될 때마다 처리할 수 있습니다.
+        가져오기나 추출에 실패한 URL의 자리에는 해당 예외 객체가 들어갑니다.
+        extract는 프로세스 풀에서 실행되므로 모듈 최상위 함수여야 합니다.
+        """
+        from concurrent.futures import Future
+        from .http import http_get
+        processes = self._process_pool()
+
+        def fetch(url):
+            response = http_get(url, source=source)
+            response.raise_for_status()
+            if processes is None:
+                return _timed_extract(extract, response.content, response.encoding, args)
+            return processes.submit(_timed_extract, extract, response.content, response.encoding, args)
+
+        futures = [self._threads.submit(fetch, url) for url in urls]
+        try:
+            for future in futures:
+                try:
+                    result = future.result()
+                    if isinstance(result, Future):
+                        result = result.result()
+                    details, seconds = result
+                    metrics.observe('extract_seconds', seconds, source=source)
+                    yield details
+                except Exception as e:
+                    yield e
+        finally:
+            # 호출자가 중간에 멈추면(예외, Ctrl-C) 아직 시작하지 않은 요청은 취소
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self):
+        self._threads.shutdown(wait=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=True)
+
+
+def fetch_and_extract(urls, extract, *args, source=None):
+    """
+    활성화된 FetchPool이 있으면 동시에, 없으면(대시보드 등) 한 페이지씩 순서대로 가져와 추출합니다.
+    결과는 urls와 같은 순서로 하나씩 내보냅니다(generator).
+    """
+    if _active_pool is not None:
+        yield from _active_pool.fetch_and_extract(urls, extract, *args, source=source)
+        return
+    from .http import http_get
+    for url in urls:
+        try:
+            response = http_get(url, source=source)
+            response.raise_for_status()
+            details, seconds = _timed_extract(extract, response.content, response.encoding, args)
+            metrics.observe('extract_seconds', seconds, source=source)
+            yield details
+        except Exception as e:
+            yield e
+
+
+@contextmanager
+def use_fetch_pool(fetch_workers=4, extract_workers=None):
+    """블록 안에서 fetch_and_extract()가 하나의 스레드/프로세스 풀을 공유하도록 합니다."""
+    global _active_pool
+    pool = FetchPool(fetch_workers, extract_workers)
+    _active_pool = pool
+    try:
+        yield pool
+    finally:
+        _active_pool = None
+        pool.shutdown()
+
+
+def fetch_pool_from_config(http_cfg):
+    """
+    http.fetch_workers / http.extract_workers 설정으로 FetchPool 컨텍스트를 만듭니다.
+    fetch_workers가 1 이하이고 extract_workers가 0이면 기존처럼 순차 처리합니다.
+    """
+    if http_cfg is None:
+        return nullcontext()
+    fetch_workers = http_cfg.get('fetch_workers', 1)
+    extract_workers = http_cfg.get('extract_workers', 0)
+    if fetch_workers <= 1 and extract_workers == 0:
+        return nullcontext()
+    return use_fetch_pool(fetch_workers, extract_workers)
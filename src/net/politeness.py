@@ -0,0 +1,236 @@
+import time
+import threading
+import email.utils
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+import requests
+from src.monitoring import metrics
+
+_active_scheduler = None
+
+
+class RobotsDisallowed(requests.exceptions.RequestException):
+    """robots.txt가 금지한 URL에 요청하려는 경우 발생합니다 (소스의 기존 요청 오류 처리로 건너뜀)."""
+
+
+def parse_retry_after(value, now=None):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 대기 시간(초)으로 변환합니다. 해석할 수 없으면 None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+class _HostState:
+    def __init__(self, concurrency, delay_seconds):
+        self.semaphore = threading.BoundedSemaphore(max(1, concurrency))
+        self.delay_seconds = delay_seconds
+        self.lock = threading.Lock()
+        self.next_start = 0.0 # 다음 요청을 시작할 수 있는 가장 이른 시각 (time.monotonic 기준)
+
+
+class PolitenessScheduler:
+    """
+    모든 소스의 외부 요청이 거쳐 가는 호스트별 스케줄러입니다.
+
+    * 호스트마다 동시 요청 수(concurrency)와 요청 시작 간격(delay_seconds)을 제한합니다. 여러 소스(예: Raindrop 본문 추출과
+      pytorch_kr 크롤링)가 같은 호스트에 요청해도 제한은 호스트 단위로 공유됩니다.
+    * 요청은 user_agent를 User-Agent 헤더로 보냅니다. robots.txt를 호스트마다 한 번 가져와 robots_ttl_seconds 동안 캐시하고,
+      그 User-Agent에 금지된 URL은 요청하지 않습니다.
+      robots.txt의 Crawl-delay가 설정값보다 길면 Crawl-delay를 따릅니다.
+    * 429/503 응답을 받으면 Retry-After(없으면 지수 백오프)만큼 해당 호스트의 요청을 모두 멈춘 뒤 재시도합니다.
+    """
+
+    def __init__(self, concurrency_per_host=4, delay_seconds=0.0, hosts=None, respect_robots=True,
+                 user_agent='omni-collector', robots_ttl_seconds=3600, max_retries=3, backoff_seconds=1.0,
+                 max_retry_after_seconds=120, retry_statuses=(429, 503)):
+        self.concurrency_per_host = concurrency_per_host
+        self.delay_seconds = delay_seconds
+        self.hosts = dict(hosts or {}) # 호스트별 설정 {호스트: {'concurrency': n, 'delay_seconds': s}}
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self.robots_ttl_seconds = robots_ttl_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_retry_after_seconds = max_retry_after_seconds
+        self.retry_statuses = set(retry_statuses)
+        self._states = {}
+        self._robots = {} # origin -> (RobotFileParser, 가져온 시각)
+        self._robots_locks = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        with self._lock:
+            state = self._states.get(host)
+            if state is None:
+                policy = self.hosts.get(host) or {}
+                state = self._states[host] = _HostState(policy.get('concurrency', self.concurrency_per_host),
+                                                        policy.get('delay_seconds', self.delay_seconds))
+            return state
+
+    @contextmanager
+    def slot(self, host):
+        """호스트의 동시 요청 수와 요청 간격 제한 안에서 요청 하나를 실행하는 블록입니다."""
+        state = self._state(host)
+        start = time.monotonic()
+        state.semaphore.acquire()
+        try:
+            with state.lock:
+                now = time.monotonic()
+                wait = max(0.0, state.next_start - now)
+                state.next_start = max(now, state.next_start) + state.delay_seconds
+            if wait:
+                time.sleep(wait)
+            waited = time.monotonic() - start
+            if waited >= 0.001:
+                metrics.observe('politeness_wait_seconds', waited, host=host)
+            yield
+        finally:
+            state.semaphore.release()
+
+    def backoff(self, host, seconds):
+        """seconds 동안 호스트에 새 요청을 시작하지 않습니다."""
+        state = self._state(host)
+        with state.lock:
+            state.next_start = max(state.next_start, time.monotonic() + seconds)
+
+    def _robots_parser(self, url, session):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            lock = self._robots_locks.setdefault(origin, threading.Lock())
+        with lock: # 같은 호스트의 robots.txt는 한 번만 가져옴
+            cached = self._robots.get(origin)
+            if cached is not None and time.monotonic() - cached[1] < self.robots_ttl_seconds:
+                return cached[0]
+            parser = RobotFileParser(f"{origin}/robots.txt")
+            try:
+                with self.slot(parts.netloc):
+                    response = session.get(parser.url, timeout=10, headers={'User-Agent': self.user_agent})
+                # urllib.robotparser와 같은 규칙: 401/403이면 모두 금지, 그 밖의 오류 응답이면 모두 허용
+                if response.status_code in (401, 403):
+                    parser.disallow_all = True
+                elif response.status_code >= 400:
+                    parser.allow_all = True
+                else:
+                    parser.parse(response.text.splitlines())
+                metrics.inc('robots_fetches_total', host=parts.netloc, status=response.status_code)
+            except requests.exceptions.RequestException as e:
+                # robots.txt를 가져올 수 없으면 요청을 막지 않음
+                parser.allow_all = True
+                metrics.inc('robots_fetches_total', host=parts.netloc, status=type(e).__name__)
+            crawl_delay = parser.crawl_delay(self.user_agent)
+            if crawl_delay:
+                state = self._state(parts.netloc)
+                state.delay_seconds = max(state.delay_seconds, float(crawl_delay))
+            self._robots[origin] = (parser, time.monotonic())
+            return parser
+
+    def allowed(self, url, session, user_agent=None):
+        """user_agent(요청에 실제로 보내는 User-Agent, 기본값은 설정된 user_agent)가 url을 요청해도 되는지 robots.txt로 확인합니다."""
+        if not self.respect_robots:
+            return True
+        return self._robots_parser(url, session).can_fetch(user_agent or self.user_agent, url)
+
+    def retry_delay(self, response, attempt):
+        """
+        재시도할 응답이면 대기 시간(초)을, 아니면 None을 반환합니다.
+        Retry-After가 max_retry_after_seconds보다 길면 재시도하지 않고 응답을 그대로 돌려줍니다.
+        """
+        return self.retry_delay_for(response.status_code, response.headers.get('Retry-After'), attempt)
+
+    def retry_delay_for(self, status, retry_after, attempt):
+        """retry_delay와 같지만 응답 객체 대신 상태 코드와 Retry-After 값을 받습니다 (API 클라이언트가 예외로 알리는 429 등)."""
+        if status not in self.retry_statuses or attempt >= self.max_retries:
+            return None
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = self.backoff_seconds * (2 ** attempt)
+        if delay > self.max_retry_after_seconds:
+            return None
+        return delay
+
+
+def get_politeness():
+    """현재 활성화된 PolitenessScheduler를 반환합니다. 없으면 None (제한 없이 요청)."""
+    return _active_scheduler
+
+
+def host_slot(host):
+    """http_get을 거치지 않는 요청(YouTube 자막 등)도 같은 호스트별 제한을 따르도록 하는 블록입니다."""
+    if _active_scheduler is None:
+        return nullcontext()
+    return _active_scheduler.slot(host)
+
+
+def polite_call(host, call, retry_status=None, source=None, operation='api'):
+    """
+    http_get을 거치지 않는 API 호출(YouTube Data API, Gemini 등)을 호스트별 동시 요청 수/간격 제한 안에서 실행하고 결과를 반환합니다.
+    retry_status(예외)가 (상태 코드, Retry-After 값)을 반환하면 http_get과 같은 규칙(retry_statuses, max_retries)으로
+    호스트 전체를 멈춘 뒤 재시도합니다. 스케줄러가 없으면 call()을 그대로 실행합니다.
+    """
+    scheduler = _active_scheduler
+    if scheduler is None:
+        return call()
+    attempt = 0
+    while True:
+        try:
+            with scheduler.slot(host):
+                return call()
+        except Exception as e:
+            status, retry_after = retry_status(e) if retry_status is not None else (None, None)
+            delay = scheduler.retry_delay_for(status, retry_after, attempt) if status is not None else None
+            if delay is None:
+                raise
+            print(f"Warning: {host} responded {status}. Retrying in {delay:.1f}s.")
+            metrics.inc('retries_total', source=source, operation=operation, status=status)
+            metrics.inc('sleep_seconds_total', delay, source=source, reason='retry_after')
+            scheduler.backoff(host, delay)
+            attempt += 1
+
+
+@contextmanager
+def use_politeness(**kwargs):
+    """블록 안의 모든 http_get 요청과 API 호출(polite_call, host_slot)이 하나의 PolitenessScheduler를 거치도록 합니다."""
+    global _active_scheduler
+    scheduler = PolitenessScheduler(**kwargs)
+    _active_scheduler = scheduler
+    try:
+        yield scheduler
+    finally:
+        _active_scheduler = None
+
+
+def politeness_from_config(http_cfg):
+    """
+    http.politeness 설정으로 PolitenessScheduler 컨텍스트를 만듭니다.
+    비활성화되어 있거나 카세트 재생 중이면(실제 호스트에 요청하지 않으므로) 제한 없이 요청합니다.
+    """
+    from .cassette import is_replaying
+
+    politeness_cfg = http_cfg.get('politeness') if http_cfg is not None else None
+    if politeness_cfg is None or not politeness_cfg.enabled or is_replaying():
+        return nullcontext()
+    hosts = {host: dict(policy) for host, policy in (politeness_cfg.get('hosts') or {}).items()}
+    return use_politeness(
+        concurrency_per_host=politeness_cfg.concurrency_per_host,
+        delay_seconds=politeness_cfg.delay_seconds,
+        hosts=hosts,
+        respect_robots=politeness_cfg.respect_robots,
+        user_agent=politeness_cfg.user_agent,
+        robots_ttl_seconds=politeness_cfg.robots_ttl_seconds,
+        max_retries=politeness_cfg.max_retries,
+        backoff_seconds=politeness_cfg.backoff_seconds,
+        max_retry_after_seconds=politeness_cfg.max_retry_after_seconds,
+    )
@@ -1 +1,7 @@
-from .summarizer import Summarizer
+import importlib
+
+def __getattr__(name):
+    # summarizer는 google.generativeai를 임포트하므로 요약 단계에서 처음 사용할 때 임포트 (PEP 562)
+    if name == 'Summarizer':
+        return importlib.import_module('.summarizer', __name__).Summarizer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
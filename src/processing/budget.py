@@ -0,0 +1,145 @@
+import os
+import json
+import math
+import fcntl
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime
+from src.storage.item import Item
+
+DEFAULT_WEIGHTS = {'rating': 1.0, 'view_count': 0.5, 'like_count': 1.0, 'recency': 2.0}
+LEDGER_DAYS = 30 # 사용량 기록에 남겨 둘 날짜 수
+
+
+def body_length(item):
+    """항목 본문의 문자 수. 임시 파일로 내보낸 본문은 다시 읽지 않습니다."""
+    if isinstance(item, Item):
+        return item.body_length
+    return len(item.get('body') or '')
+
+
+def _number(value):
+    try:
+        return max(0.0, float(value or 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _published_at(value):
+    # 소스가 만든 datetime 또는 마크다운에서 읽은 ISO 문자열. tz 정보가 없으면 로컬 시각으로 간주
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return value.astimezone()
+
+
+class SummaryBudget:
+    """
+    요약 토큰 예산과 우선순위입니다. processing.summarize.budget으로 설정하며 Summarizer가 사용합니다.
+
+    요약할 항목을 우선순위(별점, 조회수, 좋아요 수, 최신성, 소스별 가중치의 합) 순으로 처리하고, 항목마다
+    (프롬프트 + 본문 길이) / chars_per_token + output_tokens로 토큰 수를 추정하여 오늘 남은 예산(daily_tokens)과
+    이번 실행의 남은 예산(run_tokens) 안에 들어가는 항목만 요약합니다. 요약하기 전에 추정치를 예약(reserve)하고, 요약한 뒤
+    API가 보고한 토큰 수와의 차이를 반영(charge)합니다. 하루 사용량은 ledger_path에 날짜별로 기록되어, 같은 날의 다른 실행
+    (데몬, 대시보드 작업자)과 예산을 공유합니다.
+
+    예산이 부족해 미룬 항목은 요약 없이 그대로 저장되므로, 다음 요약 실행에서 요약 대상(src/processing/pending.py)으로
+    다시 선택되어 우선순위 순으로 처리됩니다.
+    """
+
+    def __init__(self, daily_tokens=None, run_tokens=None, ledger_path="results/summary_budget.json",
+                 chars_per_token=2.5, output_tokens=300, recency_half_life_days=7, weights=None, source_weights=None):
+        self.daily_tokens = daily_tokens
+        self.run_tokens = run_tokens
+        self.ledger_path = os.path.abspath(ledger_path)
+        self.chars_per_token = chars_per_token
+        self.output_tokens = output_tokens
+        self.recency_half_life_days = recency_half_life_days
+        self.weights = {**DEFAULT_WEIGHTS, **dict(weights or {})}
+        self.source_weights = dict(source_weights or {})
+        self.run_used = 0
+
+    # 우선순위
+
+    def priority(self, item, now=None):
+        """항목의 우선순위 점수. 클수록 먼저 요약합니다."""
+        score = self.weights['rating'] * _number(item.get('rating'))
+        score += self.weights['view_count'] * math.log10(1 + _number(item.get('view_count')))
+        score += self.weights['like_count'] * math.log10(1 + _number(item.get('like_count')))
+        published_at = _published_at(item.get('published_at'))
+        if published_at is not None and self.recency_half_life_days:
+            now = now or datetime.now().astimezone()
+            age_days = max(0.0, (now - published_at).total_seconds() / 86400)
+            score += self.weights['recency'] * 0.5 ** (age_days / self.recency_half_life_days)
+        return score + self.source_weights.get(item.get('source'), 0)
+
+    def order(self, items):
+        """items의 인덱스를 우선순위가 높은 순서로 반환합니다 (점수가 같으면 원래 순서)."""
+        now = datetime.now().astimezone()
+        scores = [self.priority(item, now) for item in items]
+        return sorted(range(len(items)), key=lambda index: -scores[index])
+
+    # 예산
+
+    def estimate(self, item, prompt_template):
+        """항목 하나를 요약하는 데 드는 입력 + 출력 토큰 수 추정치."""
+        prompt_chars = len(prompt_template.replace('{text}', '')) + body_length(item)
+        return math.ceil(prompt_chars / self.chars_per_token) + self.output_tokens
+
+    def _read_ledger(self):
+        try:
+            with open(self.ledger_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def used_today(self):
+        return self._read_ledger().get(date.today().isoformat(), 0)
+
+    @contextmanager
+    def _locked_ledger(self):
+        """다른 프로세스(데몬, 대시보드 작업자)와 동시에 고치지 않도록 잠근 뒤 오늘까지의 사용량 기록을 넘기고, 블록이 끝나면 기록합니다."""
+        os.makedirs(os.path.dirname(self.ledger_path), exist_ok=True)
+        with open(self.ledger_path + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            ledger = self._read_ledger()
+            yield ledger
+            ledger = dict(sorted(ledger.items())[-LEDGER_DAYS:])
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.ledger_path), prefix='.', suffix='.json.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(ledger, f, indent=2)
+            os.replace(tmp_path, self.ledger_path)
+
+    def start_run(self):
+        self.run_used = 0
+
+    def reserve(self, tokens):
+        """
+        남은 예산(오늘/이번 실행)에 tokens가 들어가면 사용량에 미리 더하고 True를 반환합니다.
+        하루 예산은 확인과 기록을 같은 잠금 안에서 하므로, 동시에 실행되는 요약이 함께 예산을 넘기지 않습니다.
+        daily_tokens가 없으면 사용량 기록(ledger_path)을 읽거나 쓰지 않습니다.
+        """
+        if self.run_tokens is not None and self.run_used + tokens > self.run_tokens:
+            return False
+        if self.daily_tokens is not None:
+            with self._locked_ledger() as ledger:
+                today = date.today().isoformat()
+                if ledger.get(today, 0) + tokens > self.daily_tokens:
+                    return False
+                ledger[today] = ledger.get(today, 0) + tokens
+        self.run_used += tokens
+        return True
+
+    def charge(self, tokens):
+        """요약이 끝난 뒤 실제 사용량과 예약한 양의 차이(tokens, 음수 가능)를 사용량에 반영합니다."""
+        if not tokens:
+            return
+        self.run_used += tokens
+        if self.daily_tokens is not None:
+            with self._locked_ledger() as ledger:
+                today = date.today().isoformat()
+                ledger[today] = max(0, ledger.get(today, 0) + tokens)
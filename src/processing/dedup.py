@@ -0,0 +1,314 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from src.monitoring import metrics
+
+# 추적용 쿼리 파라미터 (정규화 시 제거)
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'igshid', 'mc_cid', 'mc_eid', 'ref', 'ref_src', 'feature', 'si'}
+
+SIMHASH_BITS = 64
+
+
+def canonicalize_url(url):
+    """
+    같은 문서를 가리키는 URL이 같은 문자열이 되도록 정규화합니다.
+    (스킴/호스트 소문자화, www. 제거, 기본 포트/프래그먼트/추적 파라미터 제거, 쿼리 정렬, 끝 슬래시 제거)
+    """
+    if not url:
+        return ""
+    url = url.strip()
+    if url.startswith('file://'):
+        return url
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme in ('http', 'https'):
+        scheme = 'https'
+    host = (parts.hostname or '').lower()
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or '/'
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PARAM_PREFIXES)]
+
+    # youtu.be/<id> 단축 주소는 watch?v=<id>로 통일
+    if host == 'youtu.be' and path.strip('/'):
+        query.append(('v', path.strip('/')))
+        host, path = 'youtube.com', '/watch'
+
+    if len(path) > 1:
+        path = path.rstrip('/')
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ''))
+
+
+def simhash(text, bits=SIMHASH_BITS):
+    """
+    단어 3-gram shingle의 빈도로 가중치를 준 SimHash 지문을 계산합니다.
+    비슷한 본문은 해밍 거리가 작은 지문을 갖습니다.
+    """
+    tokens = re.findall(r'\w+', text.lower())
+    if len(tokens) >= 3:
+        shingles = [' '.join(tokens[i:i + 3]) for i in range(len(tokens) - 2)]
+    else:
+        shingles = tokens
+
+    weights = {}
+    for shingle in shingles:
+        weights[shingle] = weights.get(shingle, 0) + 1
+
+    vector = [0] * bits
+    for shingle, weight in weights.items():
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=bits // 8).digest(), 'big')
+        for i in range(bits):
+            vector[i] += weight if (h >> i) & 1 else -weight
+
+    fingerprint = 0
+    for i in range(bits):
+        if vector[i] > 0:
+            fingerprint |= 1 << i
+    return fingerprint
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def _bands(fingerprint, num_bands):
+    """
+    지문을 num_bands개의 비트 구간으로 나눕니다. 해밍 거리가 num_bands - 1 이하인 두 지문은
+    최소 한 구간이 반드시 일치하므로, 구간 값이 같은 항목만 후보로 비교하면 됩니다.
+    """
+    bands = []
+    start = 0
+    for i in range(num_bands):
+        width = SIMHASH_BITS // num_bands + (1 if i < SIMHASH_BITS % num_bands else 0)
+        bands.append((i, (fingerprint >> start) & ((1 << width) - 1)))
+        start += width
+    return bands
+
+
+class Deduplicator:
+    """
+    여러 소스에서 수집된 같은 콘텐츠를 요약 전에 하나의 항목으로 합칩니다.
+
+    URL 정규화가 같거나 본문 SimHash의 해밍 거리가 max_hamming_distance 이하이면 같은 콘텐츠로 봅니다.
+    지문은 index_path에 저장되어 이후 실행에서도 사용됩니다. 이전 실행에서 이미 저장된 콘텐츠가
+    다른 소스/URL로 다시 들어오면 건너뛰고(저장소를 넘기면 그 소스/URL을 저장된 항목에 합쳐 다시 저장),
+    같은 소스/URL의 항목은 갱신으로 보고 통과시킵니다.
+    저장된 항목의 소스/URL(origin)은 건너뛴 중복의 소스/URL(sources, urls)과 따로 기록하므로, 건너뛴 중복이
+    다음 실행에서 다시 들어와도 갱신으로 보지 않습니다.
+    """
+
+    def __init__(self, enabled: bool = True, index_path: str = "results/fingerprints.json",
+                 max_hamming_distance: int = 6, min_body_length: int = 200, **kwargs):
+        self.enabled = enabled
+        self.index_path = index_path
+        self.max_hamming_distance = max_hamming_distance
+        self.min_body_length = min_body_length
+        self.entries = []
+        self._url_index = {} # 정규화된 URL -> entry 번호
+        self._band_index = {} # (밴드 번호, 밴드 값) -> entry 번호 리스트
+        self.stored_updates = 0 # 마지막 deduplicate()에서 중복의 소스/URL을 합쳐 다시 저장한 항목 수
+        self._load_index()
+
+    def _load_index(self):
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not load fingerprint index {self.index_path}: {e}")
+            return
+        for entry in data.get('entries', []):
+            if entry.get('simhash') is not None:
+                entry['simhash'] = int(entry['simhash'], 16)
+            self._add_entry(entry)
+
+    def _save_index(self):
+        if not self.index_path:
+            return
+        index_dir = os.path.dirname(os.path.abspath(self.index_path))
+        os.makedirs(index_dir, exist_ok=True)
+        entries = []
+        for entry in self.entries:
+            entry = {k: v for k, v in entry.items() if k != 'batch_item'}
+            if entry.get('simhash') is not None:
+                entry['simhash'] = format(entry['simhash'], '016x')
+            entries.append(entry)
+        fd, tmp_path = tempfile.mkstemp(dir=index_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'entries': entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def _add_entry(self, entry):
+        entry_id = len(self.entries)
+        self.entries.append(entry)
+        for url in entry.get('urls', []):
+            self._url_index.setdefault(url, entry_id)
+        if entry.get('simhash') is not None:
+            self._index_fingerprint(entry_id, entry['simhash'])
+        return entry_id
+
+    def _index_fingerprint(self, entry_id, fingerprint):
+        for band in _bands(fingerprint, self.max_hamming_distance + 1):
+            bucket = self._band_index.setdefault(band, [])
+            if entry_id not in bucket:
+                bucket.append(entry_id)
+
+    def _unindex_fingerprint(self, entry_id, fingerprint):
+        for band in _bands(fingerprint, self.max_hamming_distance + 1):
+            bucket = self._band_index.get(band)
+            if bucket and entry_id in bucket:
+                bucket.remove(entry_id)
+                if not bucket:
+                    del self._band_index[band]
+
+    def _find_match(self, canonical_url, fingerprint):
+        if canonical_url and canonical_url in self._url_index:
+            return self._url_index[canonical_url]
+        if fingerprint is None:
+            return None
+        seen = set()
+        for band in _bands(fingerprint, self.max_hamming_distance + 1):
+            for entry_id in self._band_index.get(band, []):
+                if entry_id in seen:
+                    continue
+                seen.add(entry_id)
+                candidate = self.entries[entry_id].get('simhash')
+                if candidate is not None and hamming_distance(candidate, fingerprint) <= self.max_hamming_distance:
+                    return entry_id
+        return None
+
+    @staticmethod
+    def _origin(entry):
+        """entry로 실제 저장된 항목의 (소스, 정규화된 URL). origin이 없는 이전 인덱스는 처음 기록된 값을 사용합니다."""
+        if entry.get('origin'):
+            return tuple(entry['origin'])
+        sources, urls = entry.get('sources') or [None], entry.get('urls') or ['']
+        return sources[0], urls[0]
+
+    @staticmethod
+    def _merge_into(primary, duplicate, body=True):
+        """duplicate의 소스 메타데이터를 primary 항목에 합칩니다. body가 False이면 본문은 그대로 둡니다(이미 저장된 항목)."""
+        for key, value in (('sources', duplicate.get('source')), ('urls', duplicate.get('url'))):
+            merged = primary.setdefault(key, [])
+            for v in (duplicate.get(key) or [value]):
+                if v and v not in merged:
+                    merged.append(v)
+        if duplicate.get('tags'):
+            tags = list(primary.get('tags') or [])
+            tags.extend(t for t in duplicate['tags'] if t not in tags)
+            primary['tags'] = tags
+        # 본문이 더 긴 쪽을 남김
+        if body and len(duplicate.get('body') or '') > len(primary.get('body') or ''):
+            primary['body'] = duplicate['body']
+
+    def _merge_into_stored(self, storage, duplicates):
+        """
+        이전 실행에서 저장된 항목({entry 번호: 중복 항목 리스트})에 중복의 소스/URL/태그를 합쳐 다시 저장하고, 바뀐 항목 수를 반환합니다.
+        본문은 바꾸지 않으므로 요약은 다시 하지 않습니다.
+        """
+        from src.storage.markdown_storage import markdown_filename
+
+        ids = {markdown_filename(str(self.entries[entry_id].get('title'))): entry_id for entry_id in duplicates}
+        updated = []
+        for stored in storage.load_items(list(ids)):
+            entry_id = ids.get(markdown_filename(str(stored.get('title'))))
+            if entry_id is None:
+                continue
+            before = [list(stored.get(key) or []) for key in ('sources', 'urls', 'tags')]
+            stored.setdefault('sources', [stored.get('source')])
+            stored.setdefault('urls', [stored.get('url')])
+            for duplicate in duplicates[entry_id]:
+                self._merge_into(stored, duplicate, body=False)
+            if [list(stored.get(key) or []) for key in ('sources', 'urls', 'tags')] != before:
+                updated.append(stored)
+        if updated:
+            storage.save_items(updated)
+        return len(updated)
+
+    def deduplicate(self, items: list[dict], storage=None) -> list[dict]:
+        """
+        중복 항목을 합친 리스트를 반환합니다. 합쳐진 항목에는 'sources'와 'urls' 리스트가 추가됩니다.
+        storage를 넘기면 이전 실행에서 저장된 항목과 중복인 항목의 소스/URL/태그를 저장된 항목에 합쳐 다시 저장합니다.
+        """
+        self.stored_updates = 0
+        if not self.enabled:
+            return items
+
+        unique_items = []
+        merged_count = 0
+        skipped_count = 0
+        stored_duplicates = {} # entry 번호 -> 이전 실행에서 저장된 항목과 중복인 항목들
+        for item in items:
+            canonical_url = canonicalize_url(item.get('url'))
+            body = item.get('body') or ''
+            fingerprint = simhash(body) if len(body) >= self.min_body_length else None
+
+            entry_id = self._find_match(canonical_url, fingerprint)
+            if entry_id is None:
+                item.setdefault('sources', [item.get('source')])
+                item.setdefault('urls', [item.get('url')])
+                self._add_entry({
+                    'title': item.get('title'),
+                    'simhash': fingerprint,
+                    'sources': [item.get('source')],
+                    'urls': [canonical_url] if canonical_url else [],
+                    'origin': [item.get('source'), canonical_url],
+                    'batch_item': item,
+                })
+                unique_items.append(item)
+                continue
+
+            entry = self.entries[entry_id]
+            primary = entry.get('batch_item')
+            if primary is not None:
+                # 이번 실행에서 이미 수집된 항목과 중복
+                self._merge_into(primary, item)
+                merged_count += 1
+            elif (item.get('source'), canonical_url) == self._origin(entry):
+                # 이전 실행에서 같은 소스/URL로 저장된 항목의 갱신
+                # 합쳐진 중복의 소스/URL을 유지
+                item.setdefault('sources', list(entry['sources']))
+                item.setdefault('urls', [item.get('url')] + [url for url in entry['urls'] if url != canonical_url])
+                entry['batch_item'] = item
+                if fingerprint is not None and fingerprint != entry.get('simhash'):
+                    if entry.get('simhash') is not None:
+                        self._unindex_fingerprint(entry_id, entry['simhash'])
+                    entry['simhash'] = fingerprint
+                unique_items.append(item)
+            else:
+                # 이전 실행에서 이미 다른 소스/URL로 저장된 콘텐츠
+                skipped_count += 1
+                stored_duplicates.setdefault(entry_id, []).append(item)
+
+            if item.get('source') not in entry['sources']:
+                entry['sources'].append(item.get('source'))
+            if canonical_url and canonical_url not in entry['urls']:
+                entry['urls'].append(canonical_url)
+                self._url_index.setdefault(canonical_url, entry_id)
+            if fingerprint is not None:
+                if entry.get('simhash') is None:
+                    entry['simhash'] = fingerprint
+                self._index_fingerprint(entry_id, entry['simhash'])
+
+        for entry in self.entries:
+            entry.pop('batch_item', None)
+        self._save_index()
+        if storage is not None and stored_duplicates:
+            self.stored_updates = self._merge_into_stored(storage, stored_duplicates)
+
+        metrics.inc('items_total', merged_count, stage='dedup', result='merged')
+        metrics.inc('items_total', skipped_count, stage='dedup', result='skipped')
+        if merged_count or skipped_count:
+            print(f"중복 제거: {len(items)}개 중 {merged_count}개 병합, {skipped_count}개 기존 항목과 중복으로 건너뜀")
+        return unique_items
@@ -0,0 +1,74 @@
+import hashlib
+import os
+from src.storage.item import body_hash
+
+# 요약 실패 시 summary에 기록되는 문구. 이 항목은 다음 실행에서 다시 요약함
+SUMMARY_ERROR_TEXT = "요약 생성 중 오류 발생"
+
+EMPTY_BODY_HASH = body_hash('')
+
+
+def prompt_id(name, template):
+    """요약에 사용한 프롬프트의 식별자. 같은 이름이라도 템플릿이 바뀌면 다른 값이 됩니다."""
+    return f"{name}:{hashlib.sha1(template.encode('utf-8')).hexdigest()[:8]}"
+
+
+def item_id(metadata):
+    """메타데이터 인덱스 항목의 ID (저장소의 마크다운 파일명)."""
+    return os.path.basename(metadata['filepath'])
+
+
+class PendingSelector:
+    """
+    메타데이터 인덱스에서 요약이 필요한 항목을 고릅니다. 본문을 읽지 않고 인덱스의 요약 기록만 비교합니다.
+
+    요약기는 요약한 항목에 프롬프트(summary_prompt), 모델(summary_model), 요약한 본문의 해시(summary_body_hash)를 기록하고,
+    인덱스는 저장된 본문의 해시(body_hash)를 담고 있습니다. 다음 중 하나에 해당하는 항목을 요약 대상으로 고릅니다.
+
+    * missing: 요약이 없거나 요약에 실패한 항목
+    * prompt / model: 다른 프롬프트나 모델로 요약한 항목
+    * body: 요약한 뒤 본문이 바뀐 항목
+
+    본문이 없는 항목(save_raw_content=false로 요약 후 본문을 저장하지 않은 항목 등)은 요약할 내용이 없으므로 고르지 않으며,
+    요약 기록이 없는 이전 버전의 요약은 현재 설정으로 만든 것으로 간주합니다.
+    """
+
+    def __init__(self, prompt, model):
+        self.prompt = prompt
+        self.model = model
+
+    def reason(self, metadata, summarized=None):
+        """
+        요약이 필요한 이유('missing', 'prompt', 'model', 'body')를 반환합니다. 필요 없으면 None.
+        summarized를 넘기면 요약 기록은 summarized에서, 본문 해시는 metadata에서 읽습니다
+        (cli.input의 파일을 저장소에 요약된 항목과 비교하는 경우).
+        """
+        current_hash = metadata.get('body_hash')
+        if current_hash is None or current_hash == EMPTY_BODY_HASH:
+            return None
+        summarized = metadata if summarized is None else summarized
+        summary = summarized.get('summary')
+        if not summary or summary == SUMMARY_ERROR_TEXT:
+            return 'missing'
+        if summarized.get('summary_prompt') not in (None, self.prompt):
+            return 'prompt'
+        if summarized.get('summary_model') not in (None, self.model):
+            return 'model'
+        if summarized.get('summary_body_hash') not in (None, current_hash):
+            return 'body'
+        return None
+
+    def select(self, metadata_list, summarized=None, key=item_id):
+        """
+        요약이 필요한 인덱스 항목들과 이유별 개수({'missing': n, ...})를 반환합니다.
+        summarized: {항목 ID: 저장소 인덱스 항목}. 지정하면 key(metadata)가 같은 항목의 요약 기록과 비교합니다.
+        """
+        selected = []
+        reasons = {}
+        for metadata in metadata_list:
+            previous = summarized.get(key(metadata)) if summarized is not None else None
+            reason = self.reason(metadata, previous)
+            if reason is not None:
+                selected.append(metadata)
+                reasons[reason] = reasons.get(reason, 0) + 1
+        return selected, reasons
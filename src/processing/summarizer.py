@@ -2,50 +2,131 @@ import os
 import google.generativeai as genai
 from dotenv import load_dotenv
 from omegaconf import DictConfig, OmegaConf # Import OmegaConf for config handling
+from src.net.cassette import get_active_cassette, is_replaying
+from src.net.politeness import polite_call
+from src.monitoring import metrics
+from src.storage.item import body_hash
+from .pending import SUMMARY_ERROR_TEXT, PendingSelector, prompt_id
+from .budget import body_length
+
+GEMINI_HOST = 'generativelanguage.googleapis.com'
+
+
+def _api_error_status(error):
+    # google.api_core errors (ResourceExhausted, ServiceUnavailable, ...) carry the HTTP status in `code`
+    code = getattr(error, 'code', None)
+    if not isinstance(code, int):
+        return None, None
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    return int(code), headers.get('Retry-After')
 
 class Summarizer:
-    def __init__(self, enabled: bool, prompts: dict, save_raw_content: bool = False, **kwargs):
+    def __init__(self, enabled: bool, prompts: dict, save_raw_content: bool = False, budget=None, **kwargs):
         load_dotenv()
         self.enabled = enabled
         self.prompts = prompts # prompts 딕셔너리 받음
         self.save_raw_content = save_raw_content
+        self.budget = budget # SummaryBudget: orders items by priority and enforces token budgets
         self.model = None
+        self.model_name = 'gemini-1.5-flash'
         if os.getenv("GEMINI_API_KEY"):
             genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
-        else:
+            self.model = genai.GenerativeModel(self.model_name)
+        elif not is_replaying(): # replay 모드에서는 기록된 응답을 사용하므로 API 키가 필요 없음
             print("Warning: GEMINI_API_KEY not found. Summarizer will not work.")
 
-    def _get_prompt_text(self, selected_prompt_name: str, text: str) -> str:
-        """Retrieves and formats the prompt text."""
+    def _resolve_prompt(self, selected_prompt_name: str, warn: bool = True):
+        """Returns (name, template) for the selected prompt, falling back to 'basic'."""
         if selected_prompt_name not in self.prompts:
-            print(f"Warning: Prompt '{selected_prompt_name}' not found. Using 'basic' prompt.")
+            if warn:
+                print(f"Warning: Prompt '{selected_prompt_name}' not found. Using 'basic' prompt.")
             selected_prompt_name = 'basic' # Fallback to basic
+        return selected_prompt_name, self.prompts[selected_prompt_name]
 
-        prompt_template = self.prompts.get(selected_prompt_name, self.prompts['basic'])
+    def _get_prompt_text(self, selected_prompt_name: str, text: str) -> str:
+        """Retrieves and formats the prompt text."""
+        _, prompt_template = self._resolve_prompt(selected_prompt_name)
         return prompt_template.format(text=text)
 
-    def process_item(self, item: dict, selected_prompt_name: str) -> dict:
-        """Processes a single item for summarization."""
-        if not self.model or 'body' not in item or not item['body']:
+    def prompt_id(self, selected_prompt_name: str) -> str:
+        """Identifies the prompt recorded with each summary; changes when the prompt template is edited."""
+        return prompt_id(*self._resolve_prompt(selected_prompt_name, warn=False))
+
+    def pending_selector(self, selected_prompt_name: str) -> PendingSelector:
+        """Selects index entries whose summary is missing or was made with another prompt, model or body."""
+        return PendingSelector(self.prompt_id(selected_prompt_name), self.model_name)
+
+    def _call_model(self, prompt_text: str):
+        """
+        Calls Gemini and returns (text, usage), where usage holds token counts when the API reports them.
+        The call shares the per-host politeness limits, and 429/503 errors are retried after the scheduler's backoff.
+        """
+        response = polite_call(GEMINI_HOST, lambda: self.model.generate_content(prompt_text), _api_error_status,
+                               operation='llm')
+        usage_metadata = getattr(response, 'usage_metadata', None)
+        usage = None
+        if usage_metadata is not None:
+            usage = {'input_tokens': getattr(usage_metadata, 'prompt_token_count', 0) or 0,
+                     'output_tokens': getattr(usage_metadata, 'candidates_token_count', 0) or 0}
+        return response.text, usage
+
+    def _generate(self, prompt_text: str):
+        """
+        Calls Gemini, or the active HTTP cassette when recording/replaying, and records latency and token usage.
+        Returns (text, usage); usage is None when the API did not report token counts.
+        """
+        cassette = get_active_cassette()
+        try:
+            with metrics.timer('llm_request_seconds', model=self.model_name):
+                if cassette is not None:
+                    text, usage = cassette.generate_text(self.model_name, prompt_text, self._call_model)
+                else:
+                    text, usage = self._call_model(prompt_text)
+        except Exception as e:
+            metrics.inc('llm_errors_total', model=self.model_name, error=type(e).__name__)
+            raise
+        metrics.inc('llm_requests_total', model=self.model_name)
+        if usage:
+            metrics.inc('llm_tokens_total', usage['input_tokens'], model=self.model_name, direction='in')
+            metrics.inc('llm_tokens_total', usage['output_tokens'], model=self.model_name, direction='out')
+        return text, usage
+
+    def process_item(self, item: dict, selected_prompt_name: str, reserved_tokens: int = None) -> dict:
+        """
+        Processes a single item for summarization.
+        With a budget, reserved_tokens were reserved before the call; the difference to the tokens reported by the
+        API is charged afterwards. A failed call keeps its reservation, since the request may still have been billed.
+        """
+        body = item.get('body') # bodies spilled to disk are read once here
+        if (not self.model and not is_replaying()) or not body:
+            if self.budget is not None and reserved_tokens:
+                self.budget.charge(-reserved_tokens)
+            metrics.inc('items_total', stage='summarize', result='skipped')
             item['summary'] = ""
             if not self.save_raw_content:
                 item.pop('body', None)
             return item
 
         try:
-            prompt_text = self._get_prompt_text(selected_prompt_name, item['body'])
-            response = self.model.generate_content(prompt_text)
-            item['summary'] = response.text
+            prompt_text = self._get_prompt_text(selected_prompt_name, body)
+            item['summary'], usage = self._generate(prompt_text)
+            if self.budget is not None and usage:
+                self.budget.charge(usage['input_tokens'] + usage['output_tokens'] - (reserved_tokens or 0))
+            # Recorded so the pending selector can skip this item until the prompt, model or body changes
+            item['summary_prompt'] = self.prompt_id(selected_prompt_name)
+            item['summary_model'] = self.model_name
+            item['summary_body_hash'] = body_hash(body)
+            metrics.inc('items_total', stage='summarize', result='summarized')
         except Exception as e:
             print(f"Error summarizing item {item.get('title')}: {e}")
-            item['summary'] = "요약 생성 중 오류 발생"
+            item['summary'] = SUMMARY_ERROR_TEXT
+            metrics.inc('items_total', stage='summarize', result='error')
         
         if not self.save_raw_content:
             item.pop('body', None)
         return item
 
-    def summarize_data(self, data_list: list[dict], selected_prompt_name: str, progress_callback=None) -> list[dict]:
+    def summarize_data(self, data_list: list[dict], selected_prompt_name: str, progress_callback=None, item_callback=None) -> list[dict]:
         """
         Summarizes a list of data items using the specified prompt.
         
@@ -55,19 +136,47 @@ class Summarizer:
             selected_prompt_name: The name of the prompt to use from the 'prompts' dictionary.
             progress_callback: An optional function to call with current progress (e.g., for UI updates).
                                It should accept two arguments: current_index and total_items.
+            item_callback: An optional function called with each summarized item as soon as it is done
+                           (e.g., to write it to the run journal).
         
+        With a budget, items are processed in priority order and items whose estimated tokens no longer fit the
+        daily or per-run budget are deferred: they are returned unchanged (no summary) so that they stay pending
+        and are picked up first by the next run.
+
         Returns:
-            A list of dictionaries with 'summary' added to each item.
+            A list of dictionaries with 'summary' added to each item, in the original order.
         """
         if not self.enabled:
             print("Summarization is disabled. Skipping.")
             return data_list
 
-        summarized_items = []
+        summarized_items = list(data_list)
         total_items = len(data_list)
-        for i, item_data in enumerate(data_list):
-            summarized_item = self.process_item(item_data, selected_prompt_name)
-            summarized_items.append(summarized_item)
+        order = range(total_items)
+        if self.budget is not None:
+            _, prompt_template = self._resolve_prompt(selected_prompt_name, warn=False)
+            order = self.budget.order(data_list)
+            self.budget.start_run()
+        deferred = 0
+        for i, index in enumerate(order):
+            item_data = data_list[index]
+            reserved_tokens = None
+            if self.budget is not None and body_length(item_data):
+                reserved_tokens = self.budget.estimate(item_data, prompt_template)
+                if not self.budget.reserve(reserved_tokens):
+                    deferred += 1
+                    metrics.inc('items_total', stage='summarize', result='deferred')
+                    if progress_callback:
+                        progress_callback(i + 1, total_items)
+                    continue
+            summarized_item = self.process_item(item_data, selected_prompt_name, reserved_tokens)
+            summarized_items[index] = summarized_item
+            if item_callback:
+                item_callback(summarized_item)
             if progress_callback:
                 progress_callback(i + 1, total_items)
+        if deferred:
+            used_today = f", {self.budget.used_today()} today" if self.budget.daily_tokens is not None else ""
+            print(f"Token budget exhausted: deferred {deferred} of {total_items} items to the next run "
+                  f"({self.budget.run_used} tokens used this run{used_today}).")
         return summarized_items
\ No newline at end of file
@@ -0,0 +1,4 @@
+from .job_queue import JobQueue, default_owner
+from .scheduler import Scheduler
+from .worker import Worker, job_queue_from_config, worker_pid, spawn_worker, start_worker, write_pid_file, remove_pid_file
+from .shards import ShardCoordinator, SHARD_KIND, write_shard_output, read_shard_output
@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    run_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_expires_at REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT,
+    result TEXT,
+    progress TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_run_at ON jobs(status, run_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_kind_key ON jobs(kind, key);
+CREATE TABLE IF NOT EXISTS schedules (
+    name TEXT PRIMARY KEY,
+    next_run_at REAL NOT NULL,
+    last_run_at REAL
+);
+"""
+
+# 작업 상태: pending -> running -> done / failed (재시도가 남아 있으면 다시 pending)
+PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+
+
+def default_owner():
+    """작업을 가져간 프로세스를 구분하는 이름 (호스트명:PID)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    SQLite 파일에 저장되는 영구 작업 큐입니다. 프로세스가 재시작되어도 대기 중인 작업이 남아 있습니다.
+
+    * enqueue(): 같은 (kind, key)의 작업이 이미 대기 중이면 새로 쌓지 않고 하나로 합칩니다(coalesce).
+    * claim(): 실행할 작업 하나를 임대(lease)와 함께 가져갑니다. 임대 시간이 지나도 완료되지 않은 작업
+      (작업자가 비정상 종료된 경우)은 다른 작업자가 다시 가져갈 수 있습니다.
+    * complete() / fail(): 작업 결과를 기록합니다. 실패한 작업은 max_attempts까지 retry_delay 후 재시도합니다.
+    """
+
+    def __init__(self, db_path="results/jobs.db", lease_seconds=900, max_attempts=3, retry_delay_seconds=60,
+                 journal_mode='WAL'):
+        self.db_path = os.path.abspath(db_path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        self.journal_mode = journal_mode
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        # 여러 프로세스가 같은 파일을 사용하므로 트랜잭션은 BEGIN IMMEDIATE로 직접 관리
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # WAL은 공유 메모리를 사용하므로 NFS 등 여러 호스트가 공유하는 파일 시스템에서는 journal_mode='DELETE'를 사용
+        self.conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        if 'progress' not in columns: # 진행 상황 컬럼이 없던 이전 버전의 큐 파일
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN progress TEXT")
+
+    def _transaction(self):
+        return _ImmediateTransaction(self.conn)
+
+    @staticmethod
+    def _to_job(row):
+        if row is None:
+            return None
+        job = dict(row)
+        for key in ('payload', 'result', 'progress'):
+            job[key] = json.loads(job[key]) if job[key] else None
+        return job
+
+    def enqueue(self, kind, key, payload=None, run_at=None, coalesce=True):
+        """
+        작업을 추가하고 작업 ID를 반환합니다.
+        coalesce가 True이고 같은 (kind, key)의 작업이 대기 중이면, 그 작업의 ID를 반환합니다(실행 시각은 더 이른 쪽).
+        """
+        run_at = time.time() if run_at is None else run_at
+        payload_json = json.dumps(payload, ensure_ascii=False) if payload is not None else None
+        with self._transaction():
+            if coalesce:
+                row = self.conn.execute(
+                    "SELECT id, run_at FROM jobs WHERE kind = ? AND key = ? AND status = ? ORDER BY id LIMIT 1",
+                    (kind, key, PENDING)
+                ).fetchone()
+                if row is not None:
+                    if run_at < row['run_at']:
+                        self.conn.execute("UPDATE jobs SET run_at = ? WHERE id = ?", (run_at, row['id']))
+                    return row['id']
+            cursor = self.conn.execute(
+                "INSERT INTO jobs (kind, key, payload, status, run_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, payload_json, PENDING, run_at, time.time())
+            )
+            return cursor.lastrowid
+
+    def claim(self, owner=None, kinds=None, lease_seconds=None):
+        """
+        실행할 때가 된 작업 하나를 가져와 running 상태로 바꾸고 반환합니다. 없으면 None을 반환합니다.
+        kinds를 지정하면 해당 종류의 작업만 가져갑니다.
+        """
+        owner = owner or default_owner()
+        lease_seconds = self.lease_seconds if lease_seconds is None else lease_seconds
+        now = time.time()
+        kind_filter = ''
+        params = [PENDING, now, RUNNING, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+        with self._transaction():
+            row = self.conn.execute(
+                "SELECT * FROM jobs WHERE ((status = ? AND run_at <= ?) OR (status = ? AND lease_expires_at < ?))"
+                f"{kind_filter} ORDER BY run_at, id LIMIT 1",
+                params
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, lease_expires_at = ?, started_at = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (RUNNING, owner, now + lease_seconds, now, row['id'])
+            )
+            return self.get(row['id'])
+
+    def renew(self, job_id, lease_seconds=None):
+        """오래 걸리는 작업의 임대 시간을 연장합니다."""
+        lease_seconds = self.lease_seconds if lease_seconds is None else lease_seconds
+        self.conn.execute("UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = ?",
+                          (time.time() + lease_seconds, job_id, RUNNING))
+
+    @contextmanager
+    def keep_lease(self, job_id):
+        """
+        블록이 실행되는 동안 별도 스레드가 작업의 임대 시간을 lease_seconds의 1/3마다 연장합니다.
+        진행 상황 기록이 뜸한 긴 작업도 임대가 만료되어 다른 프로세스가 다시 가져가지 않습니다.
+        """
+        done = threading.Event()
+
+        def heartbeat():
+            # 작업 스레드와 연결을 공유하지 않도록 별도 연결 사용
+            queue = JobQueue(self.db_path, lease_seconds=self.lease_seconds, journal_mode=self.journal_mode)
+            try:
+                while not done.wait(max(1.0, self.lease_seconds / 3)):
+                    queue.renew(job_id)
+            finally:
+                queue.close()
+
+        thread = threading.Thread(target=heartbeat, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def complete(self, job_id, result=None):
+        self.conn.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, lease_expires_at = NULL, result = ? WHERE id = ?",
+            (DONE, time.time(), json.dumps(result, ensure_ascii=False) if result is not None else None, job_id)
+        )
+
+    def fail(self, job_id, error, retry=True):
+        """
+        작업 실패를 기록합니다. retry가 True이고 시도 횟수가 max_attempts보다 적으면 retry_delay_seconds 후 다시 실행되도록
+        대기 상태로 돌립니다.
+        """
+        with self._transaction():
+            row = self.conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if retry and row is not None and row['attempts'] < self.max_attempts:
+                self.conn.execute(
+                    "UPDATE jobs SET status = ?, run_at = ?, lease_expires_at = NULL, error = ? WHERE id = ?",
+                    (PENDING, time.time() + self.retry_delay_seconds, str(error), job_id)
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, lease_expires_at = NULL, error = ? WHERE id = ?",
+                    (FAILED, time.time(), str(error), job_id)
+                )
+
+    def release(self, job_id):
+        """실행 중인 작업을 시도 횟수에 포함하지 않고 즉시 대기 상태로 되돌립니다 (작업자 종료 시)."""
+        self.conn.execute(
+            "UPDATE jobs SET status = ?, run_at = ?, owner = NULL, lease_expires_at = NULL, attempts = attempts - 1 "
+            "WHERE id = ? AND status = ?",
+            (PENDING, time.time(), job_id, RUNNING)
+        )
+
+    def cancel(self, job_ids, reason='cancelled'):
+        """아직 시작하지 않은 작업들을 실패로 기록하여 작업자가 가져가지 않도록 합니다."""
+        with self._transaction():
+            for job_id in job_ids:
+                self.conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ? AND status = ?",
+                    (FAILED, time.time(), reason, job_id, PENDING)
+                )
+
+    def update_progress(self, job_id, progress):
+        """
+        실행 중인 작업의 진행 상황(JSON으로 직렬화 가능한 dict)을 기록하고 임대 시간을 연장합니다.
+        다른 프로세스(대시보드 등)는 get()으로 진행 상황을 읽습니다.
+        """
+        self.conn.execute("UPDATE jobs SET progress = ?, lease_expires_at = ? WHERE id = ? AND status = ?",
+                          (json.dumps(progress, ensure_ascii=False), time.time() + self.lease_seconds, job_id, RUNNING))
+
+    def get(self, job_id):
+        return self._to_job(self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list_jobs(self, kind=None, limit=20):
+        """최근 작업들을 최신순으로 반환합니다."""
+        if kind is None:
+            rows = self.conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+        else:
+            rows = self.conn.execute("SELECT * FROM jobs WHERE kind = ? ORDER BY id DESC LIMIT ?", (kind, limit))
+        return [self._to_job(row) for row in rows.fetchall()]
+
+    def pending_count(self, kind=None):
+        if kind is None:
+            return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (PENDING,)).fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ? AND kind = ?", (PENDING, kind)).fetchone()[0]
+
+    def next_run_at(self, name):
+        """스케줄 이름(소스 이름 등)의 다음 실행 시각을 반환합니다. 기록이 없으면 None."""
+        row = self.conn.execute("SELECT next_run_at FROM schedules WHERE name = ?", (name,)).fetchone()
+        return row['next_run_at'] if row is not None else None
+
+    def set_next_run_at(self, name, next_run_at, last_run_at=None):
+        self.conn.execute(
+            "INSERT INTO schedules (name, next_run_at, last_run_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET next_run_at = excluded.next_run_at, "
+            "last_run_at = COALESCE(excluded.last_run_at, schedules.last_run_at)",
+            (name, next_run_at, last_run_at)
+        )
+
+    def close(self):
+        self.conn.close()
+
+
+class _ImmediateTransaction:
+    """쓰기 잠금을 먼저 잡는 트랜잭션 (다른 프로세스와 같은 작업을 동시에 가져가지 않도록)."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        return False
@@ -0,0 +1,85 @@
+import time
+import random
+import signal
+import threading
+from .job_queue import JobQueue, default_owner
+
+
+class Scheduler:
+    """
+    이름(소스)별 실행 주기와 지터에 따라 작업을 영구 작업 큐에 넣고, 큐에서 꺼낸 작업을 handler로 실행하는 장기 실행 루프입니다.
+
+    다음 실행 시각은 큐의 schedules 테이블에 저장되므로 프로세스를 다시 시작해도 주기가 유지됩니다.
+    데몬이 멈춰 있던 동안 놓친 실행이나, 이전 작업이 아직 대기 중일 때 돌아온 실행은 하나의 작업으로 합쳐집니다.
+    """
+
+    def __init__(self, queue: JobQueue, schedules, kind='collect', poll_seconds=1.0, owner=None):
+        # schedules: {이름: {'interval_seconds': 주기, 'jitter_seconds': 지터}}
+        self.queue = queue
+        self.schedules = schedules
+        self.kind = kind
+        self.poll_seconds = poll_seconds
+        self.owner = owner or default_owner()
+        self._stop = threading.Event()
+
+    def _next_time(self, name, now):
+        schedule = self.schedules[name]
+        # 여러 소스가 같은 시각에 몰리지 않도록 0~jitter 초를 더함
+        return now + schedule['interval_seconds'] + random.uniform(0, schedule.get('jitter_seconds', 0))
+
+    def enqueue_due(self, now=None):
+        """실행할 때가 된 이름들의 작업을 큐에 넣고, 다음 대기 시간(초)을 반환합니다."""
+        now = time.time() if now is None else now
+        wait = self.poll_seconds
+        for name in self.schedules:
+            next_run_at = self.queue.next_run_at(name)
+            if next_run_at is None or next_run_at <= now:
+                # 놓친 실행이 여러 번이어도 대기 중인 작업 하나로 합쳐짐
+                self.queue.enqueue(self.kind, name)
+                next_run_at = self._next_time(name, now)
+                self.queue.set_next_run_at(name, next_run_at, last_run_at=now)
+            wait = min(wait, max(0.0, next_run_at - now))
+        return wait
+
+    def run_once(self, handler):
+        """
+        대기 중인 작업 하나를 실행합니다. 실행한 작업이 있으면 True를 반환합니다.
+        handler(job)의 반환값은 작업 결과로 기록되고, 예외가 발생하면 재시도 대상으로 기록됩니다.
+        실행 중에는 임대 시간을 주기적으로 연장하므로, 같은 큐를 공유하는 다른 데몬이 긴 작업을 다시 가져가지 않습니다.
+        """
+        job = self.queue.claim(self.owner, kinds=[self.kind])
+        if job is None:
+            return False
+        try:
+            with self.queue.keep_lease(job['id']):
+                result = handler(job)
+        except KeyboardInterrupt:
+            # 중단된 작업은 다음 실행에서 바로 다시 가져갈 수 있도록 되돌림
+            self.queue.release(job['id'])
+            raise
+        except Exception as e:
+            print(f"Error running {job['kind']} job for '{job['key']}': {e}")
+            self.queue.fail(job['id'], e)
+        else:
+            self.queue.complete(job['id'], result)
+        return True
+
+    def run_forever(self, handler):
+        """stop()이 호출되거나 SIGTERM/SIGINT를 받을 때까지 작업을 스케줄하고 실행합니다."""
+        previous_handler = None
+        if threading.current_thread() is threading.main_thread():
+            previous_handler = signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+        try:
+            while not self._stop.is_set():
+                wait = self.enqueue_due()
+                if self.run_once(handler):
+                    continue
+                self._stop.wait(wait)
+        except KeyboardInterrupt:
+            print("Stopping scheduler...")
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGTERM, previous_handler)
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,97 @@
+import os
+import json
+import time
+import uuid
+import shutil
+from src.storage.journal import encode_value, decode_value
+from src.storage.item import Item
+from .job_queue import JobQueue, DONE, FAILED
+
+# 분산 수집 샤드 작업의 종류 (작업 큐의 kind)
+SHARD_KIND = 'shard'
+
+
+def write_shard_output(path, items):
+    """샤드 결과를 JSON Lines로 저장합니다. 재시도된 샤드가 반쯤 쓴 파일을 남기지 않도록 임시 파일을 교체합니다."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False, default=encode_value) + '\n')
+    os.replace(tmp_path, path)
+
+
+def read_shard_output(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [Item(json.loads(line, object_hook=decode_value)) for line in f if line.strip()]
+
+
+class ShardCoordinator:
+    """
+    소스별 수집을 샤드(플레이리스트, Raindrop 컬렉션, 게시글 URL 묶음, 볼트 폴더)로 나눠 작업 큐에 넣고,
+    작업자들이 샤드 결과를 모두 기록할 때까지 기다린 뒤 샤드 순서대로 합칩니다.
+
+    작업 큐와 output_dir을 공유하는 작업자(python main.py cli.mode=worker)라면 같은 호스트의 다른 프로세스든
+    공유 파일 시스템을 사용하는 다른 호스트든 샤드를 가져갈 수 있습니다. 작업자가 비정상 종료되면 임대 시간이 지난 뒤
+    다른 작업자가 다시 실행하며, 실패한 샤드는 큐의 max_attempts까지 재시도합니다.
+    """
+
+    def __init__(self, queue: JobQueue, output_dir="results/shards", poll_seconds=1.0):
+        self.queue = queue
+        self.output_dir = os.path.abspath(output_dir)
+        self.poll_seconds = poll_seconds
+
+    def submit(self, shards):
+        """
+        shards: [(소스 이름, 소스 설정 dict)] 리스트를 작업 큐에 넣고 (실행 ID, 작업 ID 리스트)를 반환합니다.
+        """
+        run_id = uuid.uuid4().hex[:12]
+        run_dir = os.path.join(self.output_dir, run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        job_ids = []
+        for index, (source_name, source_config) in enumerate(shards):
+            payload = {
+                'run_id': run_id,
+                'index': index,
+                'source': source_name,
+                'config': source_config,
+                'output': os.path.join(run_dir, f"{index:05d}.jsonl"),
+            }
+            job_ids.append(self.queue.enqueue(SHARD_KIND, f"{run_id}/{index}", payload, coalesce=False))
+        return run_id, job_ids
+
+    def wait(self, job_ids, worker=None, handler=None, progress_callback=None):
+        """
+        모든 샤드가 끝날 때까지 기다리고, 샤드 순서대로 (작업, 항목 리스트)를 반환합니다. 실패한 샤드의 항목은 빈 리스트입니다.
+        worker와 handler를 지정하면 기다리는 동안 코디네이터도 샤드를 실행합니다.
+        """
+        remaining = set(job_ids)
+        while remaining:
+            worked = worker is not None and worker.run_once(handler)
+            for job_id in list(remaining):
+                job = self.queue.get(job_id)
+                if job['status'] in (DONE, FAILED):
+                    remaining.discard(job_id)
+                    if progress_callback is not None:
+                        progress_callback(len(job_ids) - len(remaining), len(job_ids))
+            if remaining and not worked:
+                time.sleep(self.poll_seconds)
+
+        results = []
+        for job_id in job_ids:
+            job = self.queue.get(job_id)
+            items = []
+            if job['status'] == DONE:
+                items = read_shard_output(job['payload']['output'])
+            else:
+                print(f"Error: Shard {job['payload']['index']} of '{job['payload']['source']}' failed "
+                      f"after {job['attempts']} attempts: {job['error']}")
+            results.append((job, items))
+        return results
+
+    def cancel(self, job_ids):
+        """중단된 실행의 남은 샤드를 다른 작업자가 가져가지 않도록 취소합니다."""
+        self.queue.cancel(job_ids, reason='coordinator stopped')
+
+    def cleanup(self, run_id):
+        shutil.rmtree(os.path.join(self.output_dir, run_id), ignore_errors=True)
@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+import signal
+import threading
+import subprocess
+from .job_queue import JobQueue, default_owner
+
+
+class Worker:
+    """
+    영구 작업 큐에서 지정한 종류(kinds)의 작업을 꺼내 handler로 실행하는 백그라운드 작업자입니다.
+    대시보드는 작업을 큐에 넣기만 하고, 실제 수집/요약/인덱싱은 이 작업자 프로세스에서 실행되므로
+    브라우저를 새로고침하거나 닫아도 작업이 계속되며, 진행 상황은 큐(jobs.progress)에서 읽습니다.
+
+    handler(job, report)의 report(progress)로 진행 상황 dict를 기록합니다. 실행 중에는 별도 스레드가
+    임대 시간을 주기적으로 연장하므로, 진행 상황 기록이 뜸한 긴 단계에서도 다른 작업자가 작업을 가져가지 않습니다.
+    실패한 작업은 retry_kinds에 포함된 종류(분산 수집 샤드 등)만 큐의 max_attempts까지 재시도하고,
+    사용자가 요청한 대시보드 작업은 바로 실패로 기록합니다.
+    """
+
+    def __init__(self, queue: JobQueue, kinds, poll_seconds=1.0, idle_exit_seconds=None, owner=None, retry_kinds=()):
+        self.queue = queue
+        self.kinds = list(kinds)
+        self.retry_kinds = set(retry_kinds)
+        self.poll_seconds = poll_seconds
+        self.idle_exit_seconds = idle_exit_seconds # 이 시간 동안 작업이 없으면 종료 (None/0이면 계속 실행)
+        self.owner = owner or default_owner()
+        self._stop = threading.Event()
+
+    def run_once(self, handler):
+        """대기 중인 작업 하나를 실행합니다. 실행한 작업이 있으면 True를 반환합니다."""
+        job = self.queue.claim(self.owner, kinds=self.kinds)
+        if job is None:
+            return False
+        try:
+            with self.queue.keep_lease(job['id']):
+                result = handler(job, lambda progress: self.queue.update_progress(job['id'], progress))
+        except KeyboardInterrupt:
+            self.queue.release(job['id'])
+            raise
+        except Exception as e:
+            print(f"Error running {job['kind']} job #{job['id']}: {e}")
+            self.queue.fail(job['id'], e, retry=job['kind'] in self.retry_kinds)
+        else:
+            self.queue.complete(job['id'], result)
+        return True
+
+    def run_forever(self, handler):
+        """stop()이 호출되거나, SIGTERM/SIGINT를 받거나, idle_exit_seconds 동안 작업이 없을 때까지 작업을 실행합니다."""
+        previous_handler = None
+        if threading.current_thread() is threading.main_thread():
+            # 실행 중인 작업은 KeyboardInterrupt로 중단시켜 대기 상태로 되돌림
+            previous_handler = signal.signal(signal.SIGTERM, lambda signum, frame: self._interrupt())
+        idle_since = time.time()
+        try:
+            while not self._stop.is_set():
+                if self.run_once(handler):
+                    idle_since = time.time()
+                    continue
+                if self.idle_exit_seconds and time.time() - idle_since >= self.idle_exit_seconds:
+                    print(f"No jobs for {self.idle_exit_seconds}s. Stopping worker.")
+                    break
+                self._stop.wait(self.poll_seconds)
+        except KeyboardInterrupt:
+            print("Stopping worker...")
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGTERM, previous_handler)
+
+    def _interrupt(self):
+        self._stop.set()
+        raise KeyboardInterrupt
+
+    def stop(self):
+        self._stop.set()
+
+
+def job_queue_from_config(worker_cfg):
+    """worker 설정으로 대시보드 작업과 분산 수집 샤드가 공유하는 작업 큐를 엽니다."""
+    return JobQueue(worker_cfg.queue_path, lease_seconds=worker_cfg.lease_seconds,
+                    max_attempts=worker_cfg.get('max_attempts', 3),
+                    retry_delay_seconds=worker_cfg.get('retry_delay_seconds', 10),
+                    journal_mode=worker_cfg.get('journal_mode', 'WAL'))
+
+
+def worker_pid(pid_path):
+    """pid 파일의 작업자 프로세스가 살아 있으면 PID를, 아니면 None을 반환합니다."""
+    try:
+        with open(pid_path, 'r', encoding='utf-8') as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return None
+    return pid
+
+
+def write_pid_file(pid_path):
+    os.makedirs(os.path.dirname(os.path.abspath(pid_path)), exist_ok=True)
+    with open(pid_path, 'w', encoding='utf-8') as f:
+        f.write(str(os.getpid()))
+
+
+def remove_pid_file(pid_path):
+    if worker_pid(pid_path) == os.getpid():
+        os.remove(pid_path)
+
+
+def spawn_worker(log_path, args=()):
+    """작업자 프로세스(python main.py cli.mode=worker)를 Streamlit/CLI 프로세스와 별도의 세션으로 시작합니다."""
+    os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+    with open(log_path, 'a', encoding='utf-8') as log:
+        return subprocess.Popen([sys.executable, 'main.py', 'cli.mode=worker', *args],
+                                stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                                start_new_session=True)
+
+
+def start_worker(pid_path, log_path, args=()):
+    """
+    pid 파일의 작업자가 실행 중이 아니면 새로 시작하고 PID를 반환합니다.
+    작업자는 별도의 세션으로 실행되므로 대시보드가 재시작되어도 작업이 계속됩니다.
+    """
+    pid = worker_pid(pid_path)
+    if pid is not None:
+        return pid
+    process = spawn_worker(log_path, args)
+    # 작업자가 pid 파일을 쓰기 전에 다시 호출되어도 중복 실행되지 않도록 미리 기록
+    with open(pid_path, 'w', encoding='utf-8') as f:
+        f.write(str(process.pid))
+    return process.pid
@@ -1,19 +1,25 @@
-from .pytorch_kr import PyTorchKRSource
-from .gpters import GPTERSNewsSource
-from .raindrop import RaindropSource
-from .youtube import YouTubeSource
-from .obsidian import ObsidianSource
+import importlib
+
+# 소스 모듈은 BeautifulSoup, googleapiclient, youtube_transcript_api 등 무거운 의존성을 임포트하므로,
+# 패키지를 임포트할 때가 아니라 해당 소스를 실제로 사용할 때 임포트합니다.
+_SOURCE_CLASSES = {
+    'pytorch_kr': ('.pytorch_kr', 'PyTorchKRSource'),
+    'gpters': ('.gpters', 'GPTERSNewsSource'),
+    'raindrop': ('.raindrop', 'RaindropSource'),
+    'youtube': ('.youtube', 'YouTubeSource'),
+    'obsidian': ('.obsidian', 'ObsidianSource'),
+    'web': ('.web', 'WebSource'),
+}
+_CLASS_MODULES = {class_name: module for module, class_name in _SOURCE_CLASSES.values()}
 
 def get_source(source_name):
-    if source_name == "pytorch_kr":
-        return PyTorchKRSource
-    elif source_name == "gpters":
-        return GPTERSNewsSource
-    elif source_name == "raindrop":
-        return RaindropSource
-    elif source_name == "youtube":
-        return YouTubeSource
-    elif source_name == "obsidian":
-        return ObsidianSource
-    else:
+    if source_name not in _SOURCE_CLASSES:
         raise ValueError(f"Unknown source: {source_name}")
+    module_name, class_name = _SOURCE_CLASSES[source_name]
+    return getattr(importlib.import_module(module_name, __name__), class_name)
+
+def __getattr__(name):
+    # from src.sources import YouTubeSource 형태의 기존 임포트 지원 (PEP 562)
+    if name in _CLASS_MODULES:
+        return getattr(importlib.import_module(_CLASS_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
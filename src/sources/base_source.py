@@ -1,18 +1,40 @@
 from abc import ABC, abstractmethod
+from .html_parser import get_extractor
 
 class BaseSource(ABC):
-    def __init__(self, name, url, posts_to_scrape, selectors, output_fields, filter_keywords=None, **kwargs):
+    def __init__(self, name, url, posts_to_scrape, selectors, output_fields, filter_keywords=None, html_parser='html.parser', **kwargs):
         self.name = name
+        self.html = get_extractor(html_parser) # HTML 파서 백엔드 (html.parser, lxml, selectolax)
         self.url = url
         self.posts_to_scrape = posts_to_scrape
         self.selectors = selectors
         self.output_fields = output_fields
         self.filter_keywords = [kw.lower() for kw in filter_keywords] if filter_keywords else []
+        self.on_item = None # 항목 하나가 완성될 때마다 호출됨 (실행 저널 기록)
+        self.resume_items = {} # 중단된 이전 실행에서 이미 완성된 항목 {URL: 항목} (cli.resume)
 
     @abstractmethod
     def scrape(self):
         pass
 
+    def shards(self, batch_size=20):
+        """
+        분산 수집(shard.enabled)에서 이 소스의 수집을 나눌 단위를 반환합니다.
+        각 샤드는 소스 설정에 덮어쓸 값(dict)이며, 작업자는 덮어쓴 설정으로 만든 소스의 scrape()를 실행합니다.
+        기본값은 소스 전체를 하나의 샤드로 수집합니다.
+        """
+        return [{}]
+
+    def _emit(self, item):
+        """완성된 항목을 on_item으로 알리고 그대로 반환합니다."""
+        if self.on_item is not None:
+            self.on_item(item)
+        return item
+
+    def _resumed(self, url):
+        """중단된 이전 실행에서 이미 완성된 항목이 있으면 반환합니다 (상세 페이지나 자막을 다시 가져오지 않도록)."""
+        return self.resume_items.get(url)
+
     def _apply_filters(self, posts):
         if not self.filter_keywords:
             return posts
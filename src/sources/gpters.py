@@ -1,49 +1,78 @@
 import requests
-from bs4 import BeautifulSoup
 from .base_source import BaseSource
+from .html_parser import get_extractor
+from src.net.http import http_get
+from src.net.pipeline import fetch_and_extract
+from src.storage.item import Item, as_items
+
+def extract_post_body(html, post_body_selector, parser='html.parser', source=None):
+    """
+    GPTERS 뉴스 게시글 페이지 HTML에서 본문을 추출합니다.
+    """
+    document = get_extractor(parser).parse(html, scope=[post_body_selector], source=source)
+    # GPTERS.org 뉴스 페이지의 본문 선택자 (예시, 실제 확인 필요)
+    return document.select_one(post_body_selector).text(strip=True)
 
 class GPTERSNewsSource(BaseSource):
-    def __init__(self, name, url, posts_to_scrape, selectors, output_fields, filter_keywords=None, **kwargs):
+    def __init__(self, name, url, posts_to_scrape, selectors, output_fields, filter_keywords=None, posts=None, **kwargs):
         super().__init__(name, url, posts_to_scrape, selectors, output_fields, filter_keywords=filter_keywords, **kwargs)
+        self.posts = posts # 분산 수집 샤드: 목록 페이지 대신 이 게시글들({title, url})의 본문만 가져옴
+
+    def _list_posts(self):
+        response = http_get(self.url, source=self.name)
+        response.raise_for_status()
+        document = self.html.parse(response.text, scope=[self.selectors.post_item], source=self.name)
+
+        posts = []
+        limit = self.posts_to_scrape if self.posts_to_scrape != -1 else None
+
+        # GPTERS.org 뉴스 페이지의 게시글 선택자 (예시, 실제 확인 필요)
+        # 실제 웹사이트 구조에 따라 선택자를 조정해야 합니다.
+        for item in document.select(self.selectors.post_item)[:limit]:
+            title_element = item.select_one(self.selectors.title)
+            url_element = item.select_one(self.selectors.url)
+
+            if title_element and url_element:
+                title = title_element.text(strip=True)
+                post_url = url_element.attr('href')
+                posts.append({'title': title, 'url': post_url, 'source': self.name})
+        return posts
+
+    def shards(self, batch_size=20):
+        # 목록 페이지는 한 번만 가져오고, 게시글 본문을 batch_size개씩 나눔
+        try:
+            posts = self._list_posts()
+        except requests.exceptions.RequestException as e:
+            print(f"Error scraping {self.name}: {e}")
+            return []
+        return [{'posts': posts[i:i + batch_size]} for i in range(0, len(posts), batch_size)]
 
     def scrape(self):
         try:
-            response = requests.get(self.url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            posts = []
-            limit = self.posts_to_scrape if self.posts_to_scrape != -1 else None
-
-            # GPTERS.org 뉴스 페이지의 게시글 선택자 (예시, 실제 확인 필요)
-            # 실제 웹사이트 구조에 따라 선택자를 조정해야 합니다.
-            for item in soup.select(self.selectors.post_item)[:limit]:
-                title_element = item.select_one(self.selectors.title)
-                url_element = item.select_one(self.selectors.url)
-                
-                if title_element and url_element:
-                    title = title_element.get_text(strip=True)
-                    post_url = url_element['href']
-                    posts.append({'title': title, 'url': post_url, 'source': self.name})
-            
+            if self.posts is not None:
+                posts = [Item(title=post['title'], url=post['url'], source=self.name) for post in self.posts]
+            else:
+                posts = as_items(self._list_posts())
+
             # 각 게시글의 상세 정보(본문, 작성자 등)를 가져오는 로직 추가
+            pending = []
             for post in posts:
-                post['body'] = self._get_post_body(post['url'])
+                resumed = self._resumed(post['url'])
+                if resumed is not None:
+                    post.update(resumed)
+                else:
+                    pending.append(post)
+            results = fetch_and_extract([post['url'] for post in pending], extract_post_body,
+                                        self.selectors.post_body, self.html.backend, self.name, source=self.name)
+            for post, body in zip(pending, results):
+                if isinstance(body, Exception):
+                    print(f"Error fetching post body from {post['url']}: {body}")
+                    body = ""
+                post['body'] = body
+                self._emit(post)
                 # author, date 등 추가 정보 수집 로직은 향후 구현
 
             return self._apply_filters(posts)
         except requests.exceptions.RequestException as e:
             print(f"Error scraping {self.name}: {e}")
             return []
-
-    def _get_post_body(self, url):
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            # GPTERS.org 뉴스 페이지의 본문 선택자 (예시, 실제 확인 필요)
-            body = soup.select_one(self.selectors.post_body).get_text(strip=True)
-            return body
-        except Exception as e:
-            print(f"Error fetching post body from {url}: {e}")
-            return ""
\ No newline at end of file
@@ -0,0 +1,125 @@
+import re
+from src.monitoring import metrics
+
+# 지원하는 파서 백엔드
+#   html.parser: 파이썬 내장 파서 (가장 느림, 추가 의존성 없음)
+#   lxml: BeautifulSoup + lxml 토크나이저
+#   selectolax: lexbor 기반 C 파서 (가장 빠름, pip install selectolax)
+BACKENDS = ('html.parser', 'lxml', 'selectolax')
+
+# 셀렉터의 첫 번째 단순 선택자(예: 'div.post', '.crawler-post-infos')
+_COMPOUND_PATTERN = re.compile(r'^([a-zA-Z][\w-]*)?((?:\.[\w-]+)+)$')
+
+
+def _scope_classes(selectors):
+    """
+    셀렉터들의 첫 번째 단순 선택자에서 클래스 이름을 모읍니다.
+    모든 셀렉터가 클래스를 포함해야 범위 파싱이 가능하며, 그렇지 않으면 None을 반환합니다.
+    """
+    classes = set()
+    for selector in selectors:
+        for part in selector.split(','):
+            compound = part.strip().split()[0] if part.strip() else ''
+            match = _COMPOUND_PATTERN.match(compound)
+            if not match:
+                return None
+            classes.add(match.group(2).split('.')[1])
+    return classes or None
+
+
+class HTMLNode:
+    """백엔드와 무관하게 텍스트와 속성을 꺼내는 요소 래퍼입니다."""
+
+    def __init__(self, node, backend):
+        self._node = node
+        self._backend = backend
+
+    def text(self, strip=True):
+        if self._backend == 'selectolax':
+            return self._node.text(strip=strip)
+        return self._node.get_text(strip=strip)
+
+    def attr(self, name, default=None):
+        if self._backend == 'selectolax':
+            value = self._node.attributes.get(name)
+            return default if value is None else value
+        return self._node.get(name, default)
+
+    def select(self, selector):
+        return _select(self._node, selector, self._backend)
+
+    def select_one(self, selector):
+        return _select_one(self._node, selector, self._backend)
+
+
+def _select(node, selector, backend):
+    nodes = node.css(selector) if backend == 'selectolax' else node.select(selector)
+    return [HTMLNode(n, backend) for n in nodes]
+
+
+def _select_one(node, selector, backend):
+    found = node.css_first(selector) if backend == 'selectolax' else node.select_one(selector)
+    return HTMLNode(found, backend) if found is not None else None
+
+
+class HTMLDocument(HTMLNode):
+    def title(self):
+        if self._backend == 'selectolax':
+            node = self._node.css_first('title')
+            return node.text(strip=False) if node is not None else None
+        return self._node.title.string if self._node.title else None
+
+
+class HTMLExtractor:
+    """
+    소스들이 설정된 셀렉터로 필요한 값만 꺼낼 수 있도록 HTML 파서 백엔드를 감싼 인터페이스입니다.
+    parse(html, scope=[셀렉터...])로 호출하면, 가능한 경우 해당 셀렉터의 하위 트리만 파싱합니다(SoupStrainer).
+    """
+
+    def __init__(self, backend='html.parser'):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown HTML parser backend: {backend}. Choose one of {', '.join(BACKENDS)}")
+        if backend == 'selectolax':
+            try:
+                from selectolax.lexbor import LexborHTMLParser
+                self._parser_class = LexborHTMLParser
+            except ImportError:
+                print("Warning: selectolax is not installed. Falling back to the 'lxml' HTML parser.")
+                backend = 'lxml'
+        if backend == 'lxml':
+            try:
+                import lxml # noqa: F401
+            except ImportError:
+                print("Warning: lxml is not installed. Falling back to the 'html.parser' HTML parser.")
+                backend = 'html.parser'
+        self.backend = backend
+
+    def parse(self, html, scope=None, source=None):
+        """
+        HTML 문자열(또는 bytes)을 파싱합니다.
+        scope: 이후에 사용할 셀렉터 리스트. BeautifulSoup 백엔드에서는 이 셀렉터들이 가리키는 요소의 하위 트리만 만듭니다.
+        """
+        with metrics.timer('parse_seconds', source=source, backend=self.backend):
+            if self.backend == 'selectolax':
+                if isinstance(html, bytes):
+                    html = html.decode('utf-8', errors='replace')
+                return HTMLDocument(self._parser_class(html), self.backend)
+
+            from bs4 import BeautifulSoup, SoupStrainer
+            parse_only = None
+            classes = _scope_classes(scope) if scope else None
+            if classes:
+                # 여러 클래스를 가진 요소도 매칭되도록 클래스 속성 전체 문자열에 대해 정규식으로 비교
+                pattern = re.compile(r'(?:^|\s)(?:' + '|'.join(re.escape(c) for c in sorted(classes)) + r')(?:\s|$)')
+                parse_only = SoupStrainer(class_=pattern)
+            return HTMLDocument(BeautifulSoup(html, self.backend, parse_only=parse_only), self.backend)
+
+
+_extractors = {}
+
+
+def get_extractor(backend='html.parser'):
+    """백엔드별 HTMLExtractor를 재사용합니다."""
+    if backend not in _extractors:
+        _extractors[backend] = HTMLExtractor(backend)
+    return _extractors[backend]
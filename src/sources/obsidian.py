@@ -1,23 +1,31 @@
+import mmap
 import os
-import glob
+import re
+import threading
+import time
 from .base_source import BaseSource
+from src.storage.item import Item
 from datetime import datetime
 
 class ObsidianSource(BaseSource):
-    def __init__(self, name, posts_to_scrape=-1, filter_keywords=None, vault_path=None, folder_paths=None, **kwargs):
+    def __init__(self, name, posts_to_scrape=-1, filter_keywords=None, vault_path=None, folder_paths=None, watch_debounce_seconds=2.0, **kwargs):
         super().__init__(name, None, posts_to_scrape, None, None, filter_keywords=filter_keywords, **kwargs)
         self.vault_path = vault_path
         self.folder_paths = folder_paths if folder_paths is not None else []
+        self.watch_debounce_seconds = watch_debounce_seconds
+        # 바이트 단위 사전 필터: 디코딩 없이 UTF-8로 인코딩된 키워드를 검색
+        self._keyword_pattern = re.compile(
+            b'|'.join(re.escape(kw.encode('utf-8')) for kw in self.filter_keywords),
+            re.IGNORECASE
+        ) if self.filter_keywords else None
+        self._watch_stop = threading.Event()
+        self._watch_wakeup = threading.Event()
 
-    def scrape(self):
+    def _get_target_dirs(self):
         if not self.vault_path or not os.path.isdir(self.vault_path):
             print(f"Error: Obsidian vault path '{self.vault_path}' is invalid or not found.")
             return []
 
-        markdown_files = []
-        limit = self.posts_to_scrape if self.posts_to_scrape != -1 else float('inf')
-        count = 0
-
         target_dirs = []
         if not self.folder_paths: # folder_paths가 비어있으면 전체 볼트 스캔
             target_dirs.append(self.vault_path)
@@ -28,35 +36,79 @@ class ObsidianSource(BaseSource):
                     target_dirs.append(target_dir)
                 else:
                     print(f"Warning: Obsidian folder path '{target_dir}' is invalid or not found. Skipping.")
-        
+
         if not target_dirs:
             print("Error: No valid Obsidian folders to scan.")
+        return target_dirs
+
+    def _matches_keywords(self, file_path):
+        """
+        파일을 디코딩하지 않고 mmap으로 열어 필터 키워드가 포함되어 있는지 확인합니다.
+        제목(파일명)에 키워드가 있으면 파일을 읽지 않습니다.
+        """
+        if self._keyword_pattern is None:
+            return True
+
+        title = os.path.splitext(os.path.basename(file_path))[0]
+        if self._keyword_pattern.search(title.encode('utf-8')):
+            return True
+
+        try:
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0: # 빈 파일은 mmap할 수 없음
+                    return False
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return self._keyword_pattern.search(mm) is not None
+        except (OSError, ValueError) as e:
+            print(f"Error reading file {file_path}: {e}")
+            return False
+
+    def _build_note(self, file_path):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except Exception as e:
+            print(f"Error reading file {file_path}: {e}")
+            return None
+
+        # 파일의 수정 시간을 발행일로 사용
+        modified_time = os.path.getmtime(file_path)
+        published_at = datetime.fromtimestamp(modified_time).isoformat()
+
+        return Item(
+            title=os.path.splitext(os.path.basename(file_path))[0],
+            url=f"file://{file_path}", # 로컬 파일 경로를 URL 형태로 저장
+            source=self.name,
+            body=content,
+            file_path=file_path,
+            published_at=published_at
+        )
+
+    def shards(self, batch_size=20):
+        # 지정한 폴더마다 하나의 샤드 (폴더를 지정하지 않으면 볼트 전체를 하나의 샤드로 수집)
+        return [{'folder_paths': [folder]} for folder in self.folder_paths] or [{}]
+
+    def scrape(self):
+        target_dirs = self._get_target_dirs()
+        if not target_dirs:
             return []
 
+        markdown_files = []
+        limit = self.posts_to_scrape if self.posts_to_scrape != -1 else float('inf')
+        count = 0
+
         for target_dir in target_dirs:
             for root, _, files in os.walk(target_dir):
                 for file in files:
                     if file.endswith('.md'):
                         file_path = os.path.join(root, file)
-                        try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                        except Exception as e:
-                            print(f"Error reading file {file_path}: {e}")
+                        # 키워드가 없는 파일은 디코딩하지 않고 건너뛰며, limit에도 포함하지 않음
+                        if not self._matches_keywords(file_path):
+                            continue
+                        note = self._build_note(file_path)
+                        if note is None:
                             continue
-                        
-                        # 파일의 수정 시간을 발행일로 사용
-                        modified_time = os.path.getmtime(file_path)
-                        published_at = datetime.fromtimestamp(modified_time).isoformat()
-
-                        markdown_files.append({
-                            'title': os.path.splitext(file)[0],
-                            'url': f"file://{file_path}", # 로컬 파일 경로를 URL 형태로 저장
-                            'source': self.name,
-                            'body': content,
-                            'file_path': file_path,
-                            'published_at': published_at
-                        })
+                        markdown_files.append(note)
                         count += 1
                         if count >= limit:
                             break
@@ -65,4 +117,90 @@ class ObsidianSource(BaseSource):
             if count >= limit:
                 break
 
-        return self._apply_filters(markdown_files)
+        return markdown_files
+
+    def watch(self, on_change):
+        """
+        볼트의 파일 시스템 변경 이벤트를 구독하고, 변경된 노트만 on_change(notes)로 전달합니다.
+
+        저장이 연달아 발생하는 경우 마지막 이벤트 이후 watch_debounce_seconds 동안 조용해질 때까지
+        기다렸다가 한 번에 처리합니다. 이벤트가 없는 동안에는 스레드가 블록되므로 유휴 CPU 사용량이 거의 없습니다.
+        stop()이 호출되거나 Ctrl-C가 입력될 때까지 반환하지 않습니다.
+        """
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            print("Error: Obsidian watch mode requires the 'watchdog' package. Install it with `pip install watchdog`.")
+            return
+
+        target_dirs = self._get_target_dirs()
+        if not target_dirs:
+            return
+
+        pending = {} # 변경된 파일 경로 -> 마지막 이벤트 시각
+        lock = threading.Lock()
+        wakeup = self._watch_wakeup
+
+        class _VaultEventHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                # opened/closed_no_write 이벤트는 노트를 읽기만 해도 발생하므로 무시
+                if event.is_directory or event.event_type not in ('created', 'modified', 'moved'):
+                    return
+                # 이동(이름 변경) 이벤트는 dest_path에 새 경로가 있음
+                for path in (getattr(event, 'src_path', None), getattr(event, 'dest_path', None)):
+                    if path and path.endswith('.md'):
+                        with lock:
+                            pending[path] = time.monotonic()
+                        wakeup.set()
+
+        observer = Observer()
+        handler = _VaultEventHandler()
+        for target_dir in target_dirs:
+            observer.schedule(handler, target_dir, recursive=True)
+        observer.start()
+        print(f"'{self.name}' 볼트 변경 감시 중: {', '.join(target_dirs)} (Ctrl-C로 종료)")
+
+        try:
+            while not self._watch_stop.is_set():
+                wakeup.wait()
+                wakeup.clear()
+
+                # 디바운스: 마지막 이벤트 이후 일정 시간 동안 추가 이벤트가 없을 때까지 대기
+                while not self._watch_stop.is_set():
+                    with lock:
+                        last_event = max(pending.values(), default=None)
+                    if last_event is None:
+                        break
+                    remaining = self.watch_debounce_seconds - (time.monotonic() - last_event)
+                    if remaining <= 0:
+                        break
+                    self._watch_stop.wait(remaining)
+
+                with lock:
+                    changed_paths = sorted(pending)
+                    pending.clear()
+
+                notes = []
+                for path in changed_paths:
+                    if not os.path.isfile(path): # 삭제되었거나 다른 이름으로 이동된 파일
+                        continue
+                    if not self._matches_keywords(path):
+                        continue
+                    note = self._build_note(path)
+                    if note is not None:
+                        notes.append(note)
+
+                if notes:
+                    print(f"'{self.name}' 변경된 노트 {len(notes)}개 처리 중...")
+                    on_change(notes)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            observer.stop()
+            observer.join()
+
+    def stop(self):
+        """watch() 루프를 종료합니다."""
+        self._watch_stop.set()
+        self._watch_wakeup.set()
@@ -1,79 +1,116 @@
 import requests
-from bs4 import BeautifulSoup
 from .base_source import BaseSource
+from .html_parser import get_extractor
+from src.net.http import http_get
+from src.net.pipeline import fetch_and_extract
+from src.storage.item import Item, as_items
 from datetime import datetime
 
+# 게시글 상세 페이지에서 사용하는 Discourse 셀렉터
+POST_TIME_SELECTOR = '.crawler-post-infos .post-time'
+VIEWS_SELECTOR = '.topic-views .number'
+LIKES_SELECTOR = '.likes .count'
+
+def extract_post_details(html, post_body_selector, parser='html.parser', source=None):
+    """
+    Discourse 게시글 페이지 HTML에서 본문, 작성일, 조회수, 추천수를 추출합니다.
+    """
+    # 필요한 요소의 하위 트리만 파싱
+    document = get_extractor(parser).parse(html, source=source,
+                                           scope=[post_body_selector, POST_TIME_SELECTOR, VIEWS_SELECTOR, LIKES_SELECTOR])
+
+    details = {}
+    # 본문
+    body_element = document.select_one(post_body_selector)
+    details['body'] = body_element.text(strip=True) if body_element else ""
+
+    # 작성일
+    try:
+        # Discourse 포럼의 일반적인 시간 요소 셀렉터
+        time_element = document.select_one(POST_TIME_SELECTOR)
+        if time_element and time_element.attr('title') is not None:
+            # 'title' 속성에 더 정확한 시간이 있는 경우가 많음
+            details['published_at'] = datetime.fromisoformat(time_element.attr('title').replace('Z', '+00:00')).isoformat()
+        elif time_element:
+            details['published_at'] = time_element.text(strip=True)
+        else:
+            details['published_at'] = datetime.now().isoformat() # Fallback
+    except Exception:
+        details['published_at'] = datetime.now().isoformat() # Fallback
+
+    # 조회수
+    try:
+        views_element = document.select_one(VIEWS_SELECTOR)
+        details['view_count'] = int(views_element.text(strip=True).replace(',', '')) if views_element else 0
+    except (ValueError, AttributeError):
+        details['view_count'] = 0
+
+    # 추천수 (좋아요)
+    try:
+        likes_element = document.select_one(LIKES_SELECTOR)
+        details['like_count'] = int(likes_element.text(strip=True).replace(',', '')) if likes_element else 0
+    except (ValueError, AttributeError):
+        details['like_count'] = 0
+
+    return details
+
 class PyTorchKRSource(BaseSource):
-    def __init__(self, name, url, posts_to_scrape, selectors, output_fields, filter_keywords=None, **kwargs):
+    def __init__(self, name, url, posts_to_scrape, selectors, output_fields, filter_keywords=None, posts=None, **kwargs):
         super().__init__(name, url, posts_to_scrape, selectors, output_fields, filter_keywords=filter_keywords, **kwargs)
+        self.posts = posts # 분산 수집 샤드: 목록 페이지 대신 이 게시글들({title, url})의 상세 페이지만 가져옴
+
+    def _list_posts(self):
+        response = http_get(self.url, source=self.name)
+        response.raise_for_status()
+        document = self.html.parse(response.text, scope=[self.selectors.post_item], source=self.name)
+
+        posts = []
+        limit = self.posts_to_scrape if self.posts_to_scrape != -1 else None
+
+        for item in document.select(self.selectors.post_item)[:limit]:
+            title = item.text(strip=True)
+            post_url = item.attr('href')
+            if not post_url.startswith('http'):
+                base_url = '{uri.scheme}://{uri.netloc}'.format(uri=requests.utils.urlparse(self.url))
+                post_url = base_url + post_url
+            posts.append({'title': title, 'url': post_url, 'source': self.name})
+        return posts
+
+    def shards(self, batch_size=20):
+        # 목록 페이지는 한 번만 가져오고, 상세 페이지를 batch_size개씩 나눔
+        try:
+            posts = self._list_posts()
+        except requests.exceptions.RequestException as e:
+            print(f"Error scraping {self.name}: {e}")
+            return []
+        return [{'posts': posts[i:i + batch_size]} for i in range(0, len(posts), batch_size)]
 
     def scrape(self):
         try:
-            response = requests.get(self.url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            posts = []
-            limit = self.posts_to_scrape if self.posts_to_scrape != -1 else None
+            if self.posts is not None:
+                posts = [Item(title=post['title'], url=post['url'], source=self.name) for post in self.posts]
+            else:
+                posts = as_items(self._list_posts())
 
-            for item in soup.select(self.selectors.post_item)[:limit]:
-                title = item.get_text(strip=True)
-                post_url = item['href']
-                if not post_url.startswith('http'):
-                    base_url = '{uri.scheme}://{uri.netloc}'.format(uri=requests.utils.urlparse(self.url))
-                    post_url = base_url + post_url
-                posts.append({'title': title, 'url': post_url, 'source': self.name})
-            
             # 각 게시글의 상세 정보(본문, 작성자 등)를 가져오는 로직 추가
+            # 상세 페이지는 동시에 가져오고, HTML 추출은 프로세스 풀에서 실행 (src/net/pipeline.py)
+            pending = []
             for post in posts:
-                details = self._get_post_details(post['url'])
+                resumed = self._resumed(post['url'])
+                if resumed is not None:
+                    post.update(resumed)
+                else:
+                    pending.append(post)
+            results = fetch_and_extract([post['url'] for post in pending], extract_post_details,
+                                        self.selectors.post_body, self.html.backend, self.name, source=self.name)
+            for post, details in zip(pending, results):
+                if isinstance(details, Exception):
+                    print(f"Error fetching post details from {post['url']}: {details}")
+                    details = {'body': '', 'published_at': datetime.now().isoformat(), 'view_count': 0, 'like_count': 0}
                 post.update(details)
+                self._emit(post)
 
             return self._apply_filters(posts)
         except requests.exceptions.RequestException as e:
             print(f"Error scraping {self.name}: {e}")
             return []
-
-    def _get_post_details(self, url):
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            details = {}
-            # 본문
-            body_element = soup.select_one(self.selectors.post_body)
-            details['body'] = body_element.get_text(strip=True) if body_element else ""
-
-            # 작성일
-            try:
-                # Discourse 포럼의 일반적인 시간 요소 셀렉터
-                time_element = soup.select_one('.crawler-post-infos .post-time')
-                if time_element and time_element.has_attr('title'):
-                    # 'title' 속성에 더 정확한 시간이 있는 경우가 많음
-                    details['published_at'] = datetime.fromisoformat(time_element['title'].replace('Z', '+00:00')).isoformat()
-                elif time_element:
-                    details['published_at'] = time_element.get_text(strip=True)
-                else:
-                    details['published_at'] = datetime.now().isoformat() # Fallback
-            except Exception:
-                details['published_at'] = datetime.now().isoformat() # Fallback
-
-            # 조회수
-            try:
-                views_element = soup.select_one('.topic-views .number')
-                details['view_count'] = int(views_element.get_text(strip=True).replace(',', '')) if views_element else 0
-            except (ValueError, AttributeError):
-                details['view_count'] = 0
-
-            # 추천수 (좋아요)
-            try:
-                likes_element = soup.select_one('.likes .count')
-                details['like_count'] = int(likes_element.get_text(strip=True).replace(',', '')) if likes_element else 0
-            except (ValueError, AttributeError):
-                details['like_count'] = 0
-
-            return details
-        except Exception as e:
-            print(f"Error fetching post details from {url}: {e}")
-            return {'body': '', 'published_at': datetime.now().isoformat(), 'view_count': 0, 'like_count': 0}
@@ -1,8 +1,25 @@
 import requests
-from bs4 import BeautifulSoup
 from .base_source import BaseSource
+from .html_parser import get_extractor
+from src.net.http import http_get
+from src.net.pipeline import fetch_and_extract
+from src.storage.item import Item
 from src.auth.raindrop_auth import RaindropAuthenticator
 
+# 웹 페이지의 주요 본문 내용을 추출하는 일반적인 선택자들
+# 이 부분은 웹사이트마다 다를 수 있으므로, 필요에 따라 조정해야 합니다.
+WEB_CONTENT_SELECTOR = 'article, .entry-content, .post-content, .article-body, .main-content'
+
+def extract_web_content_body(html, parser='html.parser', source=None):
+    """
+    웹 페이지 HTML에서 본문을 추출합니다.
+    """
+    document = get_extractor(parser).parse(html, source=source)
+    body_elements = document.select(WEB_CONTENT_SELECTOR)
+    if body_elements:
+        return body_elements[0].text(strip=True)
+    return ""
+
 class RaindropSource(BaseSource):
     def __init__(self, name, posts_to_scrape, filter_keywords=None, collection_ids=None, **kwargs):
         super().__init__(name, None, posts_to_scrape, None, None, filter_keywords=filter_keywords, **kwargs)
@@ -18,7 +35,7 @@ class RaindropSource(BaseSource):
         
         url = f"{self.base_api_url}collections"
         try:
-            response = requests.get(url, headers=headers)
+            response = http_get(url, source=self.name, headers=headers)
             response.raise_for_status()
             data = response.json()
             collections = {item['_id']: item['title'] for item in data.get('items', [])}
@@ -27,6 +44,10 @@ class RaindropSource(BaseSource):
             print(f"Error fetching Raindrop collections: {e}")
             return {}
 
+    def shards(self, batch_size=20):
+        # 지정한 컬렉션마다 하나의 샤드 (컬렉션을 지정하지 않으면 전체를 하나의 샤드로 수집)
+        return [{'collection_ids': [collection_id]} for collection_id in self.collection_ids] or [{}]
+
     def scrape(self):
         headers = self.authenticator.get_headers()
         if not headers:
@@ -48,46 +69,42 @@ class RaindropSource(BaseSource):
                 url = f"{self.base_api_url}raindrops"
 
             try:
-                response = requests.get(url, headers=headers, params=params)
+                response = http_get(url, source=self.name, headers=headers, params=params)
                 response.raise_for_status()
                 data = response.json()
                 
                 for item in data.get('items', []):
-                    raindrop = {
-                        'title': item.get('title'),
-                        'url': item.get('link'),
-                        'source': self.name,
-                        'body': item.get('note', ''), # Raindrop의 note 필드를 본문으로 사용
-                        'published_at': item.get('created'), # ISO 8601 형식으로 가정
-                        'tags': item.get('tags', [])
-                    }
-                    
-                    # Raindrop note가 비어있을 경우, 웹 페이지에서 본문 스크랩 시도
-                    if not raindrop['body'] and raindrop['url']:
-                        raindrop['body'] = self._get_web_content_body(raindrop['url'])
-
+                    raindrop = Item(
+                        title=item.get('title'),
+                        url=item.get('link'),
+                        source=self.name,
+                        body=item.get('note', ''), # Raindrop의 note 필드를 본문으로 사용
+                        published_at=item.get('created'), # ISO 8601 형식으로 가정
+                        tags=item.get('tags', [])
+                    )
                     all_raindrops.append(raindrop)
                 
             except requests.exceptions.RequestException as e:
                 print(f"Error scraping Raindrop collection {col_id if col_id else 'all'}: {e}")
                 continue # 다음 컬렉션으로 넘어감
 
-        return self._apply_filters(all_raindrops)
+        # Raindrop note가 비어있을 경우, 웹 페이지에서 본문 스크랩 시도 (모든 컬렉션의 항목을 한 번에 동시 처리)
+        missing = []
+        for raindrop in all_raindrops:
+            if raindrop['body'] or not raindrop['url']:
+                continue
+            resumed = self._resumed(raindrop['url'])
+            if resumed is not None:
+                raindrop['body'] = resumed.get('body', '')
+            else:
+                missing.append(raindrop)
+        results = fetch_and_extract([raindrop['url'] for raindrop in missing], extract_web_content_body,
+                                    self.html.backend, self.name, source=self.name)
+        for raindrop, body in zip(missing, results):
+            if isinstance(body, Exception):
+                print(f"Error fetching web content body from {raindrop['url']}: {body}")
+                body = ""
+            raindrop['body'] = body
+            self._emit(raindrop)
 
-    def _get_web_content_body(self, url):
-        """
-        주어진 URL에서 웹 콘텐츠의 본문을 스크랩합니다.
-        """
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            # 웹 페이지의 주요 본문 내용을 추출하는 일반적인 선택자들
-            # 이 부분은 웹사이트마다 다를 수 있으므로, 필요에 따라 조정해야 합니다.
-            body_elements = soup.select('article, .entry-content, .post-content, .article-body, .main-content')
-            if body_elements:
-                return body_elements[0].get_text(strip=True)
-            return ""
-        except Exception as e:
-            print(f"Error fetching web content body from {url}: {e}")
-            return ""
+        return self._apply_filters(all_raindrops)
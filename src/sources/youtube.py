@@ -1,9 +1,21 @@
 import requests
+from urllib.parse import urlsplit
 from .base_source import BaseSource
 from src.auth.youtube_auth import YouTubeAuthenticator
 from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled
+from src.monitoring import metrics
+from src.net.politeness import host_slot, polite_call
+from src.storage.item import Item
 import time
 
+
+def _api_error_status(error):
+    # googleapiclient HttpError의 resp는 httplib2.Response (헤더 이름은 소문자)
+    resp = getattr(error, 'resp', None)
+    if resp is None:
+        return None, None
+    return getattr(resp, 'status', None), resp.get('retry-after')
+
 class YouTubeSource(BaseSource):
     def __init__(self, name, posts_to_scrape, filter_keywords=None, channel_ids=None, playlist_ids=None, delay_between_requests=5, **kwargs):
         super().__init__(name, None, posts_to_scrape, None, None, filter_keywords=filter_keywords, **kwargs)
@@ -12,6 +24,34 @@ class YouTubeSource(BaseSource):
         self.playlist_ids = playlist_ids if playlist_ids is not None else []
         self.delay_between_requests = delay_between_requests
 
+    def _execute(self, request, endpoint):
+        """
+        YouTube Data API 요청을 실행하고 호출 수와 지연 시간을 기록합니다.
+        요청은 www.googleapis.com의 호스트별 제한을 따르고, 429/503 응답은 Retry-After만큼 기다린 뒤 재시도합니다.
+        """
+        def execute():
+            with metrics.timer('api_request_seconds', source=self.name, endpoint=endpoint):
+                return request.execute()
+
+        try:
+            response = polite_call(urlsplit(request.uri).netloc, execute, _api_error_status,
+                                   source=self.name, operation='youtube_api')
+        except Exception as e:
+            metrics.inc('api_errors_total', source=self.name, endpoint=endpoint, error=type(e).__name__)
+            raise
+        metrics.inc('api_requests_total', source=self.name, endpoint=endpoint)
+        return response
+
+    def _sleep(self, seconds, reason):
+        metrics.inc('sleep_seconds_total', seconds, source=self.name, reason=reason)
+        time.sleep(seconds)
+
+    def shards(self, batch_size=20):
+        # 채널/플레이리스트마다 하나의 샤드 (posts_to_scrape는 샤드마다 적용됨)
+        shards = [{'channel_ids': [channel_id], 'playlist_ids': []} for channel_id in self.channel_ids]
+        shards += [{'channel_ids': [], 'playlist_ids': [playlist_id]} for playlist_id in self.playlist_ids]
+        return shards or [{}]
+
     def scrape(self):
         youtube = self.authenticator.get_youtube_service()
         if not youtube:
@@ -23,10 +63,10 @@ class YouTubeSource(BaseSource):
         # 채널 ID 리스트 처리
         for channel_id in self.channel_ids:
             try:
-                channel_response = youtube.channels().list(
+                channel_response = self._execute(youtube.channels().list(
                     id=channel_id,
                     part='contentDetails'
-                ).execute()
+                ), 'channels')
                 
                 if 'items' in channel_response and len(channel_response['items']) > 0:
                     uploads_playlist_id = channel_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
@@ -42,12 +82,12 @@ class YouTubeSource(BaseSource):
             next_page_token = None
             while True:
                 try:
-                    playlist_response = youtube.playlistItems().list(
+                    playlist_response = self._execute(youtube.playlistItems().list(
                         playlistId=playlist_id,
                         part='snippet',
                         maxResults=50, # 최대 50개
                         pageToken=next_page_token
-                    ).execute()
+                    ), 'playlistItems')
                     playlist_items.extend(playlist_response['items'])
                     next_page_token = playlist_response.get('nextPageToken')
                     if not next_page_token or (self.posts_to_scrape != -1 and len(playlist_items) >= self.posts_to_scrape):
@@ -68,42 +108,53 @@ class YouTubeSource(BaseSource):
             for i in range(0, len(video_ids), 50):
                 batch_video_ids = video_ids[i:i+50]
                 try:
-                    video_response = youtube.videos().list(
+                    video_response = self._execute(youtube.videos().list(
                         id=",".join(batch_video_ids),
                         part='snippet,statistics'
-                    ).execute()
+                    ), 'videos')
                     
                     for item in video_response['items']:
-                        video = {
-                            'title': item['snippet']['title'],
-                            'url': f"https://www.youtube.com/watch?v={item['id']}",
-                            'source': self.name,
-                            'channel_title': item['snippet']['channelTitle'],
-                            'published_at': item['snippet']['publishedAt'],
-                            'view_count': item['statistics'].get('viewCount', 0),
-                            'like_count': item['statistics'].get('likeCount', 0),
-                            'comment_count': item['statistics'].get('commentCount', 0),
-                            'video_id': item['id']
-                        }
+                        video = Item(
+                            title=item['snippet']['title'],
+                            url=f"https://www.youtube.com/watch?v={item['id']}",
+                            source=self.name,
+                            channel_title=item['snippet']['channelTitle'],
+                            published_at=item['snippet']['publishedAt'],
+                            view_count=item['statistics'].get('viewCount', 0),
+                            like_count=item['statistics'].get('likeCount', 0),
+                            comment_count=item['statistics'].get('commentCount', 0),
+                            video_id=item['id']
+                        )
+                        # 중단된 이전 실행에서 이미 자막을 가져온 비디오는 다시 요청하지 않음
+                        resumed = self._resumed(video['url'])
+                        if resumed is not None:
+                            videos_data.append(resumed)
+                            continue
                         # 자막 가져오기 (재시도 및 딜레이 로직 추가)
                         retries = 3
                         for i in range(retries):
                             try:
                                 # 각 요청 사이에 딜레이 추가
                                 if i > 0:
-                                    time.sleep(self.delay_between_requests)
+                                    metrics.inc('retries_total', source=self.name, operation='transcript')
+                                    self._sleep(self.delay_between_requests, 'transcript_retry')
                                     
-                                transcript_list = YouTubeTranscriptApi.list_transcripts(item['id'])
-                                transcript = transcript_list.find_transcript(['ko', 'en'])
-                                transcript_data = transcript.fetch()
+                                # 자막 요청도 www.youtube.com의 호스트별 제한을 따름
+                                with host_slot('www.youtube.com'), metrics.timer('transcript_seconds', source=self.name):
+                                    transcript_list = YouTubeTranscriptApi.list_transcripts(item['id'])
+                                    transcript = transcript_list.find_transcript(['ko', 'en'])
+                                    transcript_data = transcript.fetch()
                                 video['body'] = " ".join([entry['text'] for entry in transcript_data])
+                                metrics.inc('transcripts_total', source=self.name, result='found')
                                 break # 성공하면 루프 종료
                             except NoTranscriptFound:
                                 video['body'] = ""
+                                metrics.inc('transcripts_total', source=self.name, result='not_found')
                                 print(f"No transcript found for video: {video['title']}")
                                 break # 자막이 없으면 더 이상 재시도하지 않음
                             except TranscriptsDisabled:
                                 video['body'] = ""
+                                metrics.inc('transcripts_total', source=self.name, result='disabled')
                                 print(f"Transcripts are disabled for video: {video['title']}")
                                 break # 자막이 비활성화되어 있으면 더 이상 재시도하지 않음
                             except Exception as e:
@@ -115,13 +166,14 @@ class YouTubeSource(BaseSource):
                                     print(f"Error fetching transcript for {video['title']}: {e}")
                                 
                                 if i < retries - 1:
-                                    time.sleep(2 ** i) # 지수 백오프
+                                    self._sleep(2 ** i, 'backoff') # 지수 백오프
                                 else:
+                                    metrics.inc('transcripts_total', source=self.name, result='error')
                                     print(f"Failed to fetch transcript for {video['title']} after {retries} retries.")
 
-                        videos_data.append(video)
+                        videos_data.append(self._emit(video))
                         # 다음 비디오 처리를 위해 딜레이 추가
-                        time.sleep(self.delay_between_requests)
+                        self._sleep(self.delay_between_requests, 'delay')
                 except Exception as e:
                     print(f"Error fetching video details for batch: {e}")
 
@@ -1 +1,4 @@
 # 저장 모듈들이 여기에 임포트됩니다.
+from .base_storage import BaseStorage
+from .markdown_storage import MarkdownStorage
+from .sqlite_storage import SQLiteStorage
@@ -0,0 +1,289 @@
+import os
+import json
+import zlib
+import fcntl
+import struct
+import threading
+
+# 레코드 헤더: 매직, 코덱, ID 길이, 압축된 내용 길이
+RECORD_HEADER = struct.Struct('<4sBII')
+RECORD_MAGIC = b'OMNA'
+
+CODEC_DELETED = 0 # 삭제 표시(tombstone): 내용 없음
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODEC_NAMES = {'zlib': CODEC_ZLIB, 'zstd': CODEC_ZSTD}
+
+SEGMENT_SUFFIX = '.seg'
+INDEX_FILENAME = 'index.jsonl'
+LOCK_FILENAME = '.lock'
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+class SegmentArchive:
+    """
+    오래된 항목을 보관하는 추가 전용(append-only) 아카이브입니다.
+
+    항목마다 렌더링된 마크다운 내용을 zstd(설치되어 있지 않으면 zlib)로 압축해 세그먼트 파일(00001.seg, ...)에 이어 쓰고,
+    항목 ID(마크다운 파일명)별 위치를 오프셋 인덱스(index.jsonl)에 한 줄씩 추가합니다. 파일 수가 세그먼트 수로 줄어들므로
+    디렉토리 조회와 백업이 빠르고, 전체 재적재(iter_records)는 세그먼트를 순서대로 한 번씩만 읽습니다.
+    같은 ID를 다시 쓰면 새 레코드를 추가하고 인덱스는 마지막 레코드를 가리킵니다.
+
+    쓰기는 프로세스 간 잠금(.lock)으로 직렬화하고, 읽기는 잠금 없이 인덱스에 기록된 레코드만 읽습니다.
+    레코드는 ID를 함께 담고 있으므로, 인덱스에 기록되기 전에 중단된 레코드는 다음 쓰기에서 세그먼트를 읽어 복구합니다.
+    """
+
+    def __init__(self, archive_dir="results/archive", compression='zstd', level=3, segment_max_bytes=64 * 2 ** 20):
+        self.archive_dir = os.path.abspath(archive_dir)
+        self.level = level
+        self.segment_max_bytes = segment_max_bytes
+        if compression not in CODEC_NAMES:
+            raise ValueError(f"Unknown archive compression: {compression}. Choose one of {', '.join(CODEC_NAMES)}")
+        if compression == 'zstd' and _zstd() is None:
+            print("Warning: zstandard is not installed. Falling back to zlib for archive compression.")
+            compression = 'zlib'
+        self.compression = compression
+        self._lock = threading.Lock()
+        self._index = {}       # ID -> (세그먼트 번호, 오프셋, 레코드 크기)
+        self._index_size = 0   # 읽은 인덱스 파일 크기 (다른 프로세스가 추가한 줄을 이어서 읽음)
+        self._indexed_end = {} # 세그먼트 번호 -> 인덱스에 기록된 마지막 레코드의 끝 오프셋
+        self._refresh()
+
+    # 인덱스
+
+    def _segment_path(self, segment):
+        return os.path.join(self.archive_dir, f"{segment:05d}{SEGMENT_SUFFIX}")
+
+    def _segments(self):
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return sorted(int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(self.archive_dir)
+                      if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit())
+
+    def _apply(self, entry):
+        segment, offset, size = entry['segment'], entry['offset'], entry['size']
+        self._indexed_end[segment] = max(self._indexed_end.get(segment, 0), offset + size)
+        if entry.get('deleted'):
+            self._index.pop(entry['id'], None)
+        else:
+            self._index[entry['id']] = (segment, offset, size)
+
+    def _refresh(self):
+        """다른 프로세스(수집/아카이브 실행)가 추가한 인덱스 줄을 읽습니다."""
+        index_path = os.path.join(self.archive_dir, INDEX_FILENAME)
+        try:
+            size = os.path.getsize(index_path)
+        except OSError:
+            size = 0
+        if size > self._index_size:
+            with open(index_path, 'rb') as f:
+                f.seek(self._index_size)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break # 기록 도중 중단된 마지막 줄
+                    self._apply(json.loads(line))
+                    self._index_size += len(line)
+
+    def _recover(self):
+        """인덱스에 기록되기 전에 중단된 세그먼트 끝부분의 레코드를 인덱스에 추가합니다. 쓰기 잠금 안에서만 호출합니다."""
+        recovered = []
+        for segment in self._segments():
+            end = self._indexed_end.get(segment, 0)
+            if os.path.getsize(self._segment_path(segment)) > end:
+                recovered.extend(self._scan(segment, end))
+        if recovered:
+            self._write_index(recovered)
+
+    def _scan(self, segment, start):
+        """세그먼트의 start 이후 레코드를 읽어 인덱스 줄을 만듭니다. 잘린 마지막 레코드는 잘라냅니다."""
+        entries = []
+        path = self._segment_path(segment)
+        with open(path, 'rb') as f:
+            f.seek(start)
+            offset = start
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+                magic, codec, id_length, length = RECORD_HEADER.unpack(header)
+                body = f.read(id_length + length)
+                if magic != RECORD_MAGIC or len(body) < id_length + length:
+                    break
+                size = RECORD_HEADER.size + id_length + length
+                entry = {'id': body[:id_length].decode('utf-8'), 'segment': segment, 'offset': offset, 'size': size}
+                if codec == CODEC_DELETED:
+                    entry['deleted'] = True
+                entries.append(entry)
+                offset += size
+        if os.path.getsize(path) > offset:
+            print(f"Warning: Truncating incomplete record at {path}:{offset}")
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+        return entries
+
+    def _write_index(self, entries):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        data = b''.join(json.dumps(entry, ensure_ascii=False).encode('utf-8') + b'\n' for entry in entries)
+        with open(os.path.join(self.archive_dir, INDEX_FILENAME), 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        for entry in entries:
+            self._apply(entry)
+        self._index_size += len(data)
+
+    # 압축
+
+    def _compress(self, content):
+        if self.compression == 'zstd':
+            return CODEC_ZSTD, _zstd().ZstdCompressor(level=self.level).compress(content)
+        return CODEC_ZLIB, zlib.compress(content, min(self.level, 9))
+
+    @staticmethod
+    def _decompress(codec, payload):
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(payload)
+        if codec == CODEC_ZSTD:
+            zstandard = _zstd()
+            if zstandard is None:
+                raise RuntimeError("Archive record is zstd-compressed but zstandard is not installed (pip install zstandard).")
+            return zstandard.ZstdDecompressor().decompress(payload)
+        raise ValueError(f"Unknown archive record codec: {codec}")
+
+    # 읽기/쓰기
+
+    def _append(self, records):
+        """(ID, 코덱, 압축된 내용) 레코드들을 현재 세그먼트에 이어 쓰고 인덱스에 기록합니다."""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        with open(os.path.join(self.archive_dir, LOCK_FILENAME), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._refresh()
+            self._recover()
+            return self._append_locked(records)
+
+    def _append_locked(self, records):
+        segments = self._segments()
+        segment = segments[-1] if segments else 1
+        entries = []
+        f = open(self._segment_path(segment), 'ab')
+        try:
+            for item_id, codec, payload in records:
+                offset = f.tell()
+                if offset and offset >= self.segment_max_bytes:
+                    f.flush()
+                    os.fsync(f.fileno())
+                    f.close()
+                    segment += 1
+                    f = open(self._segment_path(segment), 'ab')
+                    offset = 0
+                encoded_id = item_id.encode('utf-8')
+                f.write(RECORD_HEADER.pack(RECORD_MAGIC, codec, len(encoded_id), len(payload)) + encoded_id + payload)
+                entry = {'id': item_id, 'segment': segment, 'offset': offset,
+                         'size': RECORD_HEADER.size + len(encoded_id) + len(payload)}
+                if codec == CODEC_DELETED:
+                    entry['deleted'] = True
+                entries.append(entry)
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            f.close()
+        # 세그먼트를 먼저 기록한 뒤 인덱스를 추가 (인덱스 기록 전에 중단되면 다음에 열 때 복구)
+        self._write_index(entries)
+        return sum(entry['size'] for entry in entries)
+
+    def put_many(self, contents):
+        """
+        {ID: 마크다운 내용(bytes)}을 아카이브에 추가하고 기록한 바이트 수를 반환합니다.
+        """
+        records = []
+        for item_id, content in contents.items():
+            codec, payload = self._compress(content)
+            records.append((item_id, codec, payload))
+        if not records:
+            return 0
+        with self._lock:
+            return self._append(records)
+
+    def put(self, item_id, content):
+        return self.put_many({item_id: content})
+
+    def delete(self, item_id):
+        """항목을 아카이브에서 삭제합니다 (삭제 표시를 추가하며, 세그먼트의 이전 레코드는 그대로 남습니다)."""
+        with self._lock:
+            self._refresh()
+            if item_id not in self._index:
+                return False
+            self._append([(item_id, CODEC_DELETED, b'')])
+        return True
+
+    def _read_record(self, f, size):
+        record = f.read(size)
+        magic, codec, id_length, length = RECORD_HEADER.unpack_from(record)
+        if magic != RECORD_MAGIC:
+            raise ValueError(f"Corrupt archive record in {f.name}")
+        start = RECORD_HEADER.size + id_length
+        return self._decompress(codec, record[start:start + length])
+
+    def get(self, item_id):
+        """항목의 마크다운 내용(bytes)을 반환합니다. 없으면 None."""
+        with self._lock:
+            location = self._index.get(item_id)
+            if location is None:
+                self._refresh()
+                location = self._index.get(item_id)
+        if location is None:
+            return None
+        segment, offset, size = location
+        with open(self._segment_path(segment), 'rb') as f:
+            f.seek(offset)
+            return self._read_record(f, size)
+
+    def read_text(self, item_id):
+        content = self.get(item_id)
+        return content.decode('utf-8') if content is not None else None
+
+    def iter_records(self, ids=None):
+        """
+        현재 항목들(ids를 지정하면 해당 항목만)을 세그먼트 순서대로 (ID, (세그먼트 번호, 오프셋), 마크다운 내용 bytes)로 반환합니다.
+        각 세그먼트를 앞에서부터 순서대로 읽으며, 덮어쓰이거나 삭제된 레코드는 건너뜁니다.
+        """
+        with self._lock:
+            self._refresh()
+            by_segment = {}
+            for item_id in (self._index if ids is None else ids):
+                location = self._index.get(item_id)
+                if location is not None:
+                    segment, offset, size = location
+                    by_segment.setdefault(segment, []).append((offset, size, item_id))
+        for segment in sorted(by_segment):
+            with open(self._segment_path(segment), 'rb') as f:
+                for offset, size, item_id in sorted(by_segment[segment]):
+                    f.seek(offset)
+                    yield item_id, (segment, offset), self._read_record(f, size)
+
+    def locations(self):
+        """{ID: (세그먼트 번호, 오프셋)}. 레코드는 바뀌지 않으므로 위치가 같으면 내용도 같습니다."""
+        with self._lock:
+            self._refresh()
+            return {item_id: (segment, offset) for item_id, (segment, offset, _) in self._index.items()}
+
+    def ids(self):
+        with self._lock:
+            self._refresh()
+            return list(self._index)
+
+    def __contains__(self, item_id):
+        with self._lock:
+            if item_id not in self._index:
+                self._refresh()
+            return item_id in self._index
+
+    def __len__(self):
+        return len(self._index)
@@ -0,0 +1,79 @@
+from abc import ABC, abstractmethod
+
+class BaseStorage(ABC):
+    """
+    수집된 항목을 보관하는 저장소 인터페이스입니다. configs/storage 그룹에서 구현체를 선택합니다.
+    """
+
+    vector_index_cfg = None # 관련 항목/의미 검색용 벡터 인덱스 설정 (src/storage/vector_index.py)
+    _vector_index = None
+    rollups_cfg = None # 대시보드 통계용 집계 설정 (src/storage/rollups.py)
+
+    @abstractmethod
+    def save_items(self, items):
+        """항목들을 저장하고 {'new', 'updated', 'unchanged'} 개수를 반환합니다."""
+        pass
+
+    @abstractmethod
+    def load_items(self, ids=None):
+        """
+        저장된 모든 항목을 본문('body') 포함 dict 리스트로 반환합니다.
+        ids(메타데이터 인덱스 filepath의 파일명 목록)를 지정하면 해당 항목만 읽습니다.
+        """
+        pass
+
+    @abstractmethod
+    def load_bodies(self, ids):
+        """{ID: 본문}. 벡터 인덱스가 바뀐 항목의 본문만 읽는 데 사용합니다."""
+        pass
+
+    @abstractmethod
+    def load_metadata(self, index_path=None):
+        """
+        메타데이터 인덱스 항목 리스트를 반환합니다. 각 항목은 filepath와 저장된 본문의 해시(body_hash)를 포함합니다.
+        index_path(이전에 만든 metadata.json)를 넘기면 저장소에 따라 그 이후 바뀌지 않은 항목은 다시 읽지 않습니다.
+        """
+        pass
+
+    @abstractmethod
+    def create_index(self, output_file):
+        """대시보드에서 사용하는 메타데이터 인덱스(metadata.json)를 생성하고, 설정되어 있으면 통계 집계와 벡터 인덱스도 갱신합니다."""
+        pass
+
+    def update_vector_index(self, metadata_list):
+        """
+        vector_index가 설정되어 있으면 메타데이터 인덱스에 맞춰 벡터 인덱스를 갱신하고 개수를 반환합니다.
+        벡터 인덱스(numpy/scipy)는 인덱싱할 때 처음 불러오며, 같은 저장소 객체로 다시 인덱싱하면(데몬 모드) 재사용합니다.
+        """
+        if not self.vector_index_cfg:
+            return None
+        if self._vector_index is None:
+            from .vector_index import VectorIndex
+            self._vector_index = VectorIndex(**self.vector_index_cfg)
+        counts = self._vector_index.update(metadata_list, self.load_bodies)
+        print(f"Vector index updated: {counts['added']} added, {counts['updated']} updated, "
+              f"{counts['removed']} removed, {counts['unchanged']} unchanged")
+        return counts
+
+    def update_rollups(self, metadata_list):
+        """rollups가 설정되어 있으면 메타데이터 인덱스에서 추가/변경/삭제된 항목만큼 통계 집계를 고치고 개수를 반환합니다."""
+        if not self.rollups_cfg:
+            return None
+        from .rollups import Rollups
+        counts = Rollups(**self.rollups_cfg).update(metadata_list)
+        print(f"Rollups updated: {counts['added']} added, {counts['updated']} updated, "
+              f"{counts['removed']} removed, {counts['unchanged']} unchanged")
+        return counts
+
+    @abstractmethod
+    def export_markdown(self, markdown_dir=None):
+        """
+        Obsidian 등에서 사용할 수 있도록 항목들을 마크다운 파일로 내보냅니다.
+        markdown_dir를 지정하지 않으면 저장소에 설정된 markdown_dir를 사용합니다.
+        """
+        pass
+
+    def archive_items(self, older_than_days=None):
+        """오래된 항목을 아카이브로 옮기고 옮긴 항목 수를 반환합니다 (cli.mode=archive). 기본 구현은 아무것도 하지 않습니다."""
+        print(f"{type(self).__name__} does not support archiving. Skipping.")
+        return 0
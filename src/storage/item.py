@@ -0,0 +1,214 @@
+import os
+import hashlib
+import shutil
+import tempfile
+import weakref
+from collections.abc import MutableMapping
+from contextlib import contextmanager, nullcontext
+
+# 모든 소스가 공통으로 채우는 필드. dict 대신 슬롯에 저장하여 항목마다 dict를 만들지 않음
+FIELDS = ('title', 'url', 'source', 'published_at', 'summary', 'tags')
+
+_active_spill = None
+
+
+class SpilledBody:
+    """임시 파일로 내보낸 본문. 마지막 참조가 사라지면 파일을 삭제합니다."""
+
+    __slots__ = ('path', 'length', '__weakref__')
+
+    def __init__(self, path, length):
+        self.path = path
+        self.length = length # 문자 수
+        # 프로세스 풀(fork)의 자식 프로세스가 종료되면서 부모의 파일을 지우지 않도록 만든 프로세스에서만 삭제
+        weakref.finalize(self, _remove_spill_file, path, os.getpid())
+
+    def read(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+
+def _remove_spill_file(path, pid):
+    if os.getpid() == pid:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class BodySpill:
+    """threshold_chars보다 긴 본문을 spill_dir 아래 임시 파일로 내보냅니다."""
+
+    def __init__(self, threshold_chars=65536, spill_dir=None):
+        self.threshold_chars = threshold_chars
+        self._owns_dir = spill_dir is None
+        if spill_dir is None:
+            spill_dir = tempfile.mkdtemp(prefix='omni-items-')
+        os.makedirs(spill_dir, exist_ok=True)
+        self.spill_dir = spill_dir
+
+    def should_spill(self, body):
+        return isinstance(body, str) and len(body) > self.threshold_chars
+
+    def spill(self, body):
+        fd, path = tempfile.mkstemp(dir=self.spill_dir, suffix='.txt')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(body)
+        return SpilledBody(path, len(body))
+
+    def close(self):
+        if self._owns_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+
+class Item(MutableMapping):
+    """
+    수집된 항목 하나입니다. 기존 항목 dict와 같은 방식으로 읽고 쓸 수 있으며(item['body'], item.get, 키 순서 유지),
+    공통 필드(FIELDS)는 슬롯에, 소스별 필드(view_count 등)만 별도 dict에 저장합니다.
+
+    본문 분리(use_body_spill)가 활성화되어 있으면 threshold_chars보다 긴 본문은 저장 즉시 임시 파일로 내보내고,
+    item['body']로 읽을 때마다 파일에서 다시 읽습니다. 1시간 영상 자막이나 큰 노트 수백 개를 수집해도
+    수집부터 요약, 저장까지 본문 전체가 메모리에 함께 남지 않습니다.
+    """
+
+    __slots__ = FIELDS + ('_body', '_keys', '_extra')
+
+    def __init__(self, data=(), **fields):
+        self._keys = []
+        self._extra = None
+        self.update(data, **fields)
+
+    @classmethod
+    def from_dict(cls, data):
+        """dict(저널, 샤드 결과, 마크다운 파일에서 읽은 항목)를 Item으로 변환합니다. 이미 Item이면 그대로 반환합니다."""
+        if data is None or isinstance(data, Item):
+            return data
+        return cls(data)
+
+    def __getitem__(self, key):
+        if key == 'body':
+            try:
+                body = self._body
+            except AttributeError:
+                raise KeyError(key) from None
+            return body.read() if isinstance(body, SpilledBody) else body
+        if key in FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._keys.append(key)
+        if key == 'body':
+            if _active_spill is not None and _active_spill.should_spill(value):
+                value = _active_spill.spill(value)
+            self._body = value
+        elif key in FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._keys.remove(key)
+        if key == 'body':
+            del self._body # 내보낸 본문 파일은 참조가 사라지면 삭제됨
+        elif key in FIELDS:
+            delattr(self, key)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key):
+        if key == 'body':
+            return hasattr(self, '_body')
+        if key in FIELDS:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def pop(self, key, *default):
+        # 기본 구현은 값을 읽은 뒤 삭제하므로, 버리는 본문을 파일에서 다시 읽지 않도록 함
+        if key == 'body' and 'body' in self and isinstance(self._body, SpilledBody):
+            value = self['body']
+            del self['body']
+            return value
+        return super().pop(key, *default)
+
+    @property
+    def body_spilled(self):
+        return isinstance(getattr(self, '_body', None), SpilledBody)
+
+    @property
+    def body_length(self):
+        """본문 문자 수. 내보낸 본문은 파일을 읽지 않고 기록해 둔 길이를 반환합니다."""
+        body = getattr(self, '_body', None)
+        if isinstance(body, SpilledBody):
+            return body.length
+        return len(body) if isinstance(body, str) else 0
+
+    def copy(self):
+        """얕은 복사본. 내보낸 본문 파일은 다시 쓰지 않고 공유합니다."""
+        item = Item()
+        for key in self._keys:
+            if key == 'body':
+                item._keys.append(key)
+                item._body = self._body
+            else:
+                item[key] = self[key]
+        return item
+
+    def __reduce__(self):
+        # 다른 프로세스로 전달할 때는 본문을 읽어 담음 (받는 프로세스의 설정에 따라 다시 내보냄)
+        return (Item, (dict(self),))
+
+    def __repr__(self):
+        fields = []
+        for key in self._keys:
+            if key == 'body' and self.body_spilled:
+                fields.append(f"'body': <spilled {self._body.length} chars>")
+            else:
+                fields.append(f"{key!r}: {self[key]!r}")
+        return 'Item({' + ', '.join(fields) + '})'
+
+
+def body_hash(body):
+    """본문의 SHA-1 해시. 마크다운 파일에 저장되며 앞뒤 공백이 사라지므로 공백을 제거한 뒤 계산합니다."""
+    return hashlib.sha1((body or '').strip().encode('utf-8')).hexdigest()
+
+
+def as_items(items):
+    """항목 dict 리스트를 Item 리스트로 변환합니다."""
+    return [Item.from_dict(item) for item in items]
+
+
+@contextmanager
+def use_body_spill(threshold_chars=65536, spill_dir=None):
+    """블록 안에서 만들어지는 Item의 긴 본문을 임시 파일로 내보냅니다. 블록이 끝나면 임시 디렉토리를 삭제합니다."""
+    global _active_spill
+    spill = BodySpill(threshold_chars, spill_dir)
+    _active_spill = spill
+    try:
+        yield spill
+    finally:
+        _active_spill = None
+        spill.close()
+
+
+def body_spill_from_config(items_cfg):
+    """items 설정으로 본문 분리 컨텍스트를 만듭니다. spill_threshold_chars가 null이면 본문을 메모리에 유지합니다."""
+    if items_cfg is None or items_cfg.get('spill_threshold_chars') is None:
+        return nullcontext()
+    return use_body_spill(items_cfg.spill_threshold_chars, items_cfg.get('spill_dir'))
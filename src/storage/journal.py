@@ -0,0 +1,173 @@
+import os
+import json
+from collections.abc import Mapping
+from datetime import datetime
+from contextlib import contextmanager
+from .item import Item
+
+
+def encode_value(value):
+    # datetime은 마크다운 저장 시 따옴표 없는 ISO 형식으로 기록되므로, 복원할 때도 datetime으로 되돌릴 수 있게 표시
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, Mapping): # Item
+        return dict(value)
+    return str(value)
+
+
+def decode_value(obj):
+    if len(obj) == 1 and '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    return obj
+
+
+def item_key(item):
+    """저널에서 항목을 식별하는 키 (URL, 없으면 제목)."""
+    return item.get('url') or item.get('title')
+
+
+class RunJournal:
+    """
+    수집/요약 실행의 선행 기록(write-ahead) 저널입니다. JSON Lines 파일에 항목이 완성될 때마다 한 줄씩 추가하고
+    fsync하므로, 실행이 비정상 종료되거나 Ctrl-C로 중단되어도 그때까지 끝난 작업이 남습니다.
+    cli.resume=true로 다시 실행하면 저널을 읽어 끝난 소스와 항목, 요약은 건너뛰고 중단된 부분만 다시 처리합니다.
+
+    기록 종류:
+      run          실행 시작 (mode)
+      collected    소스가 항목 하나를 완성함 (필터 적용 전)
+      source_done  소스 수집이 끝남 (필터가 적용된 최종 항목 키 목록)
+      summarized   항목 하나의 요약이 끝남
+    """
+
+    def __init__(self, path="results/run_journal.jsonl", fsync=True):
+        self.path = os.path.abspath(path)
+        self.fsync = fsync
+        self._file = None
+        self._reset()
+
+    def _reset(self):
+        self.collected = {}        # 소스 -> {항목 키: 항목}
+        self.finished_sources = {} # 소스 -> [항목 키]
+        self.summarized = {}       # 항목 키 -> 요약된 항목
+
+    def _read(self):
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line, object_hook=decode_value))
+                except json.JSONDecodeError:
+                    # 기록 도중 종료되어 잘린 마지막 줄은 무시
+                    break
+        return records
+
+    def _apply(self, record):
+        kind = record.get('type')
+        if kind == 'collected':
+            self.collected.setdefault(record['source'], {})[item_key(record['item'])] = Item.from_dict(record['item'])
+        elif kind == 'source_done':
+            self.finished_sources[record['source']] = record['keys']
+        elif kind == 'summarized':
+            self.summarized[item_key(record['item'])] = Item.from_dict(record['item'])
+
+    def start(self, mode, resume=False):
+        """
+        저널을 엽니다. resume이 True이고 같은 모드의 저널이 남아 있으면 이어서 기록하고, 아니면 새로 시작합니다.
+        이어서 실행하면 True를 반환합니다.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._reset()
+        resumed = False
+        if resume and os.path.exists(self.path):
+            records = self._read()
+            if records and records[0].get('type') == 'run' and records[0].get('mode') == mode:
+                for record in records[1:]:
+                    self._apply(record)
+                resumed = True
+                print(f"Resuming from journal {self.path}: {len(self.finished_sources)} sources finished, "
+                      f"{sum(len(items) for items in self.collected.values())} items collected, {len(self.summarized)} items summarized")
+            else:
+                print(f"Warning: Journal {self.path} does not belong to a '{mode}' run. Starting a new run.")
+        elif resume:
+            print(f"No journal found at {self.path}. Starting a new run.")
+
+        self._file = open(self.path, 'a' if resumed else 'w', encoding='utf-8')
+        if not resumed:
+            self._write({'type': 'run', 'mode': mode, 'started_at': datetime.now().isoformat()})
+        return resumed
+
+    def _write(self, record):
+        if self._file is None:
+            return
+        self._file.write(json.dumps(record, ensure_ascii=False, default=encode_value) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def record_collected(self, source, item):
+        self.collected.setdefault(source, {})[item_key(item)] = item
+        self._write({'type': 'collected', 'source': source, 'item': item})
+
+    def record_source_done(self, source, items):
+        collected = self.collected.get(source, {})
+        for item in items:
+            # 항목마다 기록하지 않는 소스(web 등)의 항목도 복원할 수 있도록 함께 기록
+            if item_key(item) not in collected:
+                self.record_collected(source, item)
+        keys = [item_key(item) for item in items]
+        self.finished_sources[source] = keys
+        self._write({'type': 'source_done', 'source': source, 'keys': keys})
+
+    def record_summarized(self, item):
+        self.summarized[item_key(item)] = item
+        self._write({'type': 'summarized', 'item': item})
+
+    def collected_items(self, source):
+        """소스가 이전 실행에서 완성한 항목들 ({항목 키: 항목})."""
+        return self.collected.get(source, {})
+
+    def source_items(self, source):
+        """이전 실행에서 수집이 끝난 소스의 최종 항목 리스트. 끝나지 않았으면 None."""
+        keys = self.finished_sources.get(source)
+        if keys is None:
+            return None
+        items = self.collected.get(source, {})
+        return [items[key] for key in keys if key in items]
+
+    def summarized_item(self, item):
+        return self.summarized.get(item_key(item))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def complete(self):
+        """실행이 끝까지 완료되면 저널을 삭제합니다."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# 저널을 사용하는 실행 모드
+JOURNALED_MODES = ('all', 'collect', 'summarize')
+
+
+@contextmanager
+def journal_from_config(cli_cfg):
+    """
+    cli.mode가 수집/요약 모드이면 실행 저널을 열고, 블록이 끝까지 실행되면 저널을 삭제합니다.
+    예외나 Ctrl-C로 중단되면 저널을 남겨 두고 cli.resume=true로 이어서 실행하는 방법을 안내합니다.
+    """
+    if cli_cfg.mode not in JOURNALED_MODES:
+        yield None
+        return
+    journal = RunJournal(cli_cfg.get('journal_path', 'results/run_journal.jsonl'), fsync=cli_cfg.get('journal_fsync', True))
+    journal.start(cli_cfg.mode, resume=cli_cfg.get('resume', False))
+    try:
+        yield journal
+    except BaseException:
+        journal.close()
+        print(f"실행이 중단되었습니다. 완료된 작업은 {journal.path}에 기록되어 있으며, cli.resume=true로 이어서 실행할 수 있습니다.")
+        raise
+    journal.complete()
@@ -0,0 +1,418 @@
+import os
+import re
+import json
+import hashlib
+import time
+import tempfile
+from datetime import datetime
+import yaml
+from .base_storage import BaseStorage
+from .item import Item
+from .archive import SegmentArchive
+from src.monitoring import metrics
+
+FRONTMATTER_PATTERN = re.compile(r'^---\r?\n(.*?)\r?\n---\r?\n', re.DOTALL) # CRLF 파일은 줄바꿈을 바꾸지 않고(newline='') 읽어도 찾음
+PUBLISHED_AT_PATTERN = re.compile(r'^published_at: (.*)$', re.MULTILINE)
+ARCHIVE_BATCH_SIZE = 500 # 아카이브로 옮길 때 한 번에 기록(fsync)하는 항목 수
+BODY_CHECK_BYTES = 4096 # 인덱스의 본문 위치로 읽을 때 파일이 바뀌지 않았는지 확인하려고 본문 앞뒤로 더 읽는 최대 바이트 수
+
+def markdown_filename(title):
+    """제목에서 파일명으로 사용하기 부적절한 문자를 제거한 마크다운 파일명을 반환합니다."""
+    return re.sub(r'[\\/:"*?<>|]+', '', title) + '.md'
+
+def read_markdown_file(filepath):
+    """
+    마크다운 파일에서 Frontmatter 메타데이터와 본문을 읽어 하나의 Item으로 반환합니다.
+    Frontmatter가 없으면 None을 반환합니다.
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return parse_markdown(f.read())
+
+def parse_markdown(content):
+    """마크다운 문자열(파일 또는 아카이브 레코드의 내용)을 Item으로 변환합니다. Frontmatter가 없으면 None."""
+    match = FRONTMATTER_PATTERN.search(content)
+    if not match:
+        return None
+    item = Item(yaml.safe_load(match.group(1)))
+    item['body'] = content[match.end():].strip()
+    return item
+
+def _markdown_body(content):
+    # Frontmatter를 YAML로 해석하지 않고 본문만 잘라냄
+    match = FRONTMATTER_PATTERN.search(content)
+    return content[match.end():].strip() if match else None
+
+def render_markdown(data):
+    """
+    단일 데이터를 YAML Frontmatter와 본문으로 구성된 마크다운 문자열로 변환합니다.
+    """
+    lines = ["---"]
+    for key in data:
+        if key != 'body': # 임시 파일로 내보낸 본문을 메타데이터를 쓰는 동안 읽지 않도록 키로 순회
+            value = data[key]
+            # 날짜 객체는 ISO 형식 문자열로 변환하여 저장
+            if isinstance(value, datetime):
+                # Ensure datetime is tz-naive before saving
+                if value.tzinfo is not None and value.tzinfo.utcoffset(value) is not None:
+                    value = value.replace(tzinfo=None)
+                lines.append(f"{key}: {value.isoformat()}")
+            else:
+                lines.append(f"{key}: {json.dumps(value, ensure_ascii=False)}")
+    lines.append("---")
+    lines.append("")
+    lines.append(data.get('body', ''))
+    return "\n".join(lines)
+
+def save_to_markdown(data, output_dir, archive=None):
+    """
+    수집된 단일 데이터를 마크다운 파일로 저장합니다.
+    기존 파일과 내용 해시가 같으면 쓰지 않으며(mtime 유지), 임시 파일에 쓴 뒤 rename하여 원자적으로 교체합니다.
+    마크다운 파일 없이 archive에 보관된 항목이면 파일을 다시 만들지 않고, 바뀐 경우에만 아카이브에 새 버전을 추가합니다.
+    반환값은 'new', 'updated', 'unchanged' 중 하나입니다.
+    """
+    filepath = os.path.join(output_dir, markdown_filename(data['title']))
+
+    content = render_markdown(data).encode('utf-8')
+
+    status = 'new'
+    try:
+        # 크기가 다르면 읽지 않고 바로 변경으로 판단
+        if os.path.getsize(filepath) == len(content):
+            with open(filepath, 'rb') as f:
+                if hashlib.sha256(f.read()).digest() == hashlib.sha256(content).digest():
+                    return 'unchanged'
+        status = 'updated'
+    except FileNotFoundError:
+        archived = archive.get(os.path.basename(filepath)) if archive is not None else None
+        if archived is not None:
+            if archived == content:
+                return 'unchanged'
+            metrics.inc('disk_write_bytes_total', archive.put(os.path.basename(filepath), content), backend='archive')
+            return 'updated'
+
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix='.', suffix='.md.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        metrics.inc('disk_write_bytes_total', len(content), backend='markdown')
+        os.chmod(tmp_path, 0o644) # mkstemp는 0600으로 생성하므로 일반 파일 권한으로 맞춤
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return status
+
+def save_all_to_markdown(data_list, output_dir, archive=None):
+    """
+    여러 데이터를 마크다운 파일로 저장하고 new/updated/unchanged 개수를 반환합니다.
+    """
+    counts = {'new': 0, 'updated': 0, 'unchanged': 0}
+    for data in data_list:
+        counts[save_to_markdown(data, output_dir, archive)] += 1
+    print(f"Saved to {output_dir}: {counts['new']} new, {counts['updated']} updated, {counts['unchanged']} unchanged")
+    return counts
+
+def _universal_newlines(data):
+    # 텍스트 모드로 읽을 때와 같은 줄바꿈 (\r\n, \r -> \n)
+    return data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+def body_index_fields(content, start):
+    """
+    content[start:](Frontmatter 뒤)에 있는 본문의 인덱스 필드를 반환합니다. content는 줄바꿈을 바꾸지 않고(newline='') 읽은 파일 내용이어야 합니다.
+    body_hash는 앞뒤 공백을 제거한 본문을 텍스트 모드로 읽었을 때의 해시(item.body_hash와 같음)이고, body_offset과 body_length는
+    그 본문이 파일에 UTF-8로 저장된 바이트 위치와 길이입니다. 대시보드는 이 위치에서 본문만 읽습니다(read_indexed_body).
+    """
+    body = content[start:]
+    encoded = body.strip().encode('utf-8')
+    leading = len(body) - len(body.lstrip())
+    return {'body_hash': hashlib.sha1(_universal_newlines(encoded)).hexdigest(),
+            'body_offset': len(content[:start + leading].encode('utf-8')),
+            'body_length': len(encoded)}
+
+def read_indexed_body(filepath, offset, length, expected_hash, archive=None, limit=None):
+    """
+    인덱스에 기록된 위치(body_offset, body_length)에서 본문만 읽어 반환합니다. 파일이 없으면 archive의 레코드에서 같은 위치를 잘라냅니다.
+    limit(바이트)을 지정하면 본문의 앞부분만 읽습니다(대시보드 미리보기).
+    인덱싱한 뒤 파일이 바뀌었거나 읽을 수 없으면 None을 반환하며, 이때는 파일 전체를 읽어야 합니다. 전체를 읽으면 해시(body_hash)로,
+    앞부분만 읽으면 본문 앞의 Frontmatter 끝(---)과 본문 뒤에 공백만 남았는지로 확인합니다.
+    """
+    partial = limit is not None and limit < length
+    read_length = limit if partial else length
+    try:
+        with open(filepath, 'rb') as f:
+            f.seek(max(0, offset - BODY_CHECK_BYTES))
+            before = f.read(offset - f.tell())
+            data = f.read(read_length)
+            f.seek(offset + length)
+            rest = f.read(BODY_CHECK_BYTES)
+            size = os.fstat(f.fileno()).st_size
+    except FileNotFoundError:
+        content = archive.get(os.path.basename(filepath)) if archive is not None else None
+        if content is None:
+            return None
+        before = content[max(0, offset - BODY_CHECK_BYTES):offset]
+        data = content[offset:offset + read_length]
+        rest = content[offset + length:offset + length + BODY_CHECK_BYTES]
+        size = len(content)
+    except OSError:
+        return None
+    # 본문 뒤에는 공백만 있어야 함 (본문 끝에 내용이 추가된 파일은 해시가 같아도 다시 읽음)
+    if len(data) != read_length or size < offset + length or len(rest) == BODY_CHECK_BYTES or rest.strip():
+        return None
+    if partial:
+        if not before.rstrip().endswith(b'\n---'):
+            return None
+        return _universal_newlines(data).decode('utf-8', errors='ignore') # 잘린 마지막 글자는 버림
+    data = _universal_newlines(data)
+    if hashlib.sha1(data).hexdigest() != expected_hash:
+        return None
+    return data.decode('utf-8')
+
+def read_markdown_metadata(filepath):
+    """마크다운 파일의 메타데이터 인덱스 항목(Frontmatter, filepath, 본문 해시와 위치)을 반환합니다. Frontmatter가 없으면 None."""
+    with open(filepath, 'r', encoding='utf-8', newline='') as f: # 본문 위치를 바이트 단위로 기록하므로 줄바꿈을 바꾸지 않음
+        return _index_metadata(f.read(), os.path.basename(filepath), filepath)
+
+def _index_metadata(content, name, filepath):
+    # YAML Frontmatter 추출
+    match = FRONTMATTER_PATTERN.search(content)
+    if not match:
+        return None
+    try:
+        metadata = yaml.safe_load(match.group(1))
+    except yaml.YAMLError as e:
+        print(f"Error parsing YAML in {name}: {e}")
+        return None
+    metadata['filepath'] = filepath
+    # 요약 대상 선택(src/processing/pending.py)에서 본문을 다시 읽지 않고 본문 변경을 확인하고,
+    # 대시보드에서 Frontmatter를 다시 찾지 않고 본문 위치로 바로 읽는 데 사용
+    metadata.update(body_index_fields(content, match.end()))
+    return metadata
+
+def scan_metadata(markdown_dir, cache=None, archive=None):
+    """
+    마크다운 파일들의 메타데이터 목록을 published_at 기준 최신순으로 반환합니다.
+    cache로 dict를 넘기면 파일별 (mtime, 크기, 메타데이터)를 보관하여, 다음 호출에서 변경되지 않은 파일은 다시 읽지 않습니다
+    (데몬 모드처럼 같은 프로세스에서 인덱스를 반복 생성하는 경우).
+    archive를 넘기면 같은 이름의 마크다운 파일이 없는 아카이브 항목도 포함합니다. 아카이브 항목의 filepath는
+    markdown_dir 아래의 (존재하지 않는) 파일 경로이며, 대시보드는 파일이 없으면 아카이브에서 읽습니다.
+    각 항목에는 파일의 (mtime, 크기)(file_stat) 또는 아카이브 레코드 위치(archive_location)가 함께 기록되어, 다음 프로세스는
+    저장된 인덱스로 cache를 채워(index_cache_from_file) 바뀐 파일만 다시 읽습니다.
+    """
+    metadata_list = []
+    seen = set()
+    names = set()
+    with os.scandir(markdown_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.md'):
+                continue
+            names.add(entry.name)
+            filepath = os.path.join(markdown_dir, entry.name)
+            stat = entry.stat()
+            if cache is not None:
+                seen.add(filepath)
+                cached = cache.get(filepath)
+                if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                    metadata_list.append(cached[2])
+                    continue
+            with open(filepath, 'r', encoding='utf-8', newline='') as f:
+                metadata = _index_metadata(f.read(), entry.name, filepath)
+            if metadata is not None:
+                metadata['file_stat'] = [stat.st_mtime_ns, stat.st_size]
+                metadata_list.append(metadata)
+                if cache is not None:
+                    cache[filepath] = (stat.st_mtime_ns, stat.st_size, metadata)
+
+    if archive is not None:
+        # 아카이브 레코드는 바뀌지 않으므로 (세그먼트, 오프셋)으로 캐시하고, 캐시에 없는 레코드만 세그먼트 순서대로 읽음
+        pending = []
+        for item_id, location in archive.locations().items():
+            if item_id in names:
+                continue # 마크다운 파일이 아카이브보다 우선
+            key = ('archive',) + location
+            seen.add(key)
+            if cache is not None and key in cache:
+                metadata_list.append(cache[key])
+            else:
+                pending.append(item_id)
+        for item_id, location, content in archive.iter_records(pending):
+            metadata = _index_metadata(content.decode('utf-8'), item_id, os.path.join(markdown_dir, item_id))
+            if metadata is not None:
+                metadata['archive_location'] = list(location)
+                metadata_list.append(metadata)
+                if cache is not None:
+                    cache[('archive',) + location] = metadata
+
+    if cache is not None:
+        # 삭제된 파일과 덮어쓰인 아카이브 레코드 정리
+        for key in set(cache) - seen:
+            del cache[key]
+
+    # published_at 기준으로 최신 날짜순으로 정렬
+    # published_at이 없는 경우를 대비하여 기본값 설정
+    metadata_list.sort(key=lambda x: x.get('published_at', '1970-01-01T00:00:00'), reverse=True)
+    return metadata_list
+
+def index_cache_from_file(index_path):
+    """
+    저장된 메타데이터 인덱스(metadata.json)로 scan_metadata의 cache를 만듭니다. 새 프로세스에서도 인덱스를 만든 뒤
+    바뀌지 않은 파일과 아카이브 레코드는 다시 읽지 않습니다. 인덱스가 없거나 읽을 수 없으면 빈 cache를 반환합니다.
+    """
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            metadata_list = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    cache = {}
+    for metadata in metadata_list:
+        # 대시보드가 다시 만든 인덱스처럼 file_stat/archive_location이 없는 항목은 다시 읽음
+        if metadata.get('file_stat'):
+            mtime_ns, size = metadata['file_stat']
+            cache[metadata['filepath']] = (mtime_ns, size, metadata)
+        elif metadata.get('archive_location'):
+            cache[('archive',) + tuple(metadata['archive_location'])] = metadata
+    return cache
+
+def create_metadata_index(markdown_dir, output_file, cache=None, archive=None):
+    """
+    마크다운 파일들로부터 메타데이터 인덱스를 생성합니다. cache와 archive는 scan_metadata와 같습니다.
+    """
+    metadata_list = scan_metadata(markdown_dir, cache, archive)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(metadata_list, f, ensure_ascii=False, indent=4)
+    print(f"Metadata index created: {output_file}")
+    return metadata_list
+
+
+def _published_timestamp(content, entry):
+    # YAML 전체를 해석하지 않고 published_at 줄만 읽음 (json.dumps로 쓴 문자열 또는 따옴표 없는 ISO 형식)
+    match = FRONTMATTER_PATTERN.search(content.decode('utf-8', errors='replace'))
+    value = PUBLISHED_AT_PATTERN.search(match.group(1)) if match else None
+    if value:
+        text = value.group(1).strip()
+        try:
+            text = json.loads(text) if text.startswith('"') else text
+            return datetime.fromisoformat(str(text).replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            pass
+    return entry.stat().st_mtime
+
+class MarkdownStorage(BaseStorage):
+    """
+    항목마다 하나의 마크다운 파일(YAML Frontmatter + 본문)로 저장하는 기본 저장소입니다.
+
+    archive_dir를 지정하면 cli.mode=archive로 archive_after_days일보다 오래된 항목을 압축된 세그먼트 아카이브
+    (src/storage/archive.py)로 옮길 수 있습니다. 최근 항목은 Obsidian에서 열 수 있도록 마크다운 파일로 남고,
+    아카이브된 항목도 저장(변경 확인), 요약, 인덱싱, 내보내기에서 마크다운 파일과 같은 방식으로 읽힙니다.
+    같은 이름의 마크다운 파일이 있으면 파일이 아카이브보다 우선합니다.
+    """
+
+    def __init__(self, markdown_dir: str = "results/markdown", archive_dir: str = None, archive_after_days: int = 90,
+                 archive_compression: str = 'zstd', archive_segment_mb: int = 64, vector_index=None, rollups=None, **kwargs):
+        self.markdown_dir = os.path.abspath(markdown_dir)
+        self.vector_index_cfg = vector_index
+        self.rollups_cfg = rollups
+        os.makedirs(self.markdown_dir, exist_ok=True)
+        self._index_cache = {} # 같은 저장소 객체로 인덱스를 다시 만들 때 변경되지 않은 파일의 메타데이터 재사용
+        self.archive_after_days = archive_after_days
+        self.archive = None
+        if archive_dir:
+            self.archive = SegmentArchive(archive_dir, compression=archive_compression,
+                                          segment_max_bytes=archive_segment_mb * 2 ** 20)
+
+    def save_items(self, items):
+        return save_all_to_markdown(items, self.markdown_dir, self.archive)
+
+    def load_items(self, ids=None):
+        items = []
+        names = set()
+        # ids를 지정하면 해당 항목만 읽음 (파일이 없으면 아카이브에서 찾음)
+        for filename in (os.listdir(self.markdown_dir) if ids is None else ids):
+            filepath = os.path.join(self.markdown_dir, filename)
+            if filename.endswith('.md') and (ids is None or os.path.isfile(filepath)):
+                names.add(filename)
+                item = read_markdown_file(filepath)
+                if item is not None:
+                    items.append(item)
+        if self.archive is not None:
+            archived = [item_id for item_id in (self.archive.ids() if ids is None else ids) if item_id not in names]
+            for _, _, content in self.archive.iter_records(archived):
+                item = parse_markdown(content.decode('utf-8'))
+                if item is not None:
+                    items.append(item)
+        return items
+
+    def load_bodies(self, ids):
+        bodies = {}
+        archived = []
+        for filename in ids:
+            filepath = os.path.join(self.markdown_dir, filename)
+            if os.path.isfile(filepath):
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    bodies[filename] = _markdown_body(f.read())
+            else:
+                archived.append(filename)
+        if self.archive is not None and archived:
+            for item_id, _, content in self.archive.iter_records(archived):
+                bodies[item_id] = _markdown_body(content.decode('utf-8'))
+        return bodies
+
+    def _load_index_cache(self, index_path):
+        # 이 객체로 처음 인덱스를 읽을 때만 저장된 인덱스로 cache를 채움
+        if index_path and not self._index_cache:
+            self._index_cache.update(index_cache_from_file(index_path))
+
+    def load_metadata(self, index_path=None):
+        self._load_index_cache(index_path)
+        return scan_metadata(self.markdown_dir, cache=self._index_cache, archive=self.archive)
+
+    def create_index(self, output_file):
+        self._load_index_cache(output_file)
+        metadata_list = create_metadata_index(self.markdown_dir, output_file, cache=self._index_cache, archive=self.archive)
+        self.update_rollups(metadata_list)
+        self.update_vector_index(metadata_list)
+
+    def archive_items(self, older_than_days=None):
+        """
+        published_at(없거나 해석할 수 없으면 파일 수정 시각)이 older_than_days일보다 오래된 마크다운 파일을 아카이브로 옮깁니다.
+        아카이브에 기록(fsync)한 뒤에 파일을 삭제하므로, 중단되어도 항목이 사라지지 않습니다.
+        """
+        if self.archive is None:
+            print("Archive is not configured. Set storage.archive_dir to enable archiving.")
+            return 0
+        older_than_days = self.archive_after_days if older_than_days is None else older_than_days
+        cutoff = time.time() - older_than_days * 86400
+        moved = 0
+        batch = {}
+        with os.scandir(self.markdown_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.md'):
+                    continue
+                with open(entry.path, 'rb') as f:
+                    content = f.read()
+                if _published_timestamp(content, entry) >= cutoff:
+                    continue
+                batch[entry.name] = content
+                if len(batch) >= ARCHIVE_BATCH_SIZE:
+                    moved += self._move_to_archive(batch)
+                    batch = {}
+        moved += self._move_to_archive(batch)
+        print(f"Archived {moved} items older than {older_than_days} days to {self.archive.archive_dir}")
+        return moved
+
+    def _move_to_archive(self, batch):
+        if not batch:
+            return 0
+        metrics.inc('disk_write_bytes_total', self.archive.put_many(batch), backend='archive')
+        for filename in batch:
+            os.remove(os.path.join(self.markdown_dir, filename))
+        self._index_cache.clear()
+        return len(batch)
+
+    def export_markdown(self, markdown_dir=None):
+        if not markdown_dir or os.path.abspath(markdown_dir) == self.markdown_dir:
+            print(f"Markdown storage already lives in {self.markdown_dir}. Nothing to export.")
+            return {'new': 0, 'updated': 0, 'unchanged': 0}
+        os.makedirs(markdown_dir, exist_ok=True)
+        return save_all_to_markdown(self.load_items(), markdown_dir)
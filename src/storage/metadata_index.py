@@ -0,0 +1,34 @@
+import os
+import json
+import pandas as pd
+
+def load_metadata_frame(metadata_path):
+    """
+    메타데이터 인덱스(metadata.json)를 대시보드용 DataFrame으로 읽어옵니다.
+    """
+    if not os.path.exists(metadata_path):
+        return pd.DataFrame()
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    df = pd.DataFrame(data)
+    # published_at 컬럼을 datetime으로 변환하여 정렬 가능하게 함
+    if 'published_at' in df.columns:
+        df['published_at'] = pd.to_datetime(df['published_at'], errors='coerce', format='ISO8601')
+
+        # Ensure all valid datetimes are tz-naive
+        def make_tz_naive(ts):
+            if pd.isna(ts):
+                return ts
+            if ts.tz is not None:
+                return ts.tz_localize(None)
+            return ts
+
+        df['published_at'] = df['published_at'].apply(make_tz_naive)
+
+        df = df.sort_values(by='published_at', ascending=False)
+    
+    # 'rating' 컬럼이 없으면 0으로 초기화
+    if 'rating' not in df.columns:
+        df['rating'] = 0
+
+    return df
@@ -0,0 +1,195 @@
+import os
+import json
+import fcntl
+import tempfile
+from datetime import datetime, timedelta
+from src.processing.pending import SUMMARY_ERROR_TEXT
+
+ROLLUPS_FILENAME = 'rollups.json' # 대시보드가 읽는 집계 (코퍼스 크기와 무관하게 작음)
+CONTRIBUTIONS_FILENAME = 'items.json' # 항목별로 집계에 더한 값 (인덱서만 읽음)
+LOCK_FILENAME = '.lock'
+BUCKETS = ('day', 'week', 'month')
+UNDATED = '' # published_at이 없는 항목의 날짜 구간
+
+
+def _item_id(metadata):
+    return os.path.basename(metadata['filepath'])
+
+
+def date_bucket(value, bucket='week'):
+    """published_at(datetime 또는 ISO 문자열)이 속한 날짜 구간의 시작일 ('YYYY-MM-DD'). 알 수 없으면 UNDATED."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return UNDATED
+    if not isinstance(value, datetime) or value != value: # 대시보드에서 읽은 NaT
+        return UNDATED
+    day = value.date()
+    if bucket == 'week':
+        day -= timedelta(days=day.weekday()) # 월요일 시작
+    elif bucket == 'month':
+        day = day.replace(day=1)
+    return day.isoformat()
+
+
+def _tags(value):
+    if isinstance(value, str):
+        value = value.split(',')
+    elif not isinstance(value, list):
+        return []
+    return sorted({str(tag).strip() for tag in value if str(tag).strip()})
+
+
+def _rating(value):
+    try:
+        return str(int(value or 0))
+    except (TypeError, ValueError):
+        return '0'
+
+
+def _empty():
+    return {'total': 0, 'sources': {}, 'by_bucket': {}, 'tags': {}, 'ratings': {}, 'summarized': {}}
+
+
+def _add(counts, key, delta):
+    value = counts.get(key, 0) + delta
+    if value:
+        counts[key] = value
+    else:
+        counts.pop(key, None) # 0이 된 키는 지워 집계 크기를 항목 수가 아닌 값의 종류 수로 유지
+
+
+def _write_json(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.', suffix='.json.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class Rollups:
+    """
+    대시보드 통계용 집계입니다. 소스별/날짜 구간(bucket)별 항목 수, 태그 빈도, 소스별 별점 분포, 소스별 요약된 항목 수를
+    rollup_dir/rollups.json에 유지합니다.
+
+    항목마다 집계에 더한 값(소스, 날짜 구간, 태그, 별점, 요약 여부)을 rollup_dir/items.json에 함께 기록하여, 항목이 추가되거나
+    바뀌면 이전 값을 빼고 새 값을 더하고, 삭제되면 이전 값만 뺍니다. 따라서 인덱싱할 때 바뀐 항목만큼만 집계를 고치며,
+    대시보드는 전체 메타데이터를 다시 세지 않고 작은 rollups.json만 읽어 추이 차트를 그립니다.
+
+    인덱서(데몬, 작업자)와 대시보드가 같은 파일을 고치므로 갱신은 프로세스 간 잠금(.lock) 안에서 수행합니다.
+    """
+
+    def __init__(self, rollup_dir="results/rollups", bucket='week'):
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown rollup bucket: {bucket}. Choose one of {', '.join(BUCKETS)}")
+        self.rollup_dir = os.path.abspath(rollup_dir)
+        self.path = os.path.join(self.rollup_dir, ROLLUPS_FILENAME)
+        self.contributions_path = os.path.join(self.rollup_dir, CONTRIBUTIONS_FILENAME)
+        self.bucket = bucket
+        self.rollups = _empty()
+        self.contributions = {} # 항목 ID -> 집계에 더한 값
+        self.generation = 0 # 저장할 때마다 증가. 두 파일의 값이 다르면 기록 도중 중단된 것
+
+    def contribution(self, metadata):
+        """메타데이터 인덱스 항목 하나가 집계에 더하는 값."""
+        summary = metadata.get('summary')
+        return {'source': str(metadata.get('source') or 'unknown'),
+                'bucket': date_bucket(metadata.get('published_at'), self.bucket),
+                'tags': _tags(metadata.get('tags')),
+                'rating': _rating(metadata.get('rating')),
+                'summarized': bool(summary) and summary != SUMMARY_ERROR_TEXT}
+
+    def _apply(self, contribution, sign):
+        rollups = self.rollups
+        source = contribution['source']
+        rollups['total'] += sign
+        _add(rollups['sources'], source, sign)
+        _add(rollups['by_bucket'].setdefault(source, {}), contribution['bucket'], sign)
+        for tag in contribution['tags']:
+            _add(rollups['tags'], tag, sign)
+        _add(rollups['ratings'].setdefault(source, {}), contribution['rating'], sign)
+        if contribution['summarized']:
+            _add(rollups['summarized'], source, sign)
+        for key in ('by_bucket', 'ratings'):
+            if not rollups[key][source]:
+                del rollups[key][source]
+
+    # 갱신
+
+    def upsert(self, metadata):
+        """항목을 추가하거나 바뀐 값으로 고칩니다. 집계가 바뀌었으면 True."""
+        key = _item_id(metadata)
+        contribution = self.contribution(metadata)
+        previous = self.contributions.get(key)
+        if previous == contribution:
+            return False
+        if previous is not None:
+            self._apply(previous, -1)
+        self._apply(contribution, 1)
+        self.contributions[key] = contribution
+        return True
+
+    def remove(self, key):
+        """항목 key(마크다운 파일명)를 집계에서 뺍니다. 집계에 없던 항목이면 False."""
+        previous = self.contributions.pop(key, None)
+        if previous is None:
+            return False
+        self._apply(previous, -1)
+        return True
+
+    def update(self, metadata_list):
+        """
+        메타데이터 인덱스와 맞도록 집계를 갱신하고 {'added', 'updated', 'removed', 'unchanged'} 개수를 반환합니다.
+        인덱스에 없는 항목은 삭제된 것으로 보고 집계에서 뺍니다.
+        """
+        os.makedirs(self.rollup_dir, exist_ok=True)
+        with open(os.path.join(self.rollup_dir, LOCK_FILENAME), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.load()
+            counts = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+            current = set()
+            for metadata in metadata_list:
+                key = _item_id(metadata)
+                current.add(key)
+                existed = key in self.contributions
+                if not self.upsert(metadata):
+                    counts['unchanged'] += 1
+                else:
+                    counts['updated' if existed else 'added'] += 1
+            for key in [key for key in self.contributions if key not in current]:
+                self.remove(key)
+                counts['removed'] += 1
+            if counts['added'] or counts['updated'] or counts['removed']:
+                self.save()
+        return counts
+
+    # 저장/불러오기
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                rollups = json.load(f)
+            with open(self.contributions_path, 'r', encoding='utf-8') as f:
+                contributions = json.load(f)
+        except (OSError, ValueError):
+            rollups, contributions = None, None
+        if (rollups is None or rollups.get('bucket') != self.bucket
+                or rollups.get('generation') != contributions.get('generation')):
+            # 처음 만들거나, 날짜 구간 설정이 바뀌었거나, 두 파일 중 하나만 기록되었으면 다음 update에서 모든 항목을 다시 더함
+            rollups, contributions = _empty(), {'generation': 0, 'items': {}}
+        self.generation = contributions['generation']
+        self.rollups = {key: rollups[key] for key in _empty()}
+        self.contributions = contributions['items']
+        return self
+
+    def save(self):
+        os.makedirs(self.rollup_dir, exist_ok=True)
+        self.generation += 1
+        _write_json(self.contributions_path, {'generation': self.generation, 'items': self.contributions})
+        _write_json(self.path, {**self.rollups, 'bucket': self.bucket, 'generation': self.generation,
+                                'updated_at': datetime.now().astimezone().isoformat(timespec='seconds')})
@@ -0,0 +1,194 @@
+import os
+import json
+import hashlib
+import sqlite3
+from datetime import datetime
+from .base_storage import BaseStorage
+from .markdown_storage import markdown_filename, save_to_markdown
+from .item import Item, body_hash
+from src.monitoring import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    url TEXT,
+    source TEXT,
+    published_at TEXT,
+    metadata TEXT NOT NULL,
+    body TEXT,
+    content_hash TEXT NOT NULL,
+    body_hash TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_published_at ON items(published_at);
+CREATE INDEX IF NOT EXISTS idx_items_source ON items(source);
+"""
+
+UPSERT_SQL = """
+INSERT INTO items (id, title, url, source, published_at, metadata, body, content_hash, body_hash, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    title = excluded.title,
+    url = excluded.url,
+    source = excluded.source,
+    published_at = excluded.published_at,
+    metadata = excluded.metadata,
+    body = excluded.body,
+    content_hash = excluded.content_hash,
+    body_hash = excluded.body_hash,
+    updated_at = excluded.updated_at
+"""
+
+def _json_default(value):
+    # 마크다운 저장과 동일하게 날짜는 tz-naive ISO 문자열로 저장
+    if isinstance(value, datetime):
+        if value.tzinfo is not None and value.tzinfo.utcoffset(value) is not None:
+            value = value.replace(tzinfo=None)
+        return value.isoformat()
+    return str(value)
+
+class SQLiteStorage(BaseStorage):
+    """
+    항목을 하나의 SQLite 데이터베이스에 저장하는 저장소입니다.
+    저장은 batch_size 단위의 트랜잭션으로 묶어 처리하며, Obsidian용 마크다운 파일은 export_markdown()으로 필요할 때 생성합니다.
+    """
+
+    def __init__(self, db_path: str = "results/omni_collector.db", batch_size: int = 500,
+                 markdown_dir: str = "results/markdown", vector_index=None, rollups=None, **kwargs):
+        self.db_path = os.path.abspath(db_path)
+        self.vector_index_cfg = vector_index
+        self.rollups_cfg = rollups
+        self.batch_size = batch_size
+        self.markdown_dir = os.path.abspath(markdown_dir)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(items)")}
+        if 'body_hash' not in columns: # 본문 해시 컬럼이 없던 이전 버전의 데이터베이스
+            self._add_body_hash_column()
+
+    def _add_body_hash_column(self):
+        # 한 번만 모든 본문을 읽어 채우고, 이후에는 저장할 때 기록된 값을 사용
+        with self.conn:
+            self.conn.execute("ALTER TABLE items ADD COLUMN body_hash TEXT")
+        cursor = self.conn.execute("SELECT id, body FROM items")
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            with self.conn:
+                self.conn.executemany("UPDATE items SET body_hash = ? WHERE id = ?",
+                                      [(body_hash(body), item_id) for item_id, body in rows])
+
+    def _to_row(self, item, now):
+        metadata = {k: item[k] for k in item if k not in ('body', 'filepath')} # 내보낸 본문은 아래에서 한 번만 읽음
+        metadata_json = json.dumps(metadata, ensure_ascii=False, default=_json_default)
+        body = item.get('body') or ''
+        content_hash = hashlib.sha256((metadata_json + '\0' + body).encode('utf-8')).hexdigest()
+        published_at = metadata.get('published_at')
+        if published_at is not None:
+            published_at = _json_default(published_at)
+        return (
+            markdown_filename(item['title']), metadata.get('title'), metadata.get('url'), metadata.get('source'),
+            published_at, metadata_json, body, content_hash, body_hash(body), now
+        )
+
+    def save_items(self, items):
+        counts = {'new': 0, 'updated': 0, 'unchanged': 0}
+        now = datetime.now().isoformat()
+        items = list(items)
+        for start in range(0, len(items), self.batch_size):
+            rows = {}
+            for item in items[start:start + self.batch_size]:
+                row = self._to_row(item, now)
+                rows[row[0]] = row # 같은 배치 내 동일 ID는 마지막 항목을 사용
+
+            placeholders = ','.join('?' * len(rows))
+            existing = dict(self.conn.execute(
+                f"SELECT id, content_hash FROM items WHERE id IN ({placeholders})", list(rows)
+            ).fetchall())
+
+            changed_rows = []
+            for item_id, row in rows.items():
+                if item_id not in existing:
+                    counts['new'] += 1
+                    changed_rows.append(row)
+                elif existing[item_id] != row[7]:
+                    counts['updated'] += 1
+                    changed_rows.append(row)
+                else:
+                    counts['unchanged'] += 1
+
+            with self.conn: # 배치 단위 트랜잭션
+                self.conn.executemany(UPSERT_SQL, changed_rows)
+            metrics.inc('disk_write_bytes_total', sum(len(row[5].encode('utf-8')) + len(row[6].encode('utf-8')) for row in changed_rows), backend='sqlite')
+
+        print(f"Saved to {self.db_path}: {counts['new']} new, {counts['updated']} updated, {counts['unchanged']} unchanged")
+        return counts
+
+    def load_items(self, ids=None):
+        if ids is None:
+            rows = self.conn.execute("SELECT metadata, body FROM items").fetchall()
+        else:
+            ids = list(ids)
+            rows = []
+            for start in range(0, len(ids), self.batch_size):
+                batch = ids[start:start + self.batch_size]
+                rows.extend(self.conn.execute(
+                    f"SELECT metadata, body FROM items WHERE id IN ({','.join('?' * len(batch))})", batch
+                ).fetchall())
+        items = []
+        for metadata_json, body in rows:
+            item = Item(json.loads(metadata_json))
+            item['body'] = body or ''
+            items.append(item)
+        return items
+
+    def load_bodies(self, ids):
+        ids = list(ids)
+        bodies = {}
+        for start in range(0, len(ids), self.batch_size):
+            batch = ids[start:start + self.batch_size]
+            bodies.update(self.conn.execute(
+                f"SELECT id, body FROM items WHERE id IN ({','.join('?' * len(batch))})", batch
+            ).fetchall())
+        return bodies
+
+    def load_metadata(self, index_path=None):
+        metadata_list = []
+        # 본문 해시는 저장할 때 기록하므로 본문은 읽지 않음
+        cursor = self.conn.execute("SELECT id, metadata, body_hash FROM items ORDER BY published_at DESC")
+        for item_id, metadata_json, stored_body_hash in cursor:
+            metadata = json.loads(metadata_json)
+            # 대시보드의 본문 보기/수정은 export_markdown()으로 생성된 파일을 사용
+            metadata['filepath'] = os.path.join(self.markdown_dir, item_id)
+            metadata['body_hash'] = stored_body_hash
+            metadata_list.append(metadata)
+        return metadata_list
+
+    def create_index(self, output_file):
+        metadata_list = self.load_metadata()
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(metadata_list, f, ensure_ascii=False, indent=4)
+        print(f"Metadata index created: {output_file}")
+        self.update_rollups(metadata_list)
+        self.update_vector_index(metadata_list)
+
+    def export_markdown(self, markdown_dir=None):
+        markdown_dir = markdown_dir or self.markdown_dir
+        os.makedirs(markdown_dir, exist_ok=True)
+        counts = {'new': 0, 'updated': 0, 'unchanged': 0}
+        cursor = self.conn.execute("SELECT metadata, body FROM items")
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            for metadata_json, body in rows:
+                item = json.loads(metadata_json)
+                item['body'] = body or ''
+                counts[save_to_markdown(item, markdown_dir)] += 1
+        print(f"Exported to {markdown_dir}: {counts['new']} new, {counts['updated']} updated, {counts['unchanged']} unchanged")
+        return counts
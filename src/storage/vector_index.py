@@ -0,0 +1,233 @@
+import os
+import re
+import json
+import math
+import zlib
+import hashlib
+import tempfile
+from collections import Counter
+import numpy as np
+from scipy import sparse
+
+INDEX_FILENAME = 'vectors.npz'
+TOKEN_PATTERN = re.compile(r'[^\W_]{2,}')
+HANGUL_BIGRAM_PATTERN = re.compile(r'(?=([가-힣]{2}))') # 겹치는 한글 2-gram
+# 필드별 단어 빈도 가중치 (제목과 요약의 단어가 본문보다 문서를 더 잘 대표함)
+FIELD_WEIGHTS = (('title', 3), ('summary', 2), ('tags', 2))
+BATCH_SIZE = 1000 # 변경된 항목의 본문을 한 번에 읽어 벡터로 만드는 개수
+
+
+def tokenize(text):
+    """
+    소문자 단어 토큰. 한글 단어는 조사/어미가 붙어도 같은 단어끼리 겹치도록 글자 2-gram을 함께 추가합니다.
+    """
+    text = text.lower()
+    return TOKEN_PATTERN.findall(text) + HANGUL_BIGRAM_PATTERN.findall(text)
+
+
+def item_id(metadata):
+    return os.path.basename(metadata['filepath'])
+
+
+def _fingerprint(metadata):
+    tags = metadata.get('tags')
+    parts = [str(metadata.get('title') or ''), str(metadata.get('summary') or ''),
+             json.dumps(tags, ensure_ascii=False, default=str) if tags else '', str(metadata.get('body_hash') or '')]
+    return hashlib.sha1('\0'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+class VectorIndex:
+    """
+    관련 항목 찾기와 의미 검색을 위한 로컬 TF-IDF 벡터 인덱스입니다.
+
+    단어를 crc32로 n_features 차원에 해싱(feature hashing)하므로 어휘 사전이 없고, 항목마다 제목/요약/태그/본문의
+    단어 빈도(1 + log tf)만 희소 행렬(scipy.sparse CSR)의 한 행으로 저장합니다. IDF와 행 노름은 검색할 때
+    행렬에서 벡터 연산으로 계산하므로, 인덱서는 추가되거나 바뀐 항목만 토큰화하고 삭제된 항목의 행만 제거하면 됩니다
+    (전체 코퍼스를 다시 학습하지 않음).
+
+    검색은 질의의 단어 열만 잘라낸 CSC 행렬과의 곱으로 모든 항목의 코사인 유사도를 한 번에 계산하고 argpartition으로
+    상위 k개를 고릅니다. 관련 항목 찾기는 선택한 항목에서 TF-IDF 가중치가 가장 큰 related_terms개 단어로 검색합니다.
+    """
+
+    def __init__(self, index_dir="results/vector_index", n_features=2 ** 18, body_chars=20000, related_terms=32):
+        self.index_dir = os.path.abspath(index_dir)
+        self.path = os.path.join(self.index_dir, INDEX_FILENAME)
+        self.n_features = n_features
+        self.body_chars = body_chars # 긴 자막/노트는 앞부분만 사용
+        self.related_terms = related_terms
+        self.ids = []
+        self.fingerprints = []
+        self.matrix = sparse.csr_matrix((0, n_features), dtype=np.float32)
+        self._features = {} # 토큰 -> 해시된 열 번호
+        self._load()
+
+    # 저장/불러오기
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            self._reset_weights()
+            return
+        with np.load(self.path) as data:
+            if int(data['n_features']) != self.n_features:
+                print(f"Warning: Vector index {self.path} was built with {int(data['n_features'])} features. Rebuilding.")
+                self._reset_weights()
+                return
+            self.matrix = sparse.csr_matrix((data['data'], data['indices'], data['indptr']),
+                                            shape=(len(data['ids']), self.n_features))
+            self.ids = data['ids'].tolist()
+            self.fingerprints = data['fingerprints'].tolist()
+        self._reset_weights()
+
+    def save(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, prefix='.', suffix='.npz.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr,
+                         ids=np.array(self.ids, dtype=str), fingerprints=np.array(self.fingerprints, dtype=str),
+                         n_features=self.n_features)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _reset_weights(self):
+        self._positions = {item_id: row for row, item_id in enumerate(self.ids)}
+        self._idf = None
+        self._norms = None
+        self._columns = None
+
+    def _weights(self):
+        """현재 행렬의 IDF, 행별 TF-IDF 노름, 열 단위 검색용 CSC 행렬 (변경 후 처음 검색할 때 한 번 계산)."""
+        if self._idf is None:
+            matrix = self.matrix
+            df = np.bincount(matrix.indices, minlength=self.n_features)
+            self._idf = (np.log((1 + matrix.shape[0]) / (1 + df)) + 1).astype(np.float32)
+            rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+            squared = (matrix.data * self._idf[matrix.indices]) ** 2
+            norms = np.sqrt(np.bincount(rows, weights=squared, minlength=matrix.shape[0]))
+            norms[norms == 0] = np.inf # 빈 문서는 유사도 0
+            self._norms = norms
+            self._columns = matrix.tocsc()
+        return self._idf, self._norms, self._columns
+
+    # 인덱싱
+
+    def _feature(self, token):
+        column = self._features.get(token)
+        if column is None:
+            column = self._features[token] = zlib.crc32(token.encode('utf-8')) % self.n_features
+        return column
+
+    def _term_counts(self, weighted_texts):
+        counts = {}
+        for text, weight in weighted_texts:
+            # 같은 토큰은 한 번만 해싱
+            for token, count in Counter(tokenize(text)).items():
+                column = self._feature(token)
+                counts[column] = counts.get(column, 0) + count * weight
+        return counts
+
+    def _document_texts(self, metadata, body):
+        texts = []
+        for field, weight in FIELD_WEIGHTS:
+            value = metadata.get(field)
+            if isinstance(value, list):
+                value = ' '.join(map(str, value))
+            if value:
+                texts.append((str(value), weight))
+        if body:
+            texts.append((body[:self.body_chars], 1))
+        return texts
+
+    def _vectorize(self, documents):
+        """[(메타데이터, 본문)] -> 단어 빈도(1 + log tf) CSR 행렬."""
+        rows, columns, values = [], [], []
+        for row, (metadata, body) in enumerate(documents):
+            for column, count in self._term_counts(self._document_texts(metadata, body)).items():
+                rows.append(row)
+                columns.append(column)
+                values.append(1 + math.log(count))
+        return sparse.csr_matrix((np.array(values, dtype=np.float32), (rows, columns)),
+                                 shape=(len(documents), self.n_features))
+
+    def update(self, metadata_list, load_bodies):
+        """
+        메타데이터 인덱스와 맞도록 벡터를 갱신하고 {'added', 'updated', 'removed', 'unchanged'} 개수를 반환합니다.
+        제목, 요약, 태그, 본문 해시(body_hash)가 바뀐 항목만 다시 벡터로 만들며, load_bodies(ID 목록)는 {ID: 본문}을 반환합니다.
+        """
+        current = {item_id(metadata): metadata for metadata in metadata_list}
+        fingerprints = {key: _fingerprint(metadata) for key, metadata in current.items()}
+        keep = [row for row, key in enumerate(self.ids) if fingerprints.get(key) == self.fingerprints[row]]
+        kept = {self.ids[row] for row in keep}
+        changed = [key for key in current if key not in kept]
+        counts = {'added': sum(1 for key in changed if key not in self._positions),
+                  'updated': sum(1 for key in changed if key in self._positions),
+                  'removed': sum(1 for key in self.ids if key not in current),
+                  'unchanged': len(keep)}
+        if not changed and len(keep) == len(self.ids):
+            return counts
+
+        blocks = [self.matrix[keep]]
+        ids = [self.ids[row] for row in keep]
+        for start in range(0, len(changed), BATCH_SIZE):
+            batch = changed[start:start + BATCH_SIZE]
+            bodies = load_bodies(batch)
+            blocks.append(self._vectorize([(current[key], bodies.get(key)) for key in batch]))
+            ids.extend(batch)
+        self.matrix = sparse.vstack(blocks, format='csr', dtype=np.float32)
+        self.ids = ids
+        self.fingerprints = [fingerprints[key] for key in ids]
+        self._reset_weights()
+        self.save()
+        return counts
+
+    # 검색
+
+    def _top_k(self, columns, weights, k, exclude=None):
+        if not self.ids or not len(columns):
+            return []
+        idf, norms, matrix_columns = self._weights()
+        query = weights * idf[columns]
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return []
+        scores = matrix_columns[:, columns] @ (query * idf[columns])
+        scores /= norms * query_norm
+        if exclude is not None:
+            scores[exclude] = 0
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[row], float(scores[row])) for row in top if scores[row] > 0]
+
+    def search(self, query, k=10):
+        """질의와 코사인 유사도가 높은 순서로 [(ID, 점수)]를 최대 k개 반환합니다."""
+        counts = self._term_counts([(query, 1)])
+        columns = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        weights = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        return self._top_k(columns, weights, k)
+
+    def related(self, key, k=10):
+        """항목 key(마크다운 파일명)와 관련된 다른 항목을 [(ID, 점수)]로 최대 k개 반환합니다."""
+        row = self._positions.get(key)
+        if row is None:
+            return []
+        idf, _, _ = self._weights()
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        columns = self.matrix.indices[start:end].astype(np.int64)
+        weights = self.matrix.data[start:end]
+        if len(columns) > self.related_terms:
+            strongest = np.argpartition(-(weights * idf[columns]), self.related_terms - 1)[:self.related_terms]
+            columns, weights = columns[strongest], weights[strongest]
+        return self._top_k(columns, weights, k, exclude=row)
+
+    def warm(self):
+        """검색에 필요한 IDF, 노름, CSC 행렬을 미리 계산합니다 (대시보드에서 첫 검색이 느려지지 않도록)."""
+        self._weights()
+        return self
+
+    def __len__(self):
+        return len(self.ids)
+
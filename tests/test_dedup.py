@@ -0,0 +1,76 @@
+from src.processing.dedup import Deduplicator
+
+BODY = " ".join(f"문장 {i} 에 대한 같은 본문 내용입니다" for i in range(40))
+
+
+def _item(source, url, body=BODY):
+    return {'title': f"{source} 게시글", 'source': source, 'url': url, 'body': body}
+
+
+def _run(index_path, item):
+    return Deduplicator(index_path=str(index_path)).deduplicate([item])
+
+
+def test_skipped_duplicate_stays_skipped_on_later_runs(tmp_path):
+    index_path = tmp_path / "fingerprints.json"
+    assert len(_run(index_path, _item('web', "https://a.com/x"))) == 1
+    # 다른 소스/URL의 같은 본문은 건너뜀
+    assert _run(index_path, _item('raindrop', "https://b.com/y")) == []
+    # 다음 실행에서 URL로 일치해도 저장된 항목의 갱신이 아니므로 계속 건너뜀
+    assert _run(index_path, _item('raindrop', "https://b.com/y")) == []
+    assert _run(index_path, _item('raindrop', "https://b.com/y")) == []
+
+
+def test_stored_item_update_passes_on_later_runs(tmp_path):
+    index_path = tmp_path / "fingerprints.json"
+    assert len(_run(index_path, _item('web', "https://a.com/x"))) == 1
+    assert _run(index_path, _item('raindrop', "https://b.com/y")) == []
+    updated = _run(index_path, _item('web', "https://a.com/x", BODY + " 추가된 문장"))
+    assert len(updated) == 1
+    assert updated[0]['source'] == 'web'
+
+
+def test_merged_duplicate_is_skipped_on_later_runs(tmp_path):
+    index_path = tmp_path / "fingerprints.json"
+    items = Deduplicator(index_path=str(index_path)).deduplicate(
+        [_item('web', "https://a.com/x"), _item('raindrop', "https://b.com/y")])
+    assert len(items) == 1
+    assert items[0]['sources'] == ['web', 'raindrop']
+    assert _run(index_path, _item('raindrop', "https://b.com/y")) == []
+    assert len(_run(index_path, _item('web', "https://a.com/x"))) == 1
+
+
+def test_refresh_keeps_urls_of_merged_duplicates(tmp_path):
+    index_path = tmp_path / "fingerprints.json"
+    Deduplicator(index_path=str(index_path)).deduplicate(
+        [_item('web', "https://a.com/x"), _item('raindrop', "https://b.com/y")])
+    refreshed = _run(index_path, _item('web', "https://a.com/x"))
+    assert refreshed[0]['sources'] == ['web', 'raindrop']
+    assert refreshed[0]['urls'] == ["https://a.com/x", "https://b.com/y"]
+
+
+def test_changed_fingerprint_leaves_old_bands(tmp_path):
+    index_path = tmp_path / "fingerprints.json"
+    _run(index_path, _item('web', "https://a.com/x"))
+    other = " ".join(f"완전히 다른 글 {i} 의 새로운 내용" for i in range(40))
+    deduplicator = Deduplicator(index_path=str(index_path))
+    deduplicator.deduplicate([_item('web', "https://a.com/x", other)])
+    buckets = [bucket for bucket in deduplicator._band_index.values() if 0 in bucket]
+    assert len(buckets) == deduplicator.max_hamming_distance + 1
+    # 예전 본문과 같은 다른 URL의 항목은 더 이상 중복이 아님
+    assert len(_run(index_path, _item('raindrop', "https://b.com/y"))) == 1
+
+
+def test_skipped_duplicate_is_merged_into_stored_item(tmp_path):
+    from src.storage.markdown_storage import MarkdownStorage
+
+    index_path = tmp_path / "fingerprints.json"
+    storage = MarkdownStorage(str(tmp_path / "markdown"))
+    storage.save_items(_run(index_path, _item('web', "https://a.com/x")))
+    deduplicator = Deduplicator(index_path=str(index_path))
+    assert deduplicator.deduplicate([_item('raindrop', "https://b.com/y")], storage) == []
+    assert deduplicator.stored_updates == 1
+    stored, = storage.load_items()
+    assert stored['sources'] == ['web', 'raindrop']
+    assert stored['urls'] == ["https://a.com/x", "https://b.com/y"]
+    assert stored['body'] == BODY